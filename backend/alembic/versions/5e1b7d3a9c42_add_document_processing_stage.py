@@ -0,0 +1,25 @@
+"""Record the last completed processing stage of each document
+
+Revision ID: 5e1b7d3a9c42
+Revises: 3f7a9c2b6d18
+Create Date: 2026-10-17 20:12:07.518344
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e1b7d3a9c42'
+down_revision = '3f7a9c2b6d18'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Existing documents have no checkpoint and restart from OCR if reprocessed
+    op.add_column('documents', sa.Column('processing_stage', sa.String(length=20), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('documents', 'processing_stage')
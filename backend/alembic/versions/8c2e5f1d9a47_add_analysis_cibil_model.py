@@ -0,0 +1,25 @@
+"""Record the scoring model behind each CIBIL score
+
+Revision ID: 8c2e5f1d9a47
+Revises: d41f0c9a7e53
+Create Date: 2026-10-17 19:05:33.281907
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c2e5f1d9a47'
+down_revision = 'd41f0c9a7e53'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Every existing score was produced by the original ratio formula
+    op.add_column('analyses', sa.Column('cibil_model', sa.String(length=50), server_default='ratio:1', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('analyses', 'cibil_model')
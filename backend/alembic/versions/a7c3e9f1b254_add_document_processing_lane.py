@@ -0,0 +1,29 @@
+"""Record document size and processing lane
+
+Revision ID: a7c3e9f1b254
+Revises: 5e1b7d3a9c42
+Create Date: 2026-10-17 20:48:51.204117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7c3e9f1b254'
+down_revision = '5e1b7d3a9c42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('documents', sa.Column('page_count', sa.Integer(), nullable=True))
+    op.add_column('documents', sa.Column('file_size', sa.Integer(), nullable=True))
+    # Existing documents were never sized; they keep the standard lane
+    op.add_column('documents', sa.Column('processing_lane', sa.String(length=20), server_default='standard', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('documents', 'processing_lane')
+    op.drop_column('documents', 'file_size')
+    op.drop_column('documents', 'page_count')
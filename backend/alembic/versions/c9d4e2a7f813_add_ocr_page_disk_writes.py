@@ -0,0 +1,24 @@
+"""Record disk writes per OCR page
+
+Revision ID: c9d4e2a7f813
+Revises: a7c3e9f1b254
+Create Date: 2026-10-17 22:14:06.381529
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c9d4e2a7f813'
+down_revision = 'a7c3e9f1b254'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('ocr_pages', sa.Column('disk_write_bytes', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('ocr_pages', 'disk_write_bytes')
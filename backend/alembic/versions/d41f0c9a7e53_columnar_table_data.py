@@ -0,0 +1,63 @@
+"""Store extracted tables in columnar form
+
+Revision ID: d41f0c9a7e53
+Revises: b6e237b2af2e
+Create Date: 2026-10-17 18:42:10.512384
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.utils import table_encoding
+
+
+# revision identifiers, used by Alembic.
+revision = 'd41f0c9a7e53'
+down_revision = 'b6e237b2af2e'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 500
+
+extracted_data = sa.table(
+    'extracted_data',
+    sa.column('id', sa.Integer()),
+    sa.column('table_data', sa.JSON()),
+    sa.column('table_format', sa.String(length=20)),
+)
+
+
+def _convert(source_format: str, target_format: str, convert) -> None:
+    bind = op.get_bind()
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(extracted_data.c.id, extracted_data.c.table_data)
+            .where(extracted_data.c.table_format == source_format, extracted_data.c.id > last_id)
+            .order_by(extracted_data.c.id)
+            .limit(BATCH_SIZE)
+        ).fetchall()
+        if not rows:
+            break
+        bind.execute(
+            extracted_data.update()
+            .where(extracted_data.c.id == sa.bindparam('row_id'))
+            .values(table_data=sa.bindparam('data'), table_format=target_format),
+            [{'row_id': row.id, 'data': convert(row.table_data)} for row in rows],
+        )
+        last_id = rows[-1].id
+
+
+def upgrade() -> None:
+    op.add_column('extracted_data', sa.Column('table_format', sa.String(length=20), server_default='rows', nullable=False))
+    _convert(
+        table_encoding.ROWS, table_encoding.COLUMNAR,
+        lambda data: table_encoding.encode_tables(table_encoding.decode_tables(data)),
+    )
+
+
+def downgrade() -> None:
+    _convert(
+        table_encoding.COLUMNAR, table_encoding.ROWS,
+        lambda data: {'tables': table_encoding.decode_tables(data)},
+    )
+    op.drop_column('extracted_data', 'table_format')
@@ -0,0 +1,24 @@
+"""Store the tables read while OCRing each page
+
+Revision ID: e5b81f3c2d94
+Revises: c9d4e2a7f813
+Create Date: 2026-10-18 09:12:44.205117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5b81f3c2d94'
+down_revision = 'c9d4e2a7f813'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('ocr_pages', sa.Column('tables', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('ocr_pages', 'tables')
@@ -5,6 +5,7 @@ from app.api import deps
 from app.core.security import get_password_hash
 from app.db.models import User, Document, Client
 from app.schemas.user import User as UserSchema, UserCreate, UserUpdate
+from app.tasks.scoring import rescore_analyses
 
 router = APIRouter()
 
@@ -216,6 +217,18 @@ def delete_user(
     
     return user
 
+@router.post("/rescore", response_model=dict, status_code=status.HTTP_202_ACCEPTED)
+def rescore_all_analyses(
+    current_user: User = Depends(deps.get_current_active_admin),
+    chunk_size: int = Query(None, ge=1, le=50000),
+) -> Any:
+    """
+    Queue a job that recomputes every stored CIBIL score
+    """
+    task = rescore_analyses.delay(chunk_size)
+    
+    return {"taskId": task.id, "status": "queued"}
+
 @router.get("/stats", response_model=dict)
 def get_stats(
     db: Session = Depends(deps.get_db),
@@ -1,12 +1,18 @@
+import json
 from typing import Any, Dict, List
-from fastapi import APIRouter, Depends, HTTPException, status, Response
+from fastapi import APIRouter, Depends, HTTPException, Query, status, Response
+from fastapi.responses import JSONResponse
+from sqlalchemy import Text, cast
 from sqlalchemy.orm import Session
 from app.api import deps
-from app.db.models import Document, DocumentStatus, User, Analysis, ExtractedData, OCRResult
+from app.db.models import (
+    Document, DocumentStatus, User, Analysis, ExtractedData, OCRResult, OCRPage, ClientFinancialPeriod
+)
 from app.schemas.analysis import (
-    CibilInput, CibilScore, TableData, ChatMessage, ChatResponse
+    CibilInput, CibilScore, CibilSimulation, CibilSimulationInput, TableData, ChatMessage, ChatResponse
 )
-from app.services import analysis_service, ai_service
+from app.services import analysis_service, ai_service, scoring_models, portfolio_service
+from app.utils import table_encoding
 
 router = APIRouter()
 
@@ -48,13 +54,15 @@ def get_analysis_results(
             detail="Analysis results not found",
         )
     
+    analysis_service.refresh_scores(db, [analysis])
+    
     return {
         "analysis": {
             "cibilScore": analysis.cibil_score,
             "summary": analysis.summary,
         },
         "extractedData": extracted_data.json_data,
-        "tableData": extracted_data.table_data,
+        "tableData": {"tables": table_encoding.decode_tables(extracted_data.table_data)},
         "ocrText": ocr_result.text,
         "confidence": ocr_result.confidence,
     }
@@ -90,6 +98,9 @@ def get_cibil_score(
             detail="CIBIL data not found",
         )
     
+    # Scores from an older scoring model are recomputed on read
+    analysis_service.refresh_scores(db, [analysis])
+    
     # Extract financial data
     financial_data = extracted_data.json_data
     
@@ -105,6 +116,7 @@ def get_cibil_score(
     return {
         "score": int(analysis.cibil_score) if analysis.cibil_score else 0,
         "extractedData": financial_data,
+        "model": analysis.cibil_model,
     }
 
 @router.put("/{document_id}/cibil", response_model=CibilScore)
@@ -147,25 +159,82 @@ def update_cibil_data(
         "liabilities": cibil_input.liabilities,
     }
     
-    # Update or create json_data
-    if not extracted_data.json_data:
-        extracted_data.json_data = {}
-    
-    extracted_data.json_data.update(financial_data)
+    # Assign a new dict; in-place changes to a JSON column are not persisted
+    extracted_data.json_data = {**(extracted_data.json_data or {}), **financial_data}
     
     # Calculate new CIBIL score
-    new_score = analysis_service.calculate_cibil_score(financial_data)
+    new_score, model_key = analysis_service.score_with_active_model(financial_data)
     analysis.cibil_score = new_score
+    analysis.cibil_model = model_key
+    
+    # Keep the client's time series in step with the corrected figures
+    db.query(ClientFinancialPeriod).filter(ClientFinancialPeriod.document_id == document_id).update(
+        {**financial_data, "cibil_score": new_score}, synchronize_session=False
+    )
     
     # Save changes
     db.add(extracted_data)
     db.add(analysis)
     db.commit()
     
+    portfolio_service.invalidate(current_user.id)
+    
     return {
         "score": int(new_score),
         "extractedData": financial_data,
+        "model": model_key,
+    }
+
+@router.post("/{document_id}/cibil/simulate", response_model=CibilSimulation)
+def simulate_cibil_score(
+    *,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+    document_id: int,
+    simulation: CibilSimulationInput,
+) -> Any:
+    """
+    Score a grid of what-if scenarios against a document's figures without
+    saving anything
+    """
+    # Check if document exists and belongs to current user
+    document = db.query(Document).filter(
+        Document.id == document_id, Document.user_id == current_user.id
+    ).first()
+    
+    if not document:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found",
+        )
+    
+    extracted_data = db.query(ExtractedData.json_data).filter(ExtractedData.document_id == document_id).first()
+    
+    if not extracted_data:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="CIBIL data not found",
+        )
+    
+    # The scenario count is bounded when the request is validated
+    axes = {
+        field: values for field, values in simulation.dict().items()
+        if values is not None
     }
+    
+    financial_data = extracted_data[0] if isinstance(extracted_data[0], dict) else {}
+    baseline, scores = analysis_service.simulate_cibil_scores(financial_data, axes)
+    
+    # Built directly; validating each score through the response model is wasted work
+    return JSONResponse({
+        "model": scoring_models.active_model().key,
+        "baseline": {
+            "score": baseline,
+            "extractedData": {field: financial_data.get(field) for field in analysis_service.CIBIL_FIELDS},
+        },
+        "axes": axes,
+        "scores": scores.tolist(),
+    })
 
 @router.get("/{document_id}/summary", response_model=Dict[str, Any])
 def get_document_summary(
@@ -225,9 +294,11 @@ def get_extracted_tables(
     db: Session = Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_user),
     document_id: int,
+    encoding: str = Query(table_encoding.ROWS, regex=f"^({table_encoding.ROWS}|{table_encoding.COLUMNAR})$"),
 ) -> Any:
     """
-    Get tables extracted from document
+    Get tables extracted from document. encoding=columnar returns the
+    stored column-wise encoding (see app.utils.table_encoding) as is.
     """
     # Check if document exists and belongs to current user
     document = db.query(Document).filter(
@@ -240,51 +311,30 @@ def get_extracted_tables(
             detail="Document not found",
         )
     
-    # Get extracted data
-    extracted_data = db.query(ExtractedData).filter(ExtractedData.document_id == document_id).first()
+    # Fetch the stored JSON as text so the columnar fast path never parses it
+    stored = db.query(ExtractedData.table_format, cast(ExtractedData.table_data, Text)).filter(
+        ExtractedData.document_id == document_id
+    ).first()
+    stored_format, raw = stored if stored else (None, None)
+    
+    if encoding == table_encoding.COLUMNAR and stored_format == table_encoding.COLUMNAR and raw:
+        return Response(content=raw, media_type="application/json")
+    
+    table_data = json.loads(raw) if raw else None
     
-    if not extracted_data or not extracted_data.table_data:
+    if not table_data:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="No tables found in document",
         )
     
-    # Return tables
-    tables = extracted_data.table_data.get("tables", [])
-    
-    # If tables is not a list or is empty, return mock data
-    if not isinstance(tables, list) or not tables:
-        # Mock data for demonstration
-        tables = [
-            {
-                "id": 1,
-                "title": "Income Statement",
-                "headers": ["Item", "2022", "2021", "Change %"],
-                "rows": [
-                    ["Revenue", "5,000,000", "4,300,000", "16.3%"],
-                    ["Cost of Goods Sold", "3,000,000", "2,700,000", "11.1%"],
-                    ["Gross Profit", "2,000,000", "1,600,000", "25.0%"],
-                    ["Operating Expenses", "1,000,000", "900,000", "11.1%"],
-                    ["Net Profit", "1,000,000", "700,000", "42.9%"],
-                ],
-            },
-            {
-                "id": 2,
-                "title": "Balance Sheet",
-                "headers": ["Item", "2022", "2021", "Change %"],
-                "rows": [
-                    ["Current Assets", "3,000,000", "2,500,000", "20.0%"],
-                    ["Non-Current Assets", "5,000,000", "4,800,000", "4.2%"],
-                    ["Total Assets", "8,000,000", "7,300,000", "9.6%"],
-                    ["Current Liabilities", "1,200,000", "1,100,000", "9.1%"],
-                    ["Non-Current Liabilities", "1,800,000", "2,000,000", "-10.0%"],
-                    ["Total Liabilities", "3,000,000", "3,100,000", "-3.2%"],
-                    ["Equity", "5,000,000", "4,200,000", "19.0%"],
-                ],
-            },
-        ]
-    
-    return tables
+    tables = table_encoding.decode_tables(table_data)
+    
+    if encoding == table_encoding.COLUMNAR:
+        return JSONResponse(table_encoding.encode_tables(tables))
+    
+    # Stored tables are already in the TableData shape; skip re-validating every cell
+    return JSONResponse(tables)
 
 @router.get("/{document_id}/ocr", response_model=Dict[str, Any])
 def get_ocr_text(
@@ -321,6 +371,75 @@ def get_ocr_text(
         "confidence": ocr_result.confidence,
     }
 
+@router.get("/{document_id}/ocr/pages", response_model=List[Dict[str, Any]])
+def get_ocr_pages(
+    *,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+    document_id: int,
+) -> Any:
+    """
+    List OCR pages of a document without their text
+    """
+    # Check if document exists and belongs to current user
+    document = db.query(Document).filter(
+        Document.id == document_id, Document.user_id == current_user.id
+    ).first()
+    
+    if not document:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found",
+        )
+    
+    pages = db.query(OCRPage.page_number, OCRPage.confidence, OCRPage.method).filter(
+        OCRPage.document_id == document_id
+    ).order_by(OCRPage.page_number).all()
+    
+    return [
+        {"page": page.page_number, "confidence": page.confidence, "method": page.method}
+        for page in pages
+    ]
+
+@router.get("/{document_id}/ocr/pages/{page_number}", response_model=Dict[str, Any])
+def get_ocr_page(
+    *,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+    document_id: int,
+    page_number: int,
+) -> Any:
+    """
+    Get OCR text of a single page
+    """
+    # Check if document exists and belongs to current user
+    document = db.query(Document).filter(
+        Document.id == document_id, Document.user_id == current_user.id
+    ).first()
+    
+    if not document:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found",
+        )
+    
+    page = db.query(OCRPage.page_number, OCRPage.text, OCRPage.confidence, OCRPage.method).filter(
+        OCRPage.document_id == document_id, OCRPage.page_number == page_number
+    ).first()
+    
+    if not page:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="OCR page not found",
+        )
+    
+    return {
+        "page": page.page_number,
+        "text": page.text,
+        "confidence": page.confidence,
+        "method": page.method,
+    }
+
 @router.post("/{document_id}/chat", response_model=ChatResponse)
 async def chat_with_document(
     *,
@@ -6,6 +6,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from app.api import deps
 from app.db.models import User, Document, Client
+from app.services import portfolio_service
 
 router = APIRouter()
 
@@ -74,4 +75,15 @@ async def get_ca_dashboard(
         "processedDocuments": processed_documents,
         "recentDocuments": formatted_documents,
         "recentClients": formatted_clients
-    }
\ No newline at end of file
+    }
+
+@router.get("/portfolio", response_model=Dict[str, Any])
+def get_portfolio_analytics(
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Get score bands, leverage percentiles and deteriorating clients
+    across all of the CA's clients
+    """
+    return portfolio_service.get_portfolio(db, current_user.id)
@@ -6,6 +6,7 @@ from app.api import deps
 from app.db.models import Client, Document, User
 from app.schemas.client import Client as ClientSchema, ClientCreate, ClientUpdate, ClientWithDocumentCount
 from app.schemas.document import DocumentWithClientName
+from app.services import timeseries_service, portfolio_service
 
 router = APIRouter()
 
@@ -104,6 +105,28 @@ def get_client(
     
     return client_dict
 
+@router.get("/{client_id}/financials", response_model=dict)
+def get_client_financials(
+    *,
+    db: Session = Depends(deps.get_db),
+    client_id: int,
+    current_user: User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Get a client's financial metrics by fiscal year with year-over-year changes
+    """
+    client = db.query(Client.id).filter(
+        Client.id == client_id, Client.ca_id == current_user.id
+    ).first()
+    
+    if not client:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Client not found",
+        )
+    
+    return timeseries_service.client_series(db, client_id)
+
 @router.put("/{client_id}", response_model=ClientSchema)
 def update_client(
     *,
@@ -169,6 +192,8 @@ def delete_client(
     db.delete(client)
     db.commit()
     
+    portfolio_service.invalidate(current_user.id)
+    
     return client
 
 @router.get("/{client_id}/documents", response_model=List[DocumentWithClientName])
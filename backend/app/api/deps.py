@@ -1,5 +1,5 @@
 from typing import Generator, Optional
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 from pydantic import ValidationError
@@ -7,16 +7,34 @@ from sqlalchemy.orm import Session
 from app.core.config import settings
 from app.core.security import verify_password
 from app.db.models import User, UserRole
-from app.db.session import get_db
+from app.db.session import SessionLocal, get_db
 from app.schemas.token import TokenPayload
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login", auto_error=False)
 
 _token_log_counter = 0
 
 def get_current_user(
     db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)
 ) -> User:
+    return _user_from_token(db, token)
+
+def get_stream_user(
+    token: Optional[str] = Depends(optional_oauth2_scheme), access_token: Optional[str] = Query(None)
+) -> User:
+    """
+    Current user for a long-lived stream. Browsers' EventSource cannot set
+    headers, so the token may also be passed as ?access_token=. The lookup
+    uses its own session so an open stream does not hold one.
+    """
+    db = SessionLocal()
+    try:
+        return _user_from_token(db, token or access_token)
+    finally:
+        db.close()
+
+def _user_from_token(db: Session, token: Optional[str]) -> User:
     global _token_log_counter
     
     try:
@@ -1,15 +1,28 @@
+import asyncio
+import json
 import os
 import uuid
+import redis
 from datetime import datetime
 from typing import Any, List, Optional
-from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, UploadFile, status
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, Request, UploadFile, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session, joinedload
+from starlette.concurrency import run_in_threadpool
 from app.api import deps
+from app.core import lanes
 from app.core.config import settings
 from app.db.models import Document, DocumentStatus, User, Client
-from app.schemas.document import Document as DocumentSchema, DocumentCreate, DocumentUpdate, DocumentWithClientName
+from app.db.session import SessionLocal
+from app.schemas.document import (
+    Document as DocumentSchema, DocumentBatchProcess, DocumentCreate, DocumentUpdate, DocumentWithClientName
+)
 from app.services import document_service
 from app.services import ocr_service
+from app.services import portfolio_service
+from app.services import progress_service
+from app.services import status_events
+from app.utils.file_handlers import count_pages
 
 router = APIRouter()
 
@@ -77,6 +90,9 @@ async def upload_document(
         client_id=client_id,
     )
     
+    # Classify by size so large reports do not hold up quick scans
+    page_count = await run_in_threadpool(count_pages, file_path)
+    
     # Add document to database
     document = Document(
         title=document_in.title,
@@ -86,6 +102,9 @@ async def upload_document(
         status=DocumentStatus.UPLOADED,
         client_id=document_in.client_id,
         user_id=current_user.id,
+        page_count=page_count,
+        file_size=file_size,
+        processing_lane=lanes.classify(page_count, file_size),
     )
     
     db.add(document)
@@ -129,6 +148,56 @@ def get_documents(
     
     return result
 
+def _processing_snapshot(user_id: int) -> List[dict]:
+    """
+    Current state of the user's documents that are being processed
+    """
+    db = SessionLocal()
+    try:
+        documents = db.query(Document).filter(
+            Document.user_id == user_id, Document.status == DocumentStatus.PROCESSING
+        ).all()
+        return [status_events.document_event(document) for document in documents]
+    finally:
+        db.close()
+
+async def _status_stream(request: Request, user_id: int):
+    queue = status_events.broadcaster.subscribe(user_id)
+    
+    try:
+        # Subscribed first so nothing between the snapshot and the first event is missed
+        snapshot = await run_in_threadpool(_processing_snapshot, user_id)
+        yield status_events.sse_message(json.dumps(snapshot), "snapshot")
+        
+        while not await request.is_disconnected():
+            try:
+                data = await asyncio.wait_for(queue.get(), timeout=settings.STATUS_STREAM_HEARTBEAT)
+            except asyncio.TimeoutError:
+                # Keeps proxies from closing an idle connection
+                yield ": keep-alive\n\n"
+                continue
+            
+            yield status_events.sse_message(data, "status")
+    
+    finally:
+        status_events.broadcaster.unsubscribe(user_id, queue)
+
+@router.get("/events")
+async def stream_document_status(
+    *,
+    request: Request,
+    current_user: User = Depends(deps.get_stream_user),
+) -> Any:
+    """
+    Server-Sent Events stream of the user's document status changes: a
+    "snapshot" of documents in progress, then a "status" event per change
+    """
+    return StreamingResponse(
+        _status_stream(request, current_user.id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @router.get("/{document_id}", response_model=DocumentWithClientName)
 def get_document(
     *,
@@ -224,6 +293,24 @@ async def process_document(
             detail=f"Error processing document: {str(e)}",
         )
 
+@router.post("/process-batch", response_model=dict, status_code=status.HTTP_202_ACCEPTED)
+def process_documents(
+    *,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+    batch_in: DocumentBatchProcess,
+) -> Any:
+    """
+    Queue many documents, by ID or all of a client's, for processing
+    """
+    if batch_in.document_ids is not None and len(batch_in.document_ids) > settings.BULK_PROCESS_MAX_DOCUMENTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Too many documents (maximum {settings.BULK_PROCESS_MAX_DOCUMENTS})",
+        )
+    
+    return document_service.queue_documents(db, current_user.id, batch_in.document_ids, batch_in.client_id)
+
 @router.get("/{document_id}/status", response_model=dict)
 def get_document_status(
     *,
@@ -247,9 +334,38 @@ def get_document_status(
     return {
         "documentId": document_id,
         "status": document.status,
+        "stage": document.processing_stage,
+        "lane": document.processing_lane,
         "processedAt": document.processed_at,
     }
 
+@router.get("/{document_id}/progress", response_model=dict)
+def get_document_progress(
+    *,
+    current_user: User = Depends(deps.get_current_user),
+    document_id: int,
+) -> Any:
+    """
+    Get a document's processing progress: stage, pages done and ETA
+    """
+    try:
+        progress = progress_service.get(document_id)
+    except redis.RedisError as e:
+        print(f"Progress store unavailable: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Progress is temporarily unavailable",
+        )
+    
+    # Read from the progress store alone; ownership is recorded with it
+    if not progress or progress.get("userId") != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No progress recorded for this document",
+        )
+    
+    return progress
+
 @router.delete("/{document_id}", response_model=dict)
 def delete_document(
     *,
@@ -282,6 +398,8 @@ def delete_document(
     db.delete(document)
     db.commit()
     
+    portfolio_service.invalidate(current_user.id)
+    
     return {
         "documentId": document_id,
         "message": "Document deleted successfully",
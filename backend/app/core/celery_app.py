@@ -1,16 +1,33 @@
 # backend/app/core/celery_app.py
 from celery import Celery
+from app.core import lanes
 from app.core.config import settings
 
 celery_app = Celery(
     "worker",
     broker=settings.REDIS_URL,
     backend=settings.REDIS_URL,
-    include=["app.tasks.document_processing"]
+    include=["app.tasks.document_processing", "app.tasks.scoring"]
 )
 
+# Pipeline tasks are sent to their document's lane when queued; these are
+# the defaults for anything queued without one. Workers must consume every
+# lane queue and "scoring" (see app.core.lanes)
 celery_app.conf.task_routes = {
-    "app.tasks.document_processing.*": {"queue": "document_processing"}
+    "app.tasks.document_processing.flush_ocr_batch": {"queue": lanes.queue_for(lanes.INTERACTIVE)},
+    "app.tasks.document_processing.complete_document": {"queue": lanes.queue_for(lanes.INTERACTIVE)},
+    "app.tasks.document_processing.process_documents": {"queue": lanes.queue_for(lanes.INTERACTIVE)},
+    "app.tasks.document_processing.*": {"queue": lanes.queue_for(lanes.STANDARD)},
+    "app.tasks.scoring.*": {"queue": "scoring"},
 }
 
-celery_app.conf.update(task_track_started=True)
\ No newline at end of file
+celery_app.conf.update(
+    task_track_started=True,
+    # Serve lanes in proportion to DOCUMENT_LANE_WEIGHTS rather than strictly in turn
+    broker_transport_options={"queue_order_strategy": "app.core.lanes:weighted_cycle"},
+    # Reserve one task at a time so quick jobs never wait behind a reserved long one;
+    # stages are checkpointed and OCR batches stay claimed until handed on, so
+    # redelivery after a worker crash is safe
+    worker_prefetch_multiplier=1,
+    task_acks_late=True,
+)
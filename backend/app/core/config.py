@@ -36,6 +36,61 @@ class Settings(BaseSettings):
     AI_API_URL: str = os.getenv("AI_API_URL", "https://api.openai.com/v1/chat/completions")
     AI_API_KEY: str = os.getenv("AI_API_KEY", "")
     
+    # OCR engine
+    # Threads OCRing the pages of one document concurrently; 1 OCRs them inline
+    OCR_WORKERS: int = int(os.getenv("OCR_WORKERS", os.cpu_count() or 1))
+    # "tesserocr" keeps Tesseract resident in each OCR thread, "pytesseract" spawns it per call,
+    # "auto" uses tesserocr when it is installed
+    OCR_ENGINE: str = os.getenv("OCR_ENGINE", "auto")
+    OCR_LANG: str = os.getenv("OCR_LANG", "eng")
+    # Minimum non-whitespace characters for a PDF page's text layer to be used instead of OCR
+    PDF_TEXT_MIN_CHARS: int = int(os.getenv("PDF_TEXT_MIN_CHARS", 20))
+    # Pages rasterized and held in memory at once; bounds peak memory per worker
+    OCR_PAGE_WINDOW: int = int(os.getenv("OCR_PAGE_WINDOW", 8))
+    # Grayscale/binarize/deskew pages before OCR; pages are rendered and resampled to OCR_TARGET_DPI
+    OCR_PREPROCESS: bool = os.getenv("OCR_PREPROCESS", "true").lower() == "true"
+    OCR_TARGET_DPI: int = int(os.getenv("OCR_TARGET_DPI", 300))
+    # Single-image documents are OCRed in cross-document batches of up to OCR_BATCH_SIZE,
+    # flushed after at most OCR_BATCH_MAX_WAIT seconds; a size of 1 disables batching
+    OCR_BATCH_SIZE: int = int(os.getenv("OCR_BATCH_SIZE", 16))
+    OCR_BATCH_MAX_WAIT: float = float(os.getenv("OCR_BATCH_MAX_WAIT", 2.0))
+    # Content-addressed OCR result cache shared by workers on a node; 0 disables it
+    OCR_CACHE_DIR: str = os.getenv("OCR_CACHE_DIR", "./ocr_cache")
+    OCR_CACHE_MAX_BYTES: int = int(os.getenv("OCR_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+    
+    # Processing pipeline
+    # Automatic retries of a failed pipeline stage (or page) before the document is marked failed
+    PIPELINE_MAX_RETRIES: int = int(os.getenv("PIPELINE_MAX_RETRIES", 3))
+    # Upper bound on documents queued by one bulk process request
+    BULK_PROCESS_MAX_DOCUMENTS: int = int(os.getenv("BULK_PROCESS_MAX_DOCUMENTS", 5000))
+    # Documents are sent to a lane (app.core.lanes) by size when uploaded: up to
+    # INTERACTIVE_MAX_PAGES and INTERACTIVE_MAX_BYTES is interactive, from BULK_MIN_PAGES
+    # or BULK_MIN_BYTES is bulk, anything between is standard
+    INTERACTIVE_MAX_PAGES: int = int(os.getenv("INTERACTIVE_MAX_PAGES", 2))
+    INTERACTIVE_MAX_BYTES: int = int(os.getenv("INTERACTIVE_MAX_BYTES", 2 * 1024 * 1024))
+    BULK_MIN_PAGES: int = int(os.getenv("BULK_MIN_PAGES", 50))
+    BULK_MIN_BYTES: int = int(os.getenv("BULK_MIN_BYTES", 5 * 1024 * 1024))
+    # Messages a worker takes from each lane in turn while several have work waiting
+    DOCUMENT_LANE_WEIGHTS: str = os.getenv("DOCUMENT_LANE_WEIGHTS", "interactive:6,standard:3,bulk:1")
+    # Status event streams: seconds between keep-alive comments on an idle stream, and
+    # events buffered per connection before a slow client starts missing them
+    STATUS_STREAM_HEARTBEAT: float = float(os.getenv("STATUS_STREAM_HEARTBEAT", 15.0))
+    STATUS_STREAM_QUEUE_SIZE: int = int(os.getenv("STATUS_STREAM_QUEUE_SIZE", 256))
+    # Seconds a document's progress is kept in Redis after its last update, and the
+    # number of recently completed documents whose pace the ETA is based on
+    PROGRESS_TTL: int = int(os.getenv("PROGRESS_TTL", 24 * 60 * 60))
+    PROGRESS_THROUGHPUT_SAMPLES: int = int(os.getenv("PROGRESS_THROUGHPUT_SAMPLES", 20))
+    
+    # Scoring
+    # "name" for the latest registered version, or "name:version" to pin one
+    CIBIL_SCORING_MODEL: str = os.getenv("CIBIL_SCORING_MODEL", "ratio")
+    # Analysis rows rescored and written back per transaction
+    RESCORE_CHUNK_SIZE: int = int(os.getenv("RESCORE_CHUNK_SIZE", 1000))
+    # Upper bound on scenarios one what-if simulation request may evaluate
+    CIBIL_SIMULATION_MAX_SCENARIOS: int = int(os.getenv("CIBIL_SIMULATION_MAX_SCENARIOS", 10000))
+    # Seconds a CA's portfolio analytics stay cached; writes invalidate them sooner
+    PORTFOLIO_CACHE_TTL: int = int(os.getenv("PORTFOLIO_CACHE_TTL", 3600))
+    
     class Config:
         case_sensitive = True
         env_file = ".env"
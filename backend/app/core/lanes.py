@@ -0,0 +1,72 @@
+from typing import Dict, Optional
+from kombu.utils.scheduling import round_robin_cycle
+from app.core.config import settings
+
+# Document processing lanes, from most to least latency sensitive. Each
+# lane is its own queue; workers consume all of them and the scoring queue, e.g.
+#   celery -A app.core.celery_app worker \
+#       -Q document_processing.interactive,document_processing.standard,document_processing.bulk,scoring
+INTERACTIVE = "interactive"
+STANDARD = "standard"
+BULK = "bulk"
+LANES = (INTERACTIVE, STANDARD, BULK)
+
+def queue_for(lane: Optional[str]) -> str:
+    """
+    Queue a lane's tasks are sent to; unknown lanes use the standard one
+    """
+    return f"document_processing.{lane if lane in LANES else STANDARD}"
+
+def classify(page_count: Optional[int], file_size: int) -> str:
+    """
+    Lane for a document of the given size. Documents whose page count is
+    unknown are classified by file size alone.
+    """
+    if file_size >= settings.BULK_MIN_BYTES or (page_count or 0) >= settings.BULK_MIN_PAGES:
+        return BULK
+    if file_size <= settings.INTERACTIVE_MAX_BYTES and page_count is not None \
+            and page_count <= settings.INTERACTIVE_MAX_PAGES:
+        return INTERACTIVE
+    return STANDARD
+
+def lane_weights(spec: Optional[str] = None) -> Dict[str, int]:
+    """
+    Queue weights from a "lane:weight,..." spec, DOCUMENT_LANE_WEIGHTS by default
+    """
+    weights = {}
+    for item in (spec if spec is not None else settings.DOCUMENT_LANE_WEIGHTS).split(","):
+        lane, _, weight = item.strip().partition(":")
+        if lane:
+            weights[queue_for(lane)] = max(1, int(weight or 1))
+    return weights
+
+class weighted_cycle(round_robin_cycle):
+    """
+    Queue order for the Redis transport that gives each queue up to its
+    weight in consecutive messages before the next queue goes first. The
+    worker pops from the first non-empty queue in order, so an idle lane
+    costs the others nothing and a busy bulk lane cannot starve the
+    interactive one. Queues without a weight count as 1.
+    """
+
+    def __init__(self, it=None):
+        super().__init__(it)
+        self.weights = lane_weights()
+        self.served: Dict[str, int] = {}
+
+    def update(self, it):
+        """
+        Start with the heaviest queue first
+        """
+        super().update(sorted(it, key=lambda queue: -self.weights.get(queue, 1)))
+
+    def rotate(self, last_used):
+        """
+        Count a message from last_used; once its share is used up, send it
+        to the back of the line
+        """
+        self.served[last_used] = self.served.get(last_used, 0) + 1
+        if self.served[last_used] >= self.weights.get(last_used, 1):
+            self.served[last_used] = 0
+            super().rotate(last_used)
+        return last_used
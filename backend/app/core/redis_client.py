@@ -0,0 +1,15 @@
+import redis
+from app.core.config import settings
+
+_redis = None
+
+def get_redis() -> redis.Redis:
+    """
+    Return a shared Redis client for REDIS_URL
+    """
+    global _redis
+    
+    if _redis is None:
+        _redis = redis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
+    
+    return _redis
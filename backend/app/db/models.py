@@ -1,6 +1,6 @@
 import enum
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Float, Text, DateTime, ForeignKey, Enum, JSON, Boolean
+from sqlalchemy import Column, Integer, String, Float, Text, DateTime, ForeignKey, Enum, JSON, Boolean, UniqueConstraint
 from sqlalchemy.orm import relationship
 from app.db.session import Base
 
@@ -47,6 +47,7 @@ class Client(Base):
     # Relationships
     ca = relationship("User", back_populates="clients")
     documents = relationship("Document", back_populates="client", cascade="all, delete-orphan")
+    financial_periods = relationship("ClientFinancialPeriod", back_populates="client", order_by="ClientFinancialPeriod.fiscal_year", cascade="all, delete-orphan")
 
 class Document(Base):
     __tablename__ = "documents"
@@ -61,6 +62,13 @@ class Document(Base):
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     processed_at = Column(DateTime)
+    # Last processing pipeline stage whose output was saved; a retried or
+    # restarted run resumes after it
+    processing_stage = Column(String(20))
+    # Size at upload and the processing lane chosen from it (app.core.lanes)
+    page_count = Column(Integer)
+    file_size = Column(Integer)
+    processing_lane = Column(String(20), default="standard", server_default="standard", nullable=False)
     
     # Relationships
     client = relationship("Client", back_populates="documents")
@@ -68,6 +76,8 @@ class Document(Base):
     analysis = relationship("Analysis", back_populates="document", uselist=False, cascade="all, delete-orphan")
     extracted_data = relationship("ExtractedData", back_populates="document", uselist=False, cascade="all, delete-orphan")
     ocr_result = relationship("OCRResult", back_populates="document", uselist=False, cascade="all, delete-orphan")
+    ocr_pages = relationship("OCRPage", back_populates="document", order_by="OCRPage.page_number", cascade="all, delete-orphan")
+    financial_periods = relationship("ClientFinancialPeriod", back_populates="document", cascade="all, delete-orphan")
 
 class Analysis(Base):
     __tablename__ = "analyses"
@@ -75,6 +85,9 @@ class Analysis(Base):
     id = Column(Integer, primary_key=True, index=True)
     document_id = Column(Integer, ForeignKey("documents.id"), unique=True, nullable=False)
     cibil_score = Column(Float)
+    # Scoring model ("name:version") that produced cibil_score. Scores from
+    # before models were versioned all came from ratio:1.
+    cibil_model = Column(String(50), default="ratio:1", server_default="ratio:1", nullable=False)
     summary = Column(Text)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     
@@ -87,6 +100,8 @@ class ExtractedData(Base):
     id = Column(Integer, primary_key=True, index=True)
     document_id = Column(Integer, ForeignKey("documents.id"), unique=True, nullable=False)
     table_data = Column(JSON)
+    # "rows" (headers and row lists) or "columnar" (app.utils.table_encoding)
+    table_format = Column(String(20), default="rows", server_default="rows", nullable=False)
     json_data = Column(JSON)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     
@@ -103,4 +118,47 @@ class OCRResult(Base):
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     
     # Relationships
-    document = relationship("Document", back_populates="ocr_result")
\ No newline at end of file
+    document = relationship("Document", back_populates="ocr_result")
+
+class OCRPage(Base):
+    __tablename__ = "ocr_pages"
+    __table_args__ = (UniqueConstraint("document_id", "page_number"),)
+    
+    id = Column(Integer, primary_key=True, index=True)
+    document_id = Column(Integer, ForeignKey("documents.id"), nullable=False, index=True)
+    page_number = Column(Integer, nullable=False)
+    text = Column(Text)
+    confidence = Column(Float)
+    method = Column(String(20), nullable=False)  # "native" or "ocr"
+    page_hash = Column(String(64), nullable=False)
+    ocr_config = Column(String(64), nullable=False)
+    words = Column(JSON)
+    tables = Column(JSON)  # Cells of the tables read while OCRing the page; null when not read then
+    disk_write_bytes = Column(Integer)  # Written to storage while rasterizing and OCRing the page
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    # Relationships
+    document = relationship("Document", back_populates="ocr_pages")
+
+class ClientFinancialPeriod(Base):
+    __tablename__ = "client_financial_periods"
+    __table_args__ = (UniqueConstraint("client_id", "fiscal_year"),)
+    
+    id = Column(Integer, primary_key=True, index=True)
+    client_id = Column(Integer, ForeignKey("clients.id"), nullable=False, index=True)
+    # Year the financial year ends in, e.g. 2023 for FY 2022-23
+    fiscal_year = Column(Integer, nullable=False)
+    # Most recently processed document reporting this period
+    document_id = Column(Integer, ForeignKey("documents.id"), nullable=False)
+    income = Column(Float)
+    expenses = Column(Float)
+    assets = Column(Float)
+    liabilities = Column(Float)
+    # Score when the period was recorded; series read the current score from
+    # the document's analysis, which follows rescoring
+    cibil_score = Column(Float)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    
+    # Relationships
+    client = relationship("Client", back_populates="financial_periods")
+    document = relationship("Document", back_populates="financial_periods")
@@ -30,7 +30,7 @@ def create_tables():
     Create database tables
     """
     # Import models here to avoid circular imports
-    from app.db.models import User, Client, Document, Analysis, ExtractedData, OCRResult
+    from app.db.models import User, Client, Document, Analysis, ExtractedData, OCRResult, OCRPage, ClientFinancialPeriod
     
     # Create upload directory if it doesn't exist
     os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
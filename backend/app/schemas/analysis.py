@@ -1,5 +1,6 @@
-from typing import Any, Dict, List, Optional
-from pydantic import BaseModel
+from typing import Any, Dict, List, Optional, Union
+from pydantic import BaseModel, Field, conlist, root_validator, validator
+from app.core.config import settings
 
 class AnalysisBase(BaseModel):
     document_id: int
@@ -76,6 +77,60 @@ class CibilInput(BaseModel):
 class CibilScore(BaseModel):
     score: int
     extractedData: Dict[str, Any]
+    model: Optional[str] = None
+
+class ScenarioRange(BaseModel):
+    start: float
+    stop: float
+    # Expanded while the request is validated, so bounded before any list is built
+    steps: int = Field(..., ge=1, le=settings.CIBIL_SIMULATION_MAX_SCENARIOS)
+
+    def values(self) -> List[float]:
+        if self.steps == 1:
+            return [self.start]
+        step = (self.stop - self.start) / (self.steps - 1)
+        return [self.start + i * step for i in range(self.steps)]
+
+# Explicit values for one figure, bounded like a range's steps
+ScenarioValues = conlist(float, max_items=settings.CIBIL_SIMULATION_MAX_SCENARIOS)
+
+class CibilSimulationInput(BaseModel):
+    """
+    Figures to vary, each as a list of values or an evenly spaced range.
+    Fields left out keep the document's extracted value; the scenarios
+    are every combination of the given values, at most
+    CIBIL_SIMULATION_MAX_SCENARIOS of them.
+    """
+    income: Optional[Union[ScenarioRange, ScenarioValues]] = None
+    expenses: Optional[Union[ScenarioRange, ScenarioValues]] = None
+    assets: Optional[Union[ScenarioRange, ScenarioValues]] = None
+    liabilities: Optional[Union[ScenarioRange, ScenarioValues]] = None
+
+    @validator("income", "expenses", "assets", "liabilities")
+    def expand_range(cls, value):
+        if isinstance(value, ScenarioRange):
+            return value.values()
+        if value is not None and not value:
+            raise ValueError("must contain at least one value")
+        return value
+
+    @root_validator(skip_on_failure=True)
+    def limit_scenarios(cls, values):
+        scenario_count = 1
+        for axis in values.values():
+            if axis is not None:
+                scenario_count *= len(axis)
+        if scenario_count > settings.CIBIL_SIMULATION_MAX_SCENARIOS:
+            raise ValueError(
+                f"Too many scenarios: {scenario_count} (maximum {settings.CIBIL_SIMULATION_MAX_SCENARIOS})"
+            )
+        return values
+
+class CibilSimulation(BaseModel):
+    model: str
+    baseline: Dict[str, Any]
+    axes: Dict[str, List[float]]
+    scores: Any  # Nested lists, one level per axis in the order of axes
 
 class TableData(BaseModel):
     id: int
@@ -1,6 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, validator
 from app.db.models import DocumentStatus
-from typing import Optional, Union
+from typing import List, Optional, Union
 from datetime import datetime
 
 class DocumentBase(BaseModel):
@@ -26,6 +26,8 @@ class DocumentInDBBase(DocumentBase):
     user_id: int
     created_at: Union[str, datetime]
     processed_at: Optional[Union[str, datetime]] = None
+    page_count: Optional[int] = None
+    processing_lane: Optional[str] = None
 
     class Config:
         orm_mode = True
@@ -37,4 +39,17 @@ class Document(DocumentInDBBase):
     pass
 
 class DocumentWithClientName(Document):
-    client_name: Optional[str] = None
\ No newline at end of file
+    client_name: Optional[str] = None
+
+class DocumentBatchProcess(BaseModel):
+    """
+    Documents to process: either explicit IDs or every document of a client
+    """
+    document_ids: Optional[List[int]] = None
+    client_id: Optional[int] = None
+
+    @validator("client_id", always=True)
+    def one_selection(cls, value, values):
+        if (value is None) == (values.get("document_ids") is None):
+            raise ValueError("Provide either document_ids or client_id")
+        return value
@@ -1,8 +1,14 @@
 import io
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 import random
+import numpy as np
 from sqlalchemy.orm import Session
+from app.core.config import settings
 from app.db.models import Document, Analysis, ExtractedData, OCRResult
+from app.services import scoring_models
+
+# Fields calculate_cibil_score reads from extracted financial data
+CIBIL_FIELDS = ("income", "expenses", "assets", "liabilities")
 
 async def generate_summary(text: str, extracted_data: Dict[str, Any]) -> str:
     """
@@ -70,6 +76,147 @@ def calculate_cibil_score(financial_data: Dict[str, Any]) -> float:
         print(f"Error calculating CIBIL score: {str(e)}")
         return 600  # Default score on error
 
+def calculate_cibil_scores(
+    income: np.ndarray, expenses: np.ndarray, assets: np.ndarray, liabilities: np.ndarray
+) -> np.ndarray:
+    """
+    Vectorized calculate_cibil_score over equal-length arrays. Rows with
+    NaN in any input, or without positive income and assets, get the
+    default score of 600, as the scalar version does.
+    """
+    income, expenses, assets, liabilities = (
+        np.asarray(values, dtype=np.float64) for values in (income, expenses, assets, liabilities)
+    )
+    
+    valid = ~(np.isnan(income) | np.isnan(expenses) | np.isnan(assets) | np.isnan(liabilities))
+    valid &= (income > 0) & (assets > 0)
+    
+    # Invalid rows are replaced below; silence their division warnings
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dti_ratio = expenses / income
+        dta_ratio = liabilities / assets
+    
+    final_score = 750 + np.maximum(0, 1 - dti_ratio) * 100 + np.maximum(0, 1 - dta_ratio) * 100
+    final_score = np.clip(final_score, 300, 900)
+    
+    return np.where(valid, final_score, 600.0)
+
+def _cibil_input(value: Any) -> float:
+    # Non-numeric values make the scalar scorer fall back to its default
+    return float(value) if isinstance(value, (int, float)) else np.nan
+
+# The formula above, registered so stored scores can record it
+RATIO_MODEL = scoring_models.register_model(scoring_models.ScoringModel("ratio", 1, calculate_cibil_scores))
+
+def score_financial_data(
+    records: List[Optional[Dict[str, Any]]], model: Optional[scoring_models.ScoringModel] = None
+) -> np.ndarray:
+    """
+    CIBIL scores for many extracted-data dicts in one vectorized call,
+    using the active scoring model unless one is given
+    """
+    model = model or scoring_models.active_model()
+    records = [record or {} for record in records]
+    columns = [
+        np.fromiter((_cibil_input(record.get(field, 0)) for record in records), np.float64, len(records))
+        for field in CIBIL_FIELDS
+    ]
+    return model.score_arrays(*columns)
+
+def score_with_active_model(financial_data: Dict[str, Any]) -> Tuple[float, str]:
+    """
+    Score one set of financial data, returning the score and the key of
+    the model that produced it for storing alongside
+    """
+    model = scoring_models.active_model()
+    return float(score_financial_data([financial_data], model)[0]), model.key
+
+def simulate_cibil_scores(
+    financial_data: Optional[Dict[str, Any]], axes: Dict[str, List[float]]
+) -> Tuple[float, np.ndarray]:
+    """
+    Score every combination of the values in axes, other fields keeping
+    their value in financial_data, in one vectorized call. Returns the
+    baseline score and an array with one dimension per axis, in the order
+    of axes. Nothing is stored.
+    """
+    model = scoring_models.active_model()
+    financial_data = financial_data or {}
+    base = {field: _cibil_input(financial_data.get(field, 0)) for field in CIBIL_FIELDS}
+    baseline = float(model.score_arrays(*(np.array([base[field]]) for field in CIBIL_FIELDS))[0])
+    
+    grids = np.meshgrid(*(np.asarray(values, dtype=np.float64) for values in axes.values()), indexing="ij")
+    shape = grids[0].shape if grids else ()
+    columns = dict(zip(axes, (grid.ravel() for grid in grids)))
+    size = int(np.prod(shape))
+    scores = model.score_arrays(*(
+        columns[field] if field in columns else np.full(size, base[field])
+        for field in CIBIL_FIELDS
+    ))
+    
+    return baseline, scores.reshape(shape)
+
+def refresh_scores(db: Session, analyses: List[Analysis]) -> List[Analysis]:
+    """
+    Recompute, in one batch, the scores of analyses produced by a model
+    other than the active one. Current scores are left untouched, so a
+    formula change costs nothing until a score is next read.
+    """
+    model = scoring_models.active_model()
+    stale = [analysis for analysis in analyses if analysis.cibil_model != model.key]
+    if not stale:
+        return analyses
+    
+    json_data = dict(
+        db.query(ExtractedData.document_id, ExtractedData.json_data)
+        .filter(ExtractedData.document_id.in_([analysis.document_id for analysis in stale]))
+        .all()
+    )
+    scores = score_financial_data([json_data.get(analysis.document_id) for analysis in stale], model)
+    for analysis, score in zip(stale, scores):
+        analysis.cibil_score = float(score)
+        analysis.cibil_model = model.key
+    db.commit()
+    
+    return analyses
+
+def rescore_analyses(db: Session, chunk_size: Optional[int] = None) -> int:
+    """
+    Recompute every stale CIBIL score ahead of reads, chunk by chunk,
+    writing each chunk back with one bulk update. Returns the number of
+    rows rescored.
+    """
+    chunk_size = chunk_size or settings.RESCORE_CHUNK_SIZE
+    model = scoring_models.active_model()
+    last_id = 0
+    rescored = 0
+    
+    while True:
+        # Keyset pagination keeps each chunk query cheap on large tables
+        rows = (
+            db.query(Analysis.id, ExtractedData.json_data)
+            .outerjoin(ExtractedData, ExtractedData.document_id == Analysis.document_id)
+            .filter(Analysis.id > last_id)
+            .filter(Analysis.cibil_model != model.key)
+            .order_by(Analysis.id)
+            .limit(chunk_size)
+            .all()
+        )
+        if not rows:
+            break
+        
+        scores = score_financial_data([json_data for _, json_data in rows], model)
+        db.bulk_update_mappings(Analysis, [
+            {"id": analysis_id, "cibil_score": float(score), "cibil_model": model.key}
+            for (analysis_id, _), score in zip(rows, scores)
+        ])
+        db.commit()
+        
+        rescored += len(rows)
+        last_id = rows[-1][0]
+    
+    return rescored
+
 def extract_key_findings(summary: str) -> List[str]:
     """
     Extract key findings from summary
@@ -1,11 +1,15 @@
 import os
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
+from sqlalchemy import update
 from sqlalchemy.orm import Session
-from app.db.models import Document, Analysis, ExtractedData, OCRResult
-from app.services import ocr_service, analysis_service
+from app.core import lanes
+from app.db.models import Document, DocumentStatus, Analysis, ExtractedData, OCRResult
+from app.services import ocr_service, analysis_service, status_events
+from app.utils import table_encoding
 
 # Update backend/app/services/document_service.py
 from app.tasks.document_processing import process_document as process_document_task
+from app.tasks.document_processing import process_documents as process_documents_task
 
 async def process_document(db: Session, document: Document) -> Dict[str, Any]:
     """
@@ -21,7 +25,7 @@ async def process_document(db: Session, document: Document) -> Dict[str, Any]:
     db.commit()
     
     # Launch the processing task asynchronously
-    process_document_task.delay(document.id)
+    process_document_task.apply_async((document.id,), queue=lanes.queue_for(document.processing_lane))
     
     # Return initial response
     return {
@@ -29,6 +33,55 @@ async def process_document(db: Session, document: Document) -> Dict[str, Any]:
         "status": "processing",
         "message": "Document processing started",
     }
+
+def queue_documents(
+    db: Session, user_id: int, document_ids: Optional[List[int]] = None, client_id: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Queue many of a user's documents for processing with one ownership
+    query, one UPDATE and one task message. Documents that are missing,
+    belong to someone else, or are already processing or completed are
+    reported rather than queued.
+    """
+    query = db.query(Document.id, Document.status).filter(Document.user_id == user_id)
+    if document_ids is not None:
+        query = query.filter(Document.id.in_(document_ids))
+    else:
+        query = query.filter(Document.client_id == client_id)
+    statuses = dict(query.all())
+    
+    skipped = (DocumentStatus.PROCESSING, DocumentStatus.COMPLETED)
+    candidates = [document_id for document_id, status in statuses.items() if status not in skipped]
+    queued = []
+    if candidates:
+        # Re-checking the status makes a concurrent request's documents drop out here
+        queued = sorted(db.execute(
+            update(Document)
+            .where(Document.id.in_(candidates), Document.status.notin_(skipped))
+            .values(status=DocumentStatus.PROCESSING)
+            .returning(Document.id)
+            .execution_options(synchronize_session=False)
+        ).scalars())
+        db.commit()
+    
+    if queued:
+        status_events.publish(user_id, *(
+            status_events.event(document_id, DocumentStatus.PROCESSING) for document_id in queued
+        ))
+        process_documents_task.delay(queued)
+    
+    queued_ids = set(queued)
+    return {
+        "queued": queued,
+        "alreadyProcessing": sorted(
+            document_id for document_id, status in statuses.items()
+            if status == DocumentStatus.PROCESSING or (document_id in candidates and document_id not in queued_ids)
+        ),
+        "alreadyCompleted": sorted(
+            document_id for document_id, status in statuses.items() if status == DocumentStatus.COMPLETED
+        ),
+        "notFound": sorted(set(document_ids or []) - set(statuses)),
+    }
     
 # async def process_document(db: Session, document: Document) -> Dict[str, Any]:
 #     """
@@ -104,13 +157,15 @@ def get_analysis_results(db: Session, document_id: int) -> Dict[str, Any]:
     if not analysis or not extracted_data or not ocr_result:
         return {}
     
+    analysis_service.refresh_scores(db, [analysis])
+    
     return {
         "analysis": {
             "cibilScore": analysis.cibil_score,
             "summary": analysis.summary,
         },
         "extractedData": extracted_data.json_data,
-        "tableData": extracted_data.table_data,
+        "tableData": {"tables": table_encoding.decode_tables(extracted_data.table_data)},
         "ocrText": ocr_result.text[:500] + "...",  # Truncated for response
         "confidence": ocr_result.confidence,
     }
\ No newline at end of file
@@ -0,0 +1,276 @@
+import re
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+from app.utils.number_parsing import detect_scale, parse_amounts
+
+# Line-item synonyms per field, most specific first; earlier synonyms win
+# when several appear in the same document
+FINANCIAL_LEXICON = {
+    "income": [
+        "revenue from operations", "total revenue", "total income", "net sales",
+        "gross receipts", "turnover", "revenue", "sales", "income",
+    ],
+    "expenses": [
+        "total expenses", "total expenditure", "operating expenses",
+        "expenditure", "expenses", "expense", "cost",
+    ],
+    "assets": [
+        "total assets", "total application of funds", "total non-current assets",
+        "assets",
+    ],
+    "liabilities": [
+        "total liabilities", "total borrowings", "total debt", "borrowings",
+        "liabilities",
+    ],
+}
+
+DEFAULT_FINANCIAL_DATA = {
+    "income": 500000,
+    "expenses": 300000,
+    "assets": 2000000,
+    "liabilities": 1000000,
+}
+
+# Characters either side of a term searched for its figure
+NUMBER_WINDOW = 50
+
+# Term -> (field, rank). Multi-word terms match across any whitespace.
+_TERMS = {
+    term: (field, rank)
+    for field, terms in FINANCIAL_LEXICON.items()
+    for rank, term in enumerate(terms)
+}
+
+# One alternation over every synonym, longest first so "total revenue" is
+# preferred over "revenue" at the same position
+_LEXICON_RE = re.compile(
+    r"\b(?:"
+    + "|".join(
+        r"\s+".join(map(re.escape, term.split()))
+        for term in sorted(_TERMS, key=len, reverse=True)
+    )
+    + r")\b"
+)
+
+# A figure with its currency prefix, brackets, "/-" close and any unit
+# suffix or Cr/Dr mark, so the whole token can be handed to parse_amounts
+NUMBER_RE = re.compile(
+    r"\(?-?\s*(?:₹|rs\.?|inr|[$€£])?\s*-?\d+(?:[,.]\d+)*\)?(?:/-)?"
+    r"(?:\s*(?:lakhs?|lacs?|crores?|cr|dr)\b)?",
+    re.IGNORECASE,
+)
+
+# A word that is a figure on its own, optionally bracketed or signed
+_AMOUNT_WORD_RE = re.compile(r"[(\-]?[₹$€£]?\d[\d,]*(?:\.\d+)?\)?")
+# Column headers such as 2023 or 31.03.2023
+_YEAR_RE = re.compile(r"(?:\d{1,2}[./-]\d{1,2}[./-])?((?:19|20)\d{2})")
+# Note references are short bare integers
+_NOTE_RE = re.compile(r"\d{1,3}")
+# Text just before a note reference's number, as in "(Note 21)" or "(Refer Note No. 4)"
+_NOTE_PREFIX_RE = re.compile(r"\bnote\s*(?:no\.?\s*)?$", re.IGNORECASE)
+
+# "year ended 31st March, 2023", "period ended on 31.03.2023"
+_YEAR_ENDED_RE = re.compile(
+    r"(?:year|period)\s+end(?:ed|ing)\s+(?:on\s+)?[^\n]{0,25}?((?:19|20)\d{2})\b", re.IGNORECASE
+)
+# "FY 2022-23", "F.Y. 2022/2023"
+_FY_RE = re.compile(r"\bF\.?\s?Y\.?\s*((?:19|20)\d{2})\s*[-–/]\s*(\d{2}|(?:19|20)\d{2})\b", re.IGNORECASE)
+# Characters from the top of the document searched for a bare year
+FISCAL_YEAR_HEADER_CHARS = 3000
+
+def detect_fiscal_year(text: str) -> Optional[int]:
+    """
+    Year in which the reporting period of a statement ends: from "year
+    ended ..." or "FY 2022-23" phrases, else the latest plausible year
+    near the top of the document. None if no year is found.
+    """
+    match = _YEAR_ENDED_RE.search(text)
+    if match:
+        return int(match.group(1))
+    
+    match = _FY_RE.search(text)
+    if match:
+        start, end = int(match.group(1)), match.group(2)
+        if len(end) == 4:
+            return int(end)
+        # Two-digit end years roll over the century, as in FY 1999-00
+        return start - start % 100 + int(end) + (100 if int(end) < start % 100 else 0)
+    
+    years = [
+        int(match.group(1))
+        for match in re.finditer(r"(?<!\d)((?:19|20)\d{2})(?!\d)", text[:FISCAL_YEAR_HEADER_CHARS])
+    ]
+    return max(years) if years else None
+
+def scan_terms(lowered: str) -> List[Tuple[str, int, int, int]]:
+    """
+    Find every lexicon term in already-lowercased text in a single pass.
+    Returns (field, rank, start, end) tuples in text order.
+    """
+    matches = []
+    for match in _LEXICON_RE.finditer(lowered):
+        field, rank = _TERMS[" ".join(match.group().split())]
+        matches.append((field, rank, match.start(), match.end()))
+    return matches
+
+def _is_figure(text: str, match: re.Match) -> bool:
+    """
+    Whether a number is an amount rather than a year or a note reference
+    """
+    if _YEAR_RE.fullmatch(match.group().strip("() ")):
+        return False
+    return not _NOTE_PREFIX_RE.search(text, max(0, match.start() - 12), match.start())
+
+def _number_near(text: str, start: int, end: int) -> Optional[str]:
+    """
+    First figure after a term, else the nearest one before it. Years and
+    note references are skipped.
+    """
+    for match in NUMBER_RE.finditer(text, end, min(len(text), end + NUMBER_WINDOW)):
+        if _is_figure(text, match):
+            return match.group()
+
+    before = [
+        match.group() for match in NUMBER_RE.finditer(text, max(0, start - NUMBER_WINDOW), start)
+        if _is_figure(text, match)
+    ]
+    return before[-1] if before else None
+
+def _best_by_rank(candidates: List[Tuple[str, int, str]], scale: float) -> Dict[str, float]:
+    """
+    Parse every candidate figure in one call and keep, per field, the value
+    of the most specific synonym that yielded a number
+    """
+    values = parse_amounts([raw for _, _, raw in candidates], scale)
+    best = {}
+    for (field, rank, _), value in zip(candidates, values):
+        if not np.isnan(value) and (field not in best or rank < best[field][0]):
+            best[field] = (rank, float(value))
+    return {field: value for field, (_, value) in best.items()}
+
+def _cluster(values: np.ndarray, tolerance: float) -> np.ndarray:
+    """
+    Label 1-D positions so values closer than tolerance to their sorted
+    neighbour share a cluster. Cluster ids increase with position.
+    """
+    order = np.argsort(values, kind="stable")
+    breaks = np.diff(values[order]) > tolerance
+    sorted_ids = np.concatenate(([0], np.cumsum(breaks)))
+    ids = np.empty_like(sorted_ids)
+    ids[order] = sorted_ids
+    return ids
+
+def _value_column(columns: np.ndarray, texts: List[str], is_amount: np.ndarray,
+                  header_rows: np.ndarray) -> Optional[int]:
+    """
+    Pick the column holding current-period figures: the one headed by the
+    latest year, else the leftmost column that is not note references
+    """
+    candidates = []
+    for column in np.unique(columns[is_amount]):
+        in_column = (columns == column) & is_amount
+        body = in_column & ~header_rows
+        if not body.any():
+            continue
+        body_texts = [texts[i] for i in np.flatnonzero(body)]
+        if np.mean([bool(_NOTE_RE.fullmatch(t)) for t in body_texts]) >= 0.8:
+            continue
+        years = [
+            int(_YEAR_RE.fullmatch(texts[i]).group(1))
+            for i in np.flatnonzero(in_column & header_rows)
+        ]
+        candidates.append((-(max(years) if years else 0), column))
+
+    return min(candidates)[1] if candidates else None
+
+def extract_from_words(words: List[Dict[str, Any]]) -> Dict[str, float]:
+    """
+    Pair line-item labels with figures using word boxes from one page.
+    Words are clustered into rows by vertical centre and figures into
+    columns by right edge; each labelled row takes its figure from the
+    current-period column rather than the first number it contains.
+    """
+    if not words:
+        return {}
+
+    texts = [word["text"].strip() for word in words]
+    left = np.array([word["left"] for word in words], dtype=np.float64)
+    top = np.array([word["top"] for word in words], dtype=np.float64)
+    width = np.array([word["width"] for word in words], dtype=np.float64)
+    height = np.array([word["height"] for word in words], dtype=np.float64)
+    right = left + width
+
+    rows = _cluster(top + height / 2, 0.5 * max(float(np.median(height)), 1.0))
+
+    is_year = np.array([bool(_YEAR_RE.fullmatch(t)) for t in texts])
+    is_amount = np.array([bool(_AMOUNT_WORD_RE.fullmatch(t)) for t in texts]) | is_year
+    if not is_amount.any():
+        return {}
+
+    # Rows whose figures are all years are column headers
+    amount_rows = np.unique(rows[is_amount])
+    header_row_ids = [
+        row for row in amount_rows
+        if is_year[(rows == row) & is_amount].all()
+    ]
+    header_rows = np.isin(rows, header_row_ids)
+
+    char_width = float(np.median(width / np.maximum([len(t) for t in texts], 1)))
+    columns = np.full(len(words), -1)
+    columns[is_amount] = _cluster(right[is_amount], max(2 * char_width, 1.0))
+
+    value_column = _value_column(columns, texts, is_amount, header_rows)
+    if value_column is None:
+        return {}
+
+    candidates = []
+    order = np.lexsort((left, rows))
+    row_starts = np.flatnonzero(np.diff(rows[order], prepend=-1))
+    for indices in np.split(order, row_starts[1:]):
+        if header_rows[indices[0]]:
+            continue
+        values = indices[columns[indices] == value_column]
+        if values.size == 0:
+            continue
+        first_figure = left[indices][is_amount[indices]].min()
+        label = " ".join(texts[i] for i in indices if not is_amount[i] and left[i] < first_figure)
+        terms = scan_terms(label.lower())
+        if terms:
+            field, rank, _, _ = min(terms, key=lambda term: term[1])
+            candidates.append((field, rank, texts[values[0]]))
+
+    return _best_by_rank(candidates, detect_scale(" ".join(texts)))
+
+def extract_from_layout(pages: List[Dict[str, Any]]) -> Dict[str, float]:
+    """
+    Layout-based figures across pages; earlier pages win for each field
+    """
+    financial_data = {}
+    for page in pages:
+        for field, value in extract_from_words(page.get("words") or []).items():
+            financial_data.setdefault(field, value)
+    return financial_data
+
+def extract_financial_data(text: str, pages: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """
+    Extract headline financial figures from document text. Figures read
+    from the page layout take precedence; otherwise each field takes the
+    figure next to its most specific synonym found in the text, and fields
+    with no figure fall back to defaults. Figures are normalised to rupees
+    by parse_amounts, honouring unit headers such as "(₹ in lakhs)".
+    """
+    candidates = []
+    for field, rank, start, end in scan_terms(text.lower()):
+        raw = _number_near(text, start, end)
+        if raw:
+            candidates.append((field, rank, raw))
+
+    financial_data = _best_by_rank(candidates, detect_scale(text))
+    if pages:
+        financial_data.update(extract_from_layout(pages))
+
+    # If data is missing, provide defaults
+    for field, default in DEFAULT_FINANCIAL_DATA.items():
+        financial_data.setdefault(field, default)
+
+    return financial_data
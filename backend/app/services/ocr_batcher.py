@@ -0,0 +1,50 @@
+from typing import List
+from app.core.redis_client import get_redis
+
+PENDING_KEY = "ocr:batch:pending"
+# Documents taken by a flush task stay here, keyed by its task ID, until
+# their results are handed back, so a redelivered or retried flush finds
+# the same batch again
+CLAIMED_KEY = "ocr:batch:claimed:{batch_id}"
+
+def enqueue(*document_ids: int) -> int:
+    """
+    Queue single-page documents for batched OCR. Returns the number of
+    documents now waiting.
+    """
+    return get_redis().rpush(PENDING_KEY, *document_ids)
+
+def claim_batch(batch_id: str, size: int) -> List[int]:
+    """
+    The documents claimed under batch_id, or if there are none, up to
+    size queued documents moved atomically into a new claim, oldest first
+    """
+    cache = get_redis()
+    claimed_key = CLAIMED_KEY.format(batch_id=batch_id)
+
+    document_ids = cache.lrange(claimed_key, 0, -1)
+    if not document_ids:
+        pipe = cache.pipeline(transaction=True)
+        for _ in range(size):
+            pipe.lmove(PENDING_KEY, claimed_key, "LEFT", "RIGHT")
+        document_ids = [document_id for document_id in pipe.execute() if document_id is not None]
+
+    return [int(document_id) for document_id in document_ids]
+
+def claimed(batch_id: str) -> List[int]:
+    """
+    Documents currently claimed under batch_id
+    """
+    return [int(document_id) for document_id in get_redis().lrange(CLAIMED_KEY.format(batch_id=batch_id), 0, -1)]
+
+def release_batch(batch_id: str) -> None:
+    """
+    Drop a claim once every document in it has been handed on
+    """
+    get_redis().delete(CLAIMED_KEY.format(batch_id=batch_id))
+
+def pending() -> int:
+    """
+    Number of documents waiting for a batch
+    """
+    return get_redis().llen(PENDING_KEY)
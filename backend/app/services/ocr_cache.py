@@ -0,0 +1,141 @@
+import os
+import json
+import hashlib
+import tempfile
+import threading
+from typing import Dict, Any, Optional
+from PIL import Image
+from app.core.config import settings
+
+def hash_file(file_path: str) -> str:
+    """
+    SHA-256 of a file's contents
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def hash_image(img: Image.Image) -> str:
+    """
+    SHA-256 of a rasterized page's pixels, mode and size
+    """
+    digest = hashlib.sha256(f"{img.mode}:{img.size}".encode())
+    digest.update(img.tobytes())
+    return digest.hexdigest()
+
+# Eviction trims the cache to this fraction of max_bytes, so a full cache
+# is not walked again on the very next write
+EVICT_TO = 0.9
+# Writes after which a process re-reads the cache size from disk, picking
+# up entries written by the node's other processes
+RESCAN_WRITES = 256
+
+class OCRCache:
+    """
+    Content-addressed OCR result cache stored as JSON files on local disk,
+    so every worker process on a node shares it. Entries are evicted
+    least-recently-used first once the directory exceeds max_bytes. Each
+    process keeps a running estimate of the size and only walks the
+    directory when that estimate crosses the bound or goes stale.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._size: Optional[int] = None
+        self._writes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def make_key(self, content_hash: str, config: str) -> str:
+        """
+        Combine a content hash with the OCR configuration fingerprint
+        """
+        return hashlib.sha256(f"{content_hash}:{config}".encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Return a cached result, or None on a miss
+        """
+        if not self.enabled:
+            return None
+
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)
+            # Access time drives LRU eviction
+            os.utime(path)
+            return value
+        except (OSError, ValueError):
+            return None
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        """
+        Store a result, evicting old entries if the cache is over its size bound
+        """
+        if not self.enabled:
+            return
+
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write atomically so concurrent readers never see partial entries
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(value, f)
+                written = f.tell()
+            replaced = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Error writing OCR cache entry: {str(e)}")
+            return
+
+        with self._lock:
+            self._writes += 1
+            if self._size is None or self._writes >= RESCAN_WRITES:
+                self._evict()
+                return
+            self._size += written - replaced
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        """
+        Walk the cache, record its size and, when over max_bytes, remove
+        the least recently used entries down to EVICT_TO of it
+        """
+        entries = []
+        total = 0
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith(".json"):
+                    continue
+                try:
+                    stat = os.stat(os.path.join(root, name))
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, os.path.join(root, name)))
+                total += stat.st_size
+
+        self._writes = 0
+        if total > self.max_bytes:
+            for _, size, path in sorted(entries):
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                if total <= self.max_bytes * EVICT_TO:
+                    break
+        self._size = total
+
+ocr_cache = OCRCache(settings.OCR_CACHE_DIR, settings.OCR_CACHE_MAX_BYTES)
@@ -0,0 +1,156 @@
+import json
+from typing import Any, Dict, Optional
+import numpy as np
+import pandas as pd
+import redis
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.redis_client import get_redis
+from app.db.models import Analysis, Client, ClientFinancialPeriod, Document, DocumentStatus, ExtractedData
+from app.services import analysis_service, scoring_models
+
+# Score bands, matching the interpretation printed in reports
+SCORE_BINS = [-np.inf, 600, 650, 700, 750, np.inf]
+SCORE_BANDS = ["Very Poor", "Poor", "Fair", "Good", "Excellent"]
+LEVERAGE_PERCENTILES = (10, 25, 50, 75, 90)
+
+# Bumped by invalidate(); cached results are stored under the version
+# current when their query started, so a write that lands mid-computation
+# can never be hidden by a stale entry
+VERSION_KEY = "portfolio:{ca_id}:version"
+CACHE_KEY = "portfolio:{ca_id}:v{version}:{model}"
+
+def invalidate(ca_id: Optional[int]) -> None:
+    """
+    Drop a CA's cached portfolio analytics after any of their analyses
+    change. Call after the change is committed.
+    """
+    if ca_id is None:
+        return
+    try:
+        get_redis().incr(VERSION_KEY.format(ca_id=ca_id))
+    except redis.RedisError as e:
+        print(f"Could not invalidate portfolio cache for CA {ca_id}: {str(e)}")
+
+def load_frame(db: Session, ca_id: int) -> pd.DataFrame:
+    """
+    One row per analysed document of the CA's clients, with the financial
+    figures flattened into columns and scores from a retired model
+    recomputed with the active one
+    """
+    rows = (
+        db.query(
+            Client.id, Client.name, Analysis.cibil_score, Analysis.cibil_model,
+            Analysis.created_at, ClientFinancialPeriod.fiscal_year, ExtractedData.json_data,
+        )
+        .join(Document, Document.client_id == Client.id)
+        .join(Analysis, Analysis.document_id == Document.id)
+        .outerjoin(ExtractedData, ExtractedData.document_id == Document.id)
+        .outerjoin(ClientFinancialPeriod, ClientFinancialPeriod.document_id == Document.id)
+        .filter(Client.ca_id == ca_id, Document.status == DocumentStatus.COMPLETED)
+        .all()
+    )
+
+    frame = pd.DataFrame(
+        [row[:6] for row in rows],
+        columns=["client_id", "client_name", "cibil_score", "cibil_model", "created_at", "fiscal_year"],
+    )
+    financials = pd.DataFrame([row[6] or {} for row in rows], columns=analysis_service.CIBIL_FIELDS)
+    for field in analysis_service.CIBIL_FIELDS:
+        frame[field] = pd.to_numeric(financials[field], errors="coerce")
+
+    model = scoring_models.active_model()
+    stale = (frame["cibil_model"] != model.key).to_numpy()
+    if stale.any():
+        frame.loc[stale, "cibil_score"] = analysis_service.score_financial_data(
+            [row[6] for row, is_stale in zip(rows, stale) if is_stale], model
+        )
+    return frame
+
+def _nullable(value: Any) -> Optional[float]:
+    return None if pd.isna(value) else round(float(value), 4)
+
+def summarize(frame: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Portfolio aggregates from load_frame's rows: clients by score band,
+    leverage percentiles, and clients whose latest score fell
+    """
+    frame = frame.copy()
+    frame["cibil_score"] = frame["cibil_score"].astype(np.float64)
+    # Order statements by the period they report, falling back to upload date
+    frame["period"] = frame["fiscal_year"].fillna(pd.to_datetime(frame["created_at"]).dt.year)
+    frame = frame.sort_values(["client_id", "period", "created_at"])
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        leverage = frame["liabilities"] / frame["assets"]
+    frame["leverage"] = leverage.where(frame["assets"] > 0)
+    frame["previous_score"] = frame.groupby("client_id")["cibil_score"].shift()
+
+    latest = frame.groupby("client_id").tail(1).copy()
+    latest["band"] = pd.cut(latest["cibil_score"], SCORE_BINS, labels=SCORE_BANDS, right=False)
+
+    bands = latest.groupby("band", observed=False).agg(
+        clients=("client_id", "size"),
+        average_score=("cibil_score", "mean"),
+        median_leverage=("leverage", "median"),
+    )
+    quantiles = latest["leverage"].quantile([p / 100 for p in LEVERAGE_PERCENTILES])
+
+    worse = latest[latest["cibil_score"] < latest["previous_score"]].copy()
+    worse["change"] = worse["cibil_score"] - worse["previous_score"]
+    worse = worse.sort_values("change")
+
+    return {
+        "clients": int(latest.shape[0]),
+        "averageScore": _nullable(latest["cibil_score"].mean()),
+        "scoreBands": [
+            {
+                "band": band,
+                "clients": int(row.clients),
+                "averageScore": _nullable(row.average_score),
+                "medianLeverage": _nullable(row.median_leverage),
+            }
+            for band, row in bands.iterrows()
+        ],
+        "leveragePercentiles": {
+            f"p{p}": _nullable(value) for p, value in zip(LEVERAGE_PERCENTILES, quantiles)
+        },
+        "deteriorated": [
+            {
+                "clientId": int(row.client_id),
+                "clientName": row.client_name,
+                "previousScore": _nullable(row.previous_score),
+                "currentScore": _nullable(row.cibil_score),
+                "change": _nullable(row.change),
+            }
+            for row in worse.itertuples()
+        ],
+    }
+
+def get_portfolio(db: Session, ca_id: int) -> Dict[str, Any]:
+    """
+    Cached portfolio analytics for a CA. Falls back to computing directly
+    when Redis is unavailable.
+    """
+    try:
+        cache = get_redis()
+        version = cache.get(VERSION_KEY.format(ca_id=ca_id)) or 0
+        key = CACHE_KEY.format(ca_id=ca_id, version=version, model=scoring_models.active_model().key)
+        cached = cache.get(key)
+    except redis.RedisError as e:
+        print(f"Portfolio cache unavailable: {str(e)}")
+        cache = None
+        cached = None
+
+    if cached:
+        return json.loads(cached)
+
+    result = summarize(load_frame(db, ca_id))
+
+    if cache is not None:
+        try:
+            cache.set(key, json.dumps(result), ex=settings.PORTFOLIO_CACHE_TTL)
+        except redis.RedisError as e:
+            print(f"Could not cache portfolio for CA {ca_id}: {str(e)}")
+
+    return result
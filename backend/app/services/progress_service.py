@@ -0,0 +1,127 @@
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional, Tuple
+import redis
+from app.core.config import settings
+from app.core.redis_client import get_redis
+
+# One hash per document run, written by the workers as the pipeline moves
+# along, so progress is read with a single lookup and no database query
+PROGRESS_KEY = "progress:document:{document_id}"
+# Seconds per page of recently completed documents, newest first, and their mean
+SAMPLES_KEY = "progress:seconds-per-page:samples"
+RATE_KEY = "progress:seconds-per-page"
+
+FIELDS = ("documentId", "userId", "status", "stage", "currentStage", "pagesDone", "pagesTotal",
+          "startedAt", "updatedAt")
+_INT_FIELDS = ("documentId", "userId", "pagesDone", "pagesTotal")
+_FLOAT_FIELDS = ("startedAt", "updatedAt")
+
+def _write(pipe, document_id: int, fields: Dict[str, Any]) -> None:
+    key = PROGRESS_KEY.format(document_id=document_id)
+    pipe.hset(key, mapping={name: value for name, value in fields.items() if value is not None})
+    pipe.expire(key, settings.PROGRESS_TTL)
+
+def start(runs: Iterable[Tuple[int, int, Optional[int], str]]) -> None:
+    """
+    Record the start of (document_id, user_id, page_count, first_stage)
+    runs, replacing progress from earlier runs of the same documents
+    """
+    now = time.time()
+    try:
+        pipe = get_redis().pipeline()
+        for document_id, user_id, page_count, first_stage in runs:
+            pipe.delete(PROGRESS_KEY.format(document_id=document_id))
+            _write(pipe, document_id, {
+                "documentId": document_id,
+                "userId": user_id,
+                "status": "processing",
+                "firstStage": first_stage,
+                "currentStage": first_stage,
+                "pagesDone": 0,
+                "pagesTotal": page_count,
+                "startedAt": now,
+                "updatedAt": now,
+            })
+        pipe.execute()
+    except redis.RedisError as e:
+        print(f"Could not record processing start: {str(e)}")
+
+def update(document_id: int, **fields: Any) -> None:
+    """
+    Record progress fields (stage, currentStage, pagesDone, pagesTotal) of
+    a running document
+    """
+    try:
+        pipe = get_redis().pipeline()
+        _write(pipe, document_id, {**fields, "updatedAt": time.time()})
+        pipe.execute()
+    except redis.RedisError as e:
+        print(f"Could not record progress of document {document_id}: {str(e)}")
+
+def finish(document_id: int, status: str) -> None:
+    """
+    Record the end of a run. A completed run that went through every
+    stage adds its pace to the throughput the ETA is based on.
+    """
+    try:
+        cache = get_redis()
+        now = time.time()
+        # Read the run and record its end in one transaction, so the final
+        # status never appears without its expiry
+        pipe = cache.pipeline(transaction=True)
+        pipe.hgetall(PROGRESS_KEY.format(document_id=document_id))
+        _write(pipe, document_id, {"status": status, "currentStage": "", "updatedAt": now})
+        progress = pipe.execute()[0]
+
+        pages = int(progress.get("pagesTotal") or 0)
+        if status != "completed" or progress.get("firstStage") != "ocr" or pages <= 0:
+            return
+
+        pipe = cache.pipeline()
+        pipe.lpush(SAMPLES_KEY, (now - float(progress["startedAt"])) / pages)
+        pipe.ltrim(SAMPLES_KEY, 0, settings.PROGRESS_THROUGHPUT_SAMPLES - 1)
+        pipe.lrange(SAMPLES_KEY, 0, -1)
+        samples = pipe.execute()[-1]
+        cache.set(RATE_KEY, sum(float(sample) for sample in samples) / len(samples))
+    except redis.RedisError as e:
+        print(f"Could not record the end of document {document_id}'s run: {str(e)}")
+
+def _eta(progress: Dict[str, Any], seconds_per_page: Optional[float]) -> Optional[float]:
+    """
+    Seconds left, from the pace of recent documents applied to this
+    document's pages; None when unknown or already overdue
+    """
+    if progress["status"] == "completed":
+        return 0.0
+    if progress["status"] != "processing" or not seconds_per_page or not progress.get("pagesTotal"):
+        return None
+
+    remaining = progress["pagesTotal"] * seconds_per_page - (time.time() - progress["startedAt"])
+    return round(remaining, 1) if remaining > 0 else None
+
+def get(document_id: int) -> Optional[Dict[str, Any]]:
+    """
+    A document's latest progress with its ETA, or None if no run has been
+    recorded recently. Raises redis.RedisError when Redis is unavailable.
+    """
+    pipe = get_redis().pipeline(transaction=False)
+    pipe.hgetall(PROGRESS_KEY.format(document_id=document_id))
+    pipe.get(RATE_KEY)
+    stored, rate = pipe.execute()
+    if not stored:
+        return None
+
+    progress: Dict[str, Any] = {name: stored.get(name) or None for name in FIELDS}
+    for name in _INT_FIELDS:
+        if progress.get(name) is not None:
+            progress[name] = int(progress[name])
+    for name in _FLOAT_FIELDS:
+        if progress.get(name) is not None:
+            progress[name] = float(progress[name])
+
+    progress["etaSeconds"] = _eta(progress, float(rate) if rate else None)
+    for name in _FLOAT_FIELDS:
+        if progress.get(name) is not None:
+            progress[name] = datetime.utcfromtimestamp(progress[name]).isoformat()
+    return progress
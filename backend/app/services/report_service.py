@@ -9,6 +9,7 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
 from app.db.models import Document, Analysis, ExtractedData, OCRResult
 from app.services import analysis_service
+from app.utils import table_encoding
 
 def generate_pdf_report(db: Session, document_id: int) -> bytes:
     """
@@ -23,6 +24,8 @@ def generate_pdf_report(db: Session, document_id: int) -> bytes:
     if not document or not analysis or not extracted_data:
         raise ValueError("Document or analysis data not found")
     
+    analysis_service.refresh_scores(db, [analysis])
+    
     # Create a buffer for the PDF
     buffer = io.BytesIO()
     
@@ -130,11 +133,12 @@ def generate_pdf_report(db: Session, document_id: int) -> bytes:
     story.append(Spacer(1, 12))
     
     # Add extracted tables if available
-    if extracted_data.table_data and "tables" in extracted_data.table_data:
+    tables = table_encoding.decode_tables(extracted_data.table_data)
+    if tables:
         story.append(Paragraph("Extracted Tables", heading_style))
         story.append(Spacer(1, 6))
         
-        for i, table_data in enumerate(extracted_data.table_data["tables"]):
+        for i, table_data in enumerate(tables):
             story.append(Paragraph(table_data["title"], styles["Heading2"]))
             story.append(Spacer(1, 6))
             
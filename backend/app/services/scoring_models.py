@@ -0,0 +1,53 @@
+from typing import Callable, Dict
+import numpy as np
+from app.core.config import settings
+
+# (income, expenses, assets, liabilities) arrays -> scores
+ScoreFunction = Callable[[np.ndarray, np.ndarray, np.ndarray, np.ndarray], np.ndarray]
+
+class ScoringModel:
+    """
+    A named, versioned CIBIL scoring formula. Bump the version whenever
+    the formula changes so stored scores from the old one are seen as stale.
+    """
+
+    def __init__(self, name: str, version: int, score_arrays: ScoreFunction):
+        self.name = name
+        self.version = version
+        self.score_arrays = score_arrays
+
+    @property
+    def key(self) -> str:
+        """
+        Identifier stored alongside each score, e.g. "ratio:1"
+        """
+        return f"{self.name}:{self.version}"
+
+_models: Dict[str, ScoringModel] = {}
+
+def register_model(model: ScoringModel) -> ScoringModel:
+    """
+    Make a scoring model available for selection by CIBIL_SCORING_MODEL
+    """
+    if model.key in _models:
+        raise ValueError(f"Scoring model already registered: {model.key}")
+    _models[model.key] = model
+    return model
+
+def get_model(key: str) -> ScoringModel:
+    """
+    Look up a model by "name:version", or the latest version of "name"
+    """
+    if key in _models:
+        return _models[key]
+
+    versions = [model for model in _models.values() if model.name == key]
+    if not versions:
+        raise ValueError(f"Unknown scoring model: {key}")
+    return max(versions, key=lambda model: model.version)
+
+def active_model() -> ScoringModel:
+    """
+    The model new and refreshed scores are computed with
+    """
+    return get_model(settings.CIBIL_SCORING_MODEL)
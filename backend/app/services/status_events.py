@@ -0,0 +1,130 @@
+import asyncio
+import json
+from datetime import datetime
+from typing import Any, Dict, Optional, Set
+import redis
+import redis.asyncio as aioredis
+from app.core.config import settings
+from app.core.redis_client import get_redis
+from app.db.models import Document
+
+# Status events are published per user on Redis pub/sub, so a stream served
+# by any API instance sees events from every worker
+CHANNEL = "document-status:{user_id}"
+CHANNEL_PATTERN = "document-status:*"
+
+# Seconds before a lost subscription is retried
+RECONNECT_DELAY = 1.0
+
+def event(document_id: int, status: Any, **fields: Any) -> Dict[str, Any]:
+    """
+    A status event; fields such as stage, lane or progress are added as given
+    """
+    return {
+        "documentId": document_id,
+        "status": getattr(status, "value", status),
+        **fields,
+        "at": datetime.utcnow().isoformat(),
+    }
+
+def document_event(document: Document, **fields: Any) -> Dict[str, Any]:
+    """
+    A status event for a document's current state. Build it before the
+    change is committed; publish after.
+    """
+    fields.setdefault("stage", document.processing_stage)
+    fields.setdefault("lane", document.processing_lane)
+    return event(document.id, document.status, **fields)
+
+def publish(user_id: Optional[int], *events: Dict[str, Any]) -> None:
+    """
+    Send events to the user's open status streams in one round trip.
+    Best effort: the status endpoint stays the source of truth.
+    """
+    if user_id is None or not events:
+        return
+
+    channel = CHANNEL.format(user_id=user_id)
+    try:
+        pipe = get_redis().pipeline(transaction=False)
+        for item in events:
+            pipe.publish(channel, json.dumps(item))
+        pipe.execute()
+    except redis.RedisError as e:
+        print(f"Could not publish status events for user {user_id}: {str(e)}")
+
+def sse_message(data: str, event_type: Optional[str] = None) -> str:
+    """
+    One Server-Sent Events message carrying already serialized JSON
+    """
+    return (f"event: {event_type}\n" if event_type else "") + f"data: {data}\n\n"
+
+class StatusBroadcaster:
+    """
+    Fans status events out to the streams open in this process. One Redis
+    subscription is shared by all of them; it is opened with the first
+    stream and closed with the last. Each stream gets a bounded queue, and
+    a client too slow to drain it misses events rather than holding memory.
+    """
+
+    def __init__(self, url: Optional[str] = None):
+        self.url = url or settings.REDIS_URL
+        self.subscribers: Dict[int, Set[asyncio.Queue]] = {}
+        self._reader: Optional[asyncio.Task] = None
+
+    def subscribe(self, user_id: int) -> asyncio.Queue:
+        """
+        Queue receiving the user's events as JSON strings
+        """
+        queue = asyncio.Queue(maxsize=settings.STATUS_STREAM_QUEUE_SIZE)
+        self.subscribers.setdefault(user_id, set()).add(queue)
+
+        if self._reader is None or self._reader.done():
+            self._reader = asyncio.get_running_loop().create_task(self._read())
+
+        return queue
+
+    def unsubscribe(self, user_id: int, queue: asyncio.Queue) -> None:
+        queues = self.subscribers.get(user_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self.subscribers[user_id]
+
+        if not self.subscribers and self._reader is not None:
+            self._reader.cancel()
+            self._reader = None
+
+    def dispatch(self, channel: str, data: str) -> None:
+        """
+        Hand an event received on a user's channel to their streams
+        """
+        try:
+            user_id = int(channel.rpartition(":")[2])
+        except ValueError:
+            return
+
+        for queue in self.subscribers.get(user_id, ()):
+            try:
+                queue.put_nowait(data)
+            except asyncio.QueueFull:
+                print(f"Status stream for user {user_id} is not keeping up; dropping an event")
+
+    async def _read(self) -> None:
+        while True:
+            client = aioredis.from_url(self.url, decode_responses=True)
+            pubsub = client.pubsub()
+            try:
+                await pubsub.psubscribe(CHANNEL_PATTERN)
+                async for message in pubsub.listen():
+                    if message["type"] == "pmessage":
+                        self.dispatch(message["channel"], message["data"])
+            except redis.RedisError as e:
+                print(f"Status event subscription lost: {str(e)}")
+            finally:
+                await pubsub.reset()
+                await client.connection_pool.disconnect()
+
+            await asyncio.sleep(RECONNECT_DELAY)
+
+broadcaster = StatusBroadcaster()
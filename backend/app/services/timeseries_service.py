@@ -0,0 +1,112 @@
+from typing import Dict, Any, List, Optional
+from datetime import datetime
+import numpy as np
+from sqlalchemy.orm import Session
+from app.db.models import Analysis, ClientFinancialPeriod, Document
+from app.services import analysis_service, extraction_service
+
+# Metrics stored per client and period; the CIBIL score is read from the
+# period's analysis so it follows rescoring, and profit is derived on read
+PERIOD_METRICS = ("income", "expenses", "assets", "liabilities")
+SERIES_METRICS = PERIOD_METRICS + ("cibil_score", "profit")
+
+def _metric(value: Any) -> Optional[float]:
+    return float(value) if isinstance(value, (int, float)) else None
+
+def record_period(
+    db: Session, document: Document, text: str, financial_data: Dict[str, Any], cibil_score: float
+) -> Optional[ClientFinancialPeriod]:
+    """
+    Upsert the client's figures for the period a processed document
+    reports. The caller commits. Returns None when the document has no
+    client or no reporting year can be found in its text.
+    """
+    if not document.client_id:
+        return None
+
+    fiscal_year = extraction_service.detect_fiscal_year(text)
+    if fiscal_year is None:
+        print(f"No reporting period found for document {document.id}; not added to client series")
+        return None
+
+    # A reprocessed document may now report a different period
+    db.query(ClientFinancialPeriod).filter(
+        ClientFinancialPeriod.document_id == document.id,
+        ClientFinancialPeriod.fiscal_year != fiscal_year,
+    ).delete(synchronize_session=False)
+
+    period = db.query(ClientFinancialPeriod).filter(
+        ClientFinancialPeriod.client_id == document.client_id,
+        ClientFinancialPeriod.fiscal_year == fiscal_year,
+    ).first() or ClientFinancialPeriod(client_id=document.client_id, fiscal_year=fiscal_year)
+
+    period.document_id = document.id
+    for field in ("income", "expenses", "assets", "liabilities"):
+        setattr(period, field, _metric(financial_data.get(field)))
+    period.cibil_score = _metric(cibil_score)
+    period.updated_at = datetime.utcnow()
+    db.add(period)
+
+    return period
+
+def _to_list(values: np.ndarray) -> List[Optional[float]]:
+    # NaN marks a missing value; JSON has no NaN, so send null
+    return [None if np.isnan(value) else float(value) for value in values]
+
+def yoy_deltas(years: np.ndarray, values: np.ndarray) -> Dict[str, List[Optional[float]]]:
+    """
+    Year-over-year change and percentage change for a series sorted by
+    year. Entries with no immediately preceding year, or a missing value
+    on either side, are null; so is the percentage over a zero base.
+    """
+    change = np.full(values.shape, np.nan)
+    percent = np.full(values.shape, np.nan)
+    if values.size > 1:
+        consecutive = np.diff(years) == 1
+        previous = values[:-1]
+        delta = np.where(consecutive, values[1:] - previous, np.nan)
+        change[1:] = delta
+        with np.errstate(divide="ignore", invalid="ignore"):
+            percent[1:] = np.where(previous != 0, delta / np.abs(previous) * 100, np.nan)
+
+    return {"change": _to_list(change), "percent": _to_list(percent)}
+
+def _current_scores(db: Session, document_ids: List[int]) -> np.ndarray:
+    """
+    Scores of the documents' analyses under the active scoring model,
+    refreshing stale ones; NaN where a document has no analysis
+    """
+    analyses = db.query(Analysis).filter(Analysis.document_id.in_(document_ids)).all() if document_ids else []
+    scores = {
+        analysis.document_id: analysis.cibil_score
+        for analysis in analysis_service.refresh_scores(db, analyses)
+    }
+    return np.array([scores.get(document_id) for document_id in document_ids], dtype=np.float64)
+
+def client_series(db: Session, client_id: int) -> Dict[str, Any]:
+    """
+    A client's metrics by fiscal year with year-over-year deltas, each
+    metric computed as one array operation over all periods
+    """
+    rows = (
+        db.query(ClientFinancialPeriod.fiscal_year, ClientFinancialPeriod.document_id,
+                 *(getattr(ClientFinancialPeriod, metric) for metric in PERIOD_METRICS))
+        .filter(ClientFinancialPeriod.client_id == client_id)
+        .order_by(ClientFinancialPeriod.fiscal_year)
+        .all()
+    )
+
+    years = np.array([row[0] for row in rows], dtype=np.int64)
+    # None becomes NaN so gaps propagate through the arithmetic
+    table = np.array([row[2:] for row in rows], dtype=np.float64).reshape(len(rows), len(PERIOD_METRICS))
+    columns = dict(zip(PERIOD_METRICS, table.T))
+    columns["cibil_score"] = _current_scores(db, [row[1] for row in rows])
+    columns["profit"] = columns["income"] - columns["expenses"]
+
+    return {
+        "clientId": client_id,
+        "periods": years.tolist(),
+        "documentIds": [row[1] for row in rows],
+        "series": {metric: _to_list(columns[metric]) for metric in SERIES_METRICS},
+        "yoy": {metric: yoy_deltas(years, columns[metric]) for metric in SERIES_METRICS},
+    }
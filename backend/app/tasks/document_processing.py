@@ -1,99 +1,530 @@
 # backend/app/tasks/document_processing.py
+import asyncio
 import os
-from celery import Task
+from celery import Task, chord
+from app.core import lanes
 from app.core.celery_app import celery_app
 from app.db.session import SessionLocal
-from app.db.models import Document, DocumentStatus, Analysis, ExtractedData, OCRResult
-from app.services import ocr_service, analysis_service
+from app.db.models import Document, DocumentStatus, Analysis, ExtractedData, OCRResult, OCRPage
+from app.core.config import settings
+from app.services import ocr_service, analysis_service, ocr_batcher, timeseries_service, portfolio_service
+from app.services import progress_service, status_events
+from sqlalchemy import func
+from app.utils import table_encoding
 from datetime import datetime
+from typing import Any, Dict, List
 
 class DocumentProcessingTask(Task):
     """Base task for document processing with error handling"""
     
     def on_failure(self, exc, task_id, args, kwargs, einfo):
-        # Get document_id from the first argument
-        document_id = args[0]
+        # Get document_id from the first argument, a list of them for process_documents
+        document_ids = args[0] if isinstance(args[0], list) else [args[0]]
         
         # Update document status to FAILED in the database
         db = SessionLocal()
         try:
-            document = db.query(Document).filter(Document.id == document_id).first()
-            if document:
-                document.status = DocumentStatus.FAILED
-                db.add(document)
-                db.commit()
+            for document_id in document_ids:
+                _mark_failed(db, document_id)
         finally:
             db.close()
         
         super().on_failure(exc, task_id, args, kwargs, einfo)
 
+def _mark_failed(db, document_id: int) -> None:
+    """
+    Best-effort status update to FAILED
+    """
+    try:
+        db.rollback()
+        document = db.query(Document).filter(Document.id == document_id).first()
+        if document:
+            document.status = DocumentStatus.FAILED
+            event = status_events.document_event(document)
+            db.add(document)
+            db.commit()
+            status_events.publish(document.user_id, event)
+            progress_service.finish(document_id, DocumentStatus.FAILED.value)
+    except:
+        pass
+
+def _is_batchable(document: Document) -> bool:
+    """
+    Single-image documents are OCRed in cross-document batches
+    """
+    file_ext = os.path.splitext(document.file_path)[1].lower()
+    return settings.OCR_BATCH_SIZE > 1 and file_ext in [".jpg", ".jpeg", ".png"]
+
+# Pipeline stages in order. Each runs as its own task, saves its output
+# and records itself in Document.processing_stage before handing off to
+# the next, so a retry repeats only the stage that failed.
+STAGES = ("ocr", "extract", "tables", "summary", "score")
+
+# Shared by every stage task; deterministic errors are not worth retrying
+STAGE_TASK_OPTIONS = {
+    "base": DocumentProcessingTask,
+    "bind": True,
+    "autoretry_for": (Exception,),
+    "dont_autoretry_for": (FileNotFoundError, ValueError),
+    "retry_backoff": True,
+    "max_retries": settings.PIPELINE_MAX_RETRIES,
+}
+
+def _get_document(db, document_id: int) -> Document:
+    document = db.query(Document).filter(Document.id == document_id).first()
+    
+    if not document:
+        raise ValueError(f"Document with ID {document_id} not found")
+    
+    return document
+
+def _resume_stage(db, document: Document) -> str:
+    """
+    First stage to run: the one after the last checkpoint of an unfinished
+    run, or OCR for a new or already completed document
+    """
+    done = document.processing_stage
+    if done not in STAGES or done == STAGES[-1]:
+        return STAGES[0]
+    
+    # Later stages read the stored pages, which a change of OCR settings invalidates
+    stale = db.query(OCRPage.id).filter(
+        OCRPage.document_id == document.id, OCRPage.ocr_config != ocr_service.ocr_config_hash()
+    ).first()
+    if stale:
+        return STAGES[0]
+    
+    return STAGES[STAGES.index(done) + 1]
+
+def _checkpoint(db, document: Document, stage: str, **progress: Any) -> None:
+    """
+    Commit a stage's output together with the record that it completed,
+    then announce it. Extra progress fields (pagesDone, pagesTotal) are
+    recorded with it.
+    """
+    document.processing_stage = stage
+    document_id = document.id
+    user_id = document.user_id
+    event = status_events.document_event(document)
+    db.add(document)
+    db.commit()
+    status_events.publish(user_id, event)
+    
+    position = STAGES.index(stage) + 1
+    next_stage = STAGES[position] if position < len(STAGES) else None
+    progress_service.update(document_id, stage=stage, currentStage=next_stage, **progress)
+
+def _advance(document_id: int, stage: str, lane: str) -> None:
+    """
+    Queue the stage after the one just completed in the document's lane
+    """
+    position = STAGES.index(stage) + 1
+    if position < len(STAGES):
+        STAGE_TASKS[STAGES[position]].apply_async((document_id,), queue=lanes.queue_for(lane))
+
+def _save_pages(db, document_id: int, pages: List[Dict[str, Any]], ocr_config: str) -> None:
+    """
+    Store per-page results, replacing earlier rows for the same pages
+    """
+    if not pages:
+        return
+    
+    db.query(OCRPage).filter(
+        OCRPage.document_id == document_id,
+        OCRPage.page_number.in_([page["page"] for page in pages]),
+    ).delete(synchronize_session=False)
+    db.bulk_insert_mappings(OCRPage, [
+        {
+            "document_id": document_id,
+            "page_number": page["page"],
+            "text": page["text"],
+            "confidence": page["confidence"],
+            "method": page["method"],
+            "page_hash": page["page_hash"],
+            "ocr_config": ocr_config,
+            "words": page["words"],
+            "tables": page.get("tables"),
+            "disk_write_bytes": page.get("disk_write_bytes"),
+        }
+        for page in pages
+    ])
+
+def _stored_pages(db, document_id: int, ocr_config: str) -> List[Dict[str, Any]]:
+    """
+    Stored per-page results produced under the current OCR settings, in page order
+    """
+    return [
+        {
+            "page": page.page_number,
+            "method": page.method,
+            "text": page.text,
+            "confidence": page.confidence or 0,
+            "page_hash": page.page_hash,
+            "words": page.words or [],
+            "tables": page.tables,
+            "disk_write_bytes": page.disk_write_bytes or 0,
+        }
+        for page in db.query(OCRPage).filter(
+            OCRPage.document_id == document_id, OCRPage.ocr_config == ocr_config
+        ).order_by(OCRPage.page_number)
+    ]
+
+def _save_ocr_result(db, document: Document, ocr_result: Dict[str, Any]) -> None:
+    """
+    Store the merged OCR result, replacing any from an earlier run
+    """
+    db_ocr_result = document.ocr_result or OCRResult(document_id=document.id)
+    db_ocr_result.text = ocr_result["text"]
+    db_ocr_result.confidence = ocr_result["confidence"]
+    db.add(db_ocr_result)
+
+def _ocr_text(document: Document) -> str:
+    return document.ocr_result.text if document.ocr_result else ""
+
+def _start_stage(db, document: Document) -> str:
+    """
+    Stage a starting or resumed pipeline begins with
+    """
+    # Check if file exists
+    if not os.path.exists(document.file_path):
+        raise FileNotFoundError(f"Document file not found: {document.file_path}")
+    
+    return _resume_stage(db, document)
+
+def _queue_ocr_batch(document_ids: List[int]) -> None:
+    """
+    Hand documents to the shared OCR batch, which calls complete_document
+    for each once OCRed
+    """
+    queued = ocr_batcher.enqueue(*document_ids)
+    if queued >= settings.OCR_BATCH_SIZE:
+        flush_ocr_batch.delay()
+    elif queued == len(document_ids):
+        # First documents in an empty queue start the max-wait timer
+        flush_ocr_batch.apply_async(countdown=settings.OCR_BATCH_MAX_WAIT)
+
 @celery_app.task(base=DocumentProcessingTask, bind=True, name="app.tasks.document_processing.process_document")
 def process_document(self, document_id: int):
-    """Process a document asynchronously"""
+    """Start or resume a document's processing pipeline"""
     db = SessionLocal()
     
     try:
-        document = db.query(Document).filter(Document.id == document_id).first()
-        
-        if not document:
-            raise ValueError(f"Document with ID {document_id} not found")
+        document = _get_document(db, document_id)
+        lane = document.processing_lane
         
         # Update status to processing
         document.status = DocumentStatus.PROCESSING
+        user_id = document.user_id
+        event = status_events.document_event(document)
         db.add(document)
         db.commit()
+        status_events.publish(user_id, event)
         
-        # Check if file exists
-        if not os.path.exists(document.file_path):
-            raise FileNotFoundError(f"Document file not found: {document.file_path}")
+        stage = _start_stage(db, document)
+        progress_service.start([(document_id, user_id, document.page_count, stage)])
         
-        # Step 1: Extract text using OCR
-        ocr_result = ocr_service.extract_text(document.file_path)
+        if stage == STAGES[0] and _is_batchable(document):
+            _queue_ocr_batch([document.id])
+            
+            return {
+                "documentId": document_id,
+                "status": "queued",
+            }
+    
+    except Exception as e:
+        # Update document status to failed
+        _mark_failed(db, document_id)
         
-        # Step 2: Extract structured data
-        extracted_data = ocr_service.extract_structured_data(
-            document.file_path, ocr_result["text"]
-        )
+        # Re-raise the exception
+        raise
+    
+    finally:
+        db.close()
+    
+    STAGE_TASKS[stage].apply_async((document_id,), queue=lanes.queue_for(lane))
+    
+    return {
+        "documentId": document_id,
+        "status": "processing",
+        "stage": stage,
+    }
+
+@celery_app.task(base=DocumentProcessingTask, bind=True, name="app.tasks.document_processing.process_documents")
+def process_documents(self, document_ids: List[int]):
+    """Start or resume the pipelines of many documents already marked as processing"""
+    db = SessionLocal()
+    starts = []
+    batched = []
+    missing = []
+    failed_events = {}
+    runs = []
+    
+    try:
+        for document in db.query(Document).filter(Document.id.in_(document_ids)):
+            try:
+                stage = _start_stage(db, document)
+            except FileNotFoundError as e:
+                print(f"Not processing document {document.id}: {str(e)}")
+                missing.append(document.id)
+                failed_events.setdefault(document.user_id, []).append(
+                    status_events.event(document.id, DocumentStatus.FAILED, lane=document.processing_lane)
+                )
+                continue
+            
+            runs.append((document.id, document.user_id, document.page_count, stage))
+            if stage == STAGES[0] and _is_batchable(document):
+                batched.append(document.id)
+            else:
+                starts.append((document.id, stage, document.processing_lane))
         
-        # Step 3: Extract tables
-        tables = ocr_service.extract_tables(document.file_path)
+        if missing:
+            db.query(Document).filter(Document.id.in_(missing)).update(
+                {Document.status: DocumentStatus.FAILED}, synchronize_session=False
+            )
+            db.commit()
+    
+    finally:
+        db.close()
+    
+    for user_id, events in failed_events.items():
+        status_events.publish(user_id, *events)
+    progress_service.start(runs)
+    
+    if batched:
+        _queue_ocr_batch(batched)
+    
+    # Publish every first stage over one broker connection
+    with celery_app.producer_or_acquire() as producer:
+        for document_id, stage, lane in starts:
+            STAGE_TASKS[stage].apply_async((document_id,), queue=lanes.queue_for(lane), producer=producer)
+    
+    return {
+        "started": len(starts),
+        "batched": len(batched),
+        "failed": len(missing),
+    }
+
+@celery_app.task(name="app.tasks.document_processing.ocr_document", **STAGE_TASK_OPTIONS)
+def ocr_document(self, document_id: int):
+    """OCR stage: fan pages that still need OCR out to ocr_page tasks, merged by merge_ocr_pages"""
+    db = SessionLocal()
+    
+    try:
+        document = _get_document(db, document_id)
+        lane = document.processing_lane
+        ocr_config = ocr_service.ocr_config_hash()
         
-        # Step 4: Generate summary
-        summary = analysis_service.generate_summary(ocr_result["text"], extracted_data)
+        # Pages from other OCR settings are not valid checkpoints
+        db.query(OCRPage).filter(
+            OCRPage.document_id == document_id, OCRPage.ocr_config != ocr_config
+        ).delete(synchronize_session=False)
         
-        # Step 5: Calculate CIBIL score
-        cibil_score = analysis_service.calculate_cibil_score(extracted_data)
+        # Identical files (re-uploads, duplicates) reuse the earlier result
+        cached = ocr_service.cached_result(document.file_path)
+        if cached is not None:
+            page_count = len(cached["pages"])
+            _save_pages(db, document_id, cached["pages"], ocr_config)
+        else:
+            page_count, native_pages = ocr_service.plan_document_pages(document.file_path)
+            _save_pages(db, document_id, list(native_pages.values()), ocr_config)
         
-        # Save OCR result
-        db_ocr_result = OCRResult(
-            document_id=document.id,
-            text=ocr_result["text"],
-            confidence=ocr_result["confidence"],
-        )
-        db.add(db_ocr_result)
+        # Pages stored by an earlier attempt are not OCRed again
+        stored = {page["page"] for page in _stored_pages(db, document_id, ocr_config)}
+        pending = [number for number in range(1, page_count + 1) if number not in stored]
+        db.commit()
+    
+    finally:
+        db.close()
+    
+    progress_service.update(document_id, pagesDone=page_count - len(pending), pagesTotal=page_count)
+    
+    # Pages of a large document stay in its lane rather than crowding out small ones
+    queue = lanes.queue_for(lane)
+    merge = merge_ocr_pages.si(document_id, page_count).set(queue=queue)
+    if pending:
+        chord(ocr_page.si(document_id, number).set(queue=queue) for number in pending)(merge)
+    else:
+        merge.apply_async()
+    
+    return {
+        "documentId": document_id,
+        "pages": page_count,
+        "ocrPages": len(pending),
+    }
+
+@celery_app.task(name="app.tasks.document_processing.ocr_page", **STAGE_TASK_OPTIONS)
+def ocr_page(self, document_id: int, page_number: int):
+    """OCR one page of a document and store it"""
+    db = SessionLocal()
+    
+    try:
+        document = _get_document(db, document_id)
+        ocr_config = ocr_service.ocr_config_hash()
+        page = ocr_service.ocr_document_page(document.file_path, page_number)
+        _save_pages(db, document_id, [page], ocr_config)
         
-        # Save extracted data
-        db_extracted_data = ExtractedData(
-            document_id=document.id,
-            json_data=extracted_data,
-            table_data={"tables": tables},
+        pages_done = db.query(func.count(OCRPage.id)).filter(
+            OCRPage.document_id == document_id, OCRPage.ocr_config == ocr_config
+        ).scalar()
+        user_id = document.user_id
+        event = status_events.document_event(
+            document, progress={"stage": "ocr", "done": pages_done, "total": document.page_count}
         )
+        db.commit()
+        status_events.publish(user_id, event)
+        progress_service.update(document_id, pagesDone=pages_done)
+        
+        return {
+            "page": page_number,
+            "method": page["method"],
+        }
+    
+    finally:
+        db.close()
+
+@celery_app.task(name="app.tasks.document_processing.merge_ocr_pages", **STAGE_TASK_OPTIONS)
+def merge_ocr_pages(self, document_id: int, page_count: int):
+    """Join a document's stored pages into its OCR result, completing the OCR stage"""
+    db = SessionLocal()
+    
+    try:
+        document = _get_document(db, document_id)
+        lane = document.processing_lane
+        pages = _stored_pages(db, document_id, ocr_service.ocr_config_hash())[:page_count]
+        
+        if len(pages) != page_count:
+            raise RuntimeError(f"Document {document_id} has {len(pages)} of {page_count} pages stored")
+        
+        ocr_result = ocr_service.merge_document_pages(pages)
+        ocr_service.cache_result(document.file_path, ocr_result)
+        
+        _save_ocr_result(db, document, ocr_result)
+        _checkpoint(db, document, "ocr", pagesDone=page_count, pagesTotal=page_count)
+    
+    finally:
+        db.close()
+    
+    _advance(document_id, "ocr", lane)
+    
+    return {
+        "documentId": document_id,
+        "pages": page_count,
+        "methods": ocr_result["methods"],
+        "metrics": ocr_result["metrics"],
+    }
+
+@celery_app.task(base=DocumentProcessingTask, bind=True, name="app.tasks.document_processing.complete_document")
+def complete_document(self, document_id: int, ocr_result: Dict[str, Any]):
+    """Store the OCR result of a document OCRed in a batch and continue its pipeline"""
+    db = SessionLocal()
+    
+    try:
+        document = _get_document(db, document_id)
+        lane = document.processing_lane
+        pages = ocr_result.get("pages", [])
+        _save_pages(db, document_id, pages, ocr_service.ocr_config_hash())
+        _save_ocr_result(db, document, ocr_result)
+        _checkpoint(db, document, "ocr", pagesDone=len(pages), pagesTotal=len(pages))
+    
+    except Exception as e:
+        _mark_failed(db, document_id)
+        raise
+    
+    finally:
+        db.close()
+    
+    _advance(document_id, "ocr", lane)
+
+@celery_app.task(name="app.tasks.document_processing.extract_document", **STAGE_TASK_OPTIONS)
+def extract_document(self, document_id: int):
+    """Extraction stage: structured financial data from the OCR text and word positions"""
+    db = SessionLocal()
+    
+    try:
+        document = _get_document(db, document_id)
+        lane = document.processing_lane
+        pages = _stored_pages(db, document_id, ocr_service.ocr_config_hash())
+        extracted_data = ocr_service.extract_structured_data(document.file_path, _ocr_text(document), pages)
+        
+        db_extracted_data = document.extracted_data or ExtractedData(document_id=document.id)
+        db_extracted_data.json_data = extracted_data
         db.add(db_extracted_data)
+        _checkpoint(db, document, "extract")
+    
+    finally:
+        db.close()
+    
+    _advance(document_id, "extract", lane)
+
+@celery_app.task(name="app.tasks.document_processing.extract_document_tables", **STAGE_TASK_OPTIONS)
+def extract_document_tables(self, document_id: int):
+    """Table stage: detect and read the document's tables"""
+    db = SessionLocal()
+    
+    try:
+        document = _get_document(db, document_id)
+        lane = document.processing_lane
+        pages = _stored_pages(db, document_id, ocr_service.ocr_config_hash())
+        tables = ocr_service.extract_tables(document.file_path, pages)
         
-        # Save analysis
-        db_analysis = Analysis(
-            document_id=document.id,
-            summary=summary,
-            cibil_score=cibil_score,
-        )
+        db_extracted_data = document.extracted_data or ExtractedData(document_id=document.id)
+        db_extracted_data.table_data = table_encoding.encode_tables(tables)
+        db_extracted_data.table_format = table_encoding.COLUMNAR
+        db.add(db_extracted_data)
+        _checkpoint(db, document, "tables")
+    
+    finally:
+        db.close()
+    
+    _advance(document_id, "tables", lane)
+
+@celery_app.task(name="app.tasks.document_processing.summarize_document", **STAGE_TASK_OPTIONS)
+def summarize_document(self, document_id: int):
+    """Summary stage"""
+    db = SessionLocal()
+    
+    try:
+        document = _get_document(db, document_id)
+        lane = document.processing_lane
+        extracted_data = document.extracted_data.json_data if document.extracted_data else {}
+        summary = asyncio.run(analysis_service.generate_summary(_ocr_text(document), extracted_data))
+        
+        db_analysis = document.analysis or Analysis(document_id=document.id)
+        db_analysis.summary = summary
         db.add(db_analysis)
+        _checkpoint(db, document, "summary")
+    
+    finally:
+        db.close()
+    
+    _advance(document_id, "summary", lane)
+
+@celery_app.task(name="app.tasks.document_processing.score_document", **STAGE_TASK_OPTIONS)
+def score_document(self, document_id: int):
+    """Scoring stage: CIBIL score and client time series, completing the document"""
+    db = SessionLocal()
+    
+    try:
+        document = _get_document(db, document_id)
+        extracted_data = document.extracted_data.json_data if document.extracted_data else {}
+        cibil_score, cibil_model = analysis_service.score_with_active_model(extracted_data)
+        
+        db_analysis = document.analysis or Analysis(document_id=document.id)
+        db_analysis.cibil_score = cibil_score
+        db_analysis.cibil_model = cibil_model
+        db.add(db_analysis)
+        
+        # Add this period to the client's financial time series
+        timeseries_service.record_period(db, document, _ocr_text(document), extracted_data, cibil_score)
         
         # Update document status
         document.status = DocumentStatus.COMPLETED
         document.processed_at = datetime.utcnow()
-        db.add(document)
+        _checkpoint(db, document, "score")
+        progress_service.finish(document_id, DocumentStatus.COMPLETED.value)
         
-        db.commit()
+        if document.client:
+            portfolio_service.invalidate(document.client.ca_id)
         
         return {
             "documentId": document_id,
@@ -101,19 +532,76 @@ def process_document(self, document_id: int):
             "cibilScore": cibil_score,
         }
     
-    except Exception as e:
-        # Update document status to failed
+    finally:
+        db.close()
+
+class OCRBatchTask(Task):
+    """Base task for OCR batch flushes; a batch that cannot be OCRed fails its documents"""
+    
+    def on_failure(self, exc, task_id, args, kwargs, einfo):
+        document_ids = ocr_batcher.claimed(task_id)
+        
+        db = SessionLocal()
         try:
-            document = db.query(Document).filter(Document.id == document_id).first()
-            if document:
-                document.status = DocumentStatus.FAILED
-                db.add(document)
-                db.commit()
-        except:
-            pass
+            for document_id in document_ids:
+                _mark_failed(db, document_id)
+        finally:
+            db.close()
         
-        # Re-raise the exception
-        raise
+        ocr_batcher.release_batch(task_id)
+        super().on_failure(exc, task_id, args, kwargs, einfo)
+
+@celery_app.task(
+    base=OCRBatchTask, bind=True, name="app.tasks.document_processing.flush_ocr_batch",
+    autoretry_for=(Exception,), retry_backoff=True, max_retries=settings.PIPELINE_MAX_RETRIES,
+)
+def flush_ocr_batch(self):
+    """OCR a batch of queued single-image documents and resume their pipelines"""
+    # A retried or redelivered flush gets back the batch it claimed before
+    batch_id = self.request.id
+    document_ids = ocr_batcher.claim_batch(batch_id, settings.OCR_BATCH_SIZE)
+    if not document_ids:
+        return {"documents": 0}
     
+    # More work than one batch: keep draining
+    if ocr_batcher.pending():
+        flush_ocr_batch.delay()
+    
+    db = SessionLocal()
+    try:
+        documents = db.query(Document).filter(Document.id.in_(document_ids)).all()
+        file_paths = [document.file_path for document in documents]
+        document_ids = [document.id for document in documents]
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+    
+    results = ocr_service.extract_image_batch(file_paths)
+    
+    unreadable = [document_id for document_id, ocr_result in zip(document_ids, results) if ocr_result is None]
+    if unreadable:
+        db = SessionLocal()
+        try:
+            for document_id in unreadable:
+                _mark_failed(db, document_id)
+        finally:
+            db.close()
+    
+    for document_id, ocr_result in zip(document_ids, results):
+        if ocr_result is not None:
+            complete_document.delay(document_id, ocr_result)
+    
+    # Only now that every document has been handed on
+    ocr_batcher.release_batch(batch_id)
+    
+    return {
+        "documents": len(document_ids),
+        "failed": len(unreadable),
+    }
+
+STAGE_TASKS = {
+    "ocr": ocr_document,
+    "extract": extract_document,
+    "tables": extract_document_tables,
+    "summary": summarize_document,
+    "score": score_document,
+}
@@ -0,0 +1,16 @@
+# backend/app/tasks/scoring.py
+from app.core.celery_app import celery_app
+from app.db.session import SessionLocal
+from app.services import analysis_service
+
+@celery_app.task(name="app.tasks.scoring.rescore_analyses")
+def rescore_analyses(chunk_size: int = None):
+    """Recompute every stored CIBIL score after the scoring rules change"""
+    db = SessionLocal()
+    try:
+        rescored = analysis_service.rescore_analyses(db, chunk_size)
+    finally:
+        db.close()
+    
+    print(f"Rescored {rescored} analyses")
+    return {"rescored": rescored}
@@ -1,8 +1,9 @@
 import os
 import uuid
 import shutil
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 from fastapi import UploadFile
+from PyPDF2 import PdfReader
 from app.core.config import settings
 
 def save_upload_file(upload_file: UploadFile, destination_folder: str = None) -> Tuple[str, str]:
@@ -48,6 +49,20 @@ def get_file_size(file_path: str) -> int:
     """
     return os.path.getsize(file_path)
 
+def count_pages(file_path: str) -> Optional[int]:
+    """
+    Number of pages in a PDF (images have one), read from the document
+    structure without rendering anything. None if the PDF cannot be parsed.
+    """
+    if os.path.splitext(file_path)[1].lower() != ".pdf":
+        return 1
+    
+    try:
+        return len(PdfReader(file_path).pages)
+    except Exception as e:
+        print(f"Error counting pages of {file_path}: {str(e)}")
+        return None
+
 def delete_file(file_path: str) -> bool:
     """
     Delete a file
@@ -0,0 +1,107 @@
+from typing import Optional
+import numpy as np
+from PIL import Image
+
+# ITU-R BT.601 luma weights, as used by PIL's "L" conversion
+_LUMA = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+# Cap on ink pixels sampled for skew estimation; keeps dense pages fast
+_SKEW_SAMPLE = 200_000
+
+def to_grayscale(pixels: np.ndarray) -> np.ndarray:
+    """
+    Convert an HxW, HxWx3 or HxWx4 array to an 8-bit grayscale array
+    """
+    if pixels.ndim == 2:
+        return pixels.astype(np.uint8, copy=False)
+    gray = pixels[..., :3].astype(np.float32) @ _LUMA
+    return np.clip(gray + 0.5, 0, 255).astype(np.uint8)
+
+def otsu_threshold(gray: np.ndarray) -> int:
+    """
+    Otsu's threshold: the grey level that maximises between-class variance
+    """
+    hist = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+    total = hist.sum()
+    if total == 0:
+        return 127
+
+    levels = np.arange(256, dtype=np.float64)
+    weight_bg = np.cumsum(hist)
+    weight_fg = total - weight_bg
+    cum_mean = np.cumsum(hist * levels)
+    mean_bg = cum_mean / np.where(weight_bg == 0, 1, weight_bg)
+    mean_fg = (cum_mean[-1] - cum_mean) / np.where(weight_fg == 0, 1, weight_fg)
+
+    between = weight_bg * weight_fg * (mean_bg - mean_fg) ** 2
+    return int(np.argmax(between))
+
+def binarize(gray: np.ndarray) -> np.ndarray:
+    """
+    Otsu-binarize a grayscale array to 0 (ink) / 255 (paper)
+    """
+    return np.where(gray > otsu_threshold(gray), 255, 0).astype(np.uint8)
+
+def estimate_skew(binary: np.ndarray, max_angle: float = 5.0, step: float = 0.25) -> float:
+    """
+    Estimate page skew in degrees with a projection profile. Ink pixels are
+    projected onto rows for every candidate angle at once; the angle whose
+    row histogram is sharpest (largest sum of squares) wins. A positive
+    angle means text lines rise to the right.
+    """
+    ys, xs = np.nonzero(binary == 0)
+    if ys.size < 2:
+        return 0.0
+
+    if ys.size > _SKEW_SAMPLE:
+        idx = np.random.default_rng(0).integers(0, ys.size, _SKEW_SAMPLE)
+        ys, xs = ys[idx], xs[idx]
+
+    angles = np.arange(-max_angle, max_angle + step / 2, step)
+    slopes = np.tan(np.deg2rad(angles))
+    # Row each ink pixel falls on once the page is rotated by each angle
+    rows = np.rint(ys[None, :] + xs[None, :] * slopes[:, None]).astype(np.int64)
+    rows -= rows.min()
+
+    height = int(rows.max()) + 1
+    offsets = np.arange(len(angles), dtype=np.int64)[:, None] * height
+    profiles = np.bincount((rows + offsets).ravel(), minlength=len(angles) * height)
+    scores = (profiles.reshape(len(angles), height).astype(np.float64) ** 2).sum(axis=1)
+
+    return float(angles[int(np.argmax(scores))])
+
+def normalize_dpi(img: Image.Image, target_dpi: int) -> Image.Image:
+    """
+    Resample an image to target_dpi when it declares a different resolution
+    """
+    dpi = img.info.get("dpi")
+    if not dpi or not dpi[0]:
+        return img
+
+    scale = target_dpi / float(dpi[0])
+    # Small differences are not worth a resample
+    if abs(scale - 1) < 0.1:
+        return img
+
+    size = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+    return img.resize(size, Image.LANCZOS)
+
+def preprocess_page(img: Image.Image, target_dpi: Optional[int] = 300) -> Image.Image:
+    """
+    Prepare a page for OCR: DPI normalisation, grayscale, Otsu
+    binarization and deskew. Returns a binary "L" image.
+    """
+    if target_dpi:
+        img = normalize_dpi(img, target_dpi)
+
+    if img.mode not in ("L", "RGB", "RGBA"):
+        img = img.convert("RGB")
+    binary = binarize(to_grayscale(np.asarray(img)))
+
+    # Skew angle is scale invariant, so estimate it on a half-resolution view
+    angle = estimate_skew(binary[::2, ::2])
+    page = Image.fromarray(binary, mode="L")
+    if angle:
+        page = page.rotate(-angle, resample=Image.NEAREST, expand=True, fillcolor=255)
+
+    return page
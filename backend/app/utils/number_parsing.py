@@ -0,0 +1,94 @@
+import re
+from typing import Iterable, Optional
+import numpy as np
+import pandas as pd
+
+LAKH = 100_000
+CRORE = 10_000_000
+
+# Unit words and their multipliers, as used in headers ("₹ in lakhs") and
+# after individual figures ("12.5 crore"). "Cr" only scales in headers;
+# after a figure it marks a credit, as "Dr" marks a debit.
+UNIT_SCALES = {
+    "thousand": 1_000, "thousands": 1_000,
+    "lakh": LAKH, "lakhs": LAKH, "lac": LAKH, "lacs": LAKH,
+    "crore": CRORE, "crores": CRORE, "cr": CRORE,
+    "million": 1_000_000, "millions": 1_000_000, "mn": 1_000_000,
+}
+
+_UNITS = r"thousands?|lakhs?|lacs?|crores?|cr|millions?|mn"
+_CURRENCY = r"₹|rs\.?|inr|rupees|[$€£]"
+
+# "(₹ in lakhs)", "Rs. in Crores", "(in ₹ lakhs)", "All amounts in INR crore",
+# "All figures in crores"
+_SCALE_HEADER_RE = re.compile(
+    rf"(?:(?:{_CURRENCY})\s*in|(?:amounts?|figures?)\s+(?:are\s+)?in(?:\s+(?:{_CURRENCY}))?|in\s+(?:{_CURRENCY}))"
+    rf"\s*({_UNITS})\b\.?",
+    re.IGNORECASE,
+)
+
+_SUFFIX_UNITS = r"thousands?|lakhs?|lacs?|crores?|millions?|mn"
+_UNIT_SUFFIX_RE = rf"\s*({_SUFFIX_UNITS})\.?$"
+# Ledger and bank statement balances: "1,234 Cr" is a credit, "1,234 Dr" a debit
+_LEDGER_MARK_RE = r"\s*(cr|dr)\.?$"
+_CURRENCY_RE = rf"{_CURRENCY}"
+# A minus sign leading the figure, or trailing as some ledgers print it; any
+# other hyphen makes it a range or year ("10-20", "2023-24"), not an amount
+_MINUS_RE = r"^-\s*|\s*-$"
+# Indian (12,34,567) or Western (1,234,567) grouping, never mixed, or no
+# grouping at all
+_GROUPED_RE = r"(?:\d{1,2}(?:,\d{2})*,\d{3}|\d{1,3}(?:,\d{3})*|\d+)(?:\.\d+)?"
+# The "/-" closing a rupee amount, as in "₹ 1,00,000/-"
+_RUPEE_CLOSE_RE = r"\s*/-$"
+
+def detect_scale(text: str) -> float:
+    """
+    Multiplier declared by the first unit header in text, e.g. 1e5 for
+    "(₹ in lakhs)". Returns 1.0 when figures are in plain rupees.
+    """
+    match = _SCALE_HEADER_RE.search(text)
+    if not match:
+        return 1.0
+    return float(UNIT_SCALES[match.group(1).lower()])
+
+def parse_amounts(values: Iterable[str], scale: float = 1.0) -> np.ndarray:
+    """
+    Normalise a column of extracted figures to a float array in one pass.
+    Handles ₹/Rs./INR prefixes, Indian and Western digit grouping,
+    bracketed or signed negatives, Cr/Dr ledger marks (a debit is
+    negative) and unit suffixes such as "crore" or "lakhs". Figures without their own unit are multiplied by scale, the
+    table-level multiplier from detect_scale. Unparseable entries are NaN.
+    """
+    s = pd.Series(list(values), dtype="object").fillna("").astype(str).str.strip().str.lower()
+    if s.empty:
+        return np.empty(0, dtype=np.float64)
+    s = s.str.replace(_RUPEE_CLOSE_RE, "", regex=True)
+
+    debit = s.str.extract(_LEDGER_MARK_RE, expand=False) == "dr"
+    s = s.str.replace(_LEDGER_MARK_RE, "", regex=True).str.strip()
+
+    units = s.str.extract(_UNIT_SUFFIX_RE, expand=False)
+    multiplier = units.map(UNIT_SCALES).astype(np.float64).fillna(scale)
+    s = s.str.replace(_UNIT_SUFFIX_RE, "", regex=True).str.strip()
+
+    # Currency first, so "₹(1,200)" is seen as bracketed
+    s = s.str.replace(_CURRENCY_RE, "", regex=True).str.strip()
+    bracketed = s.str.startswith("(") & s.str.endswith(")")
+    s = s.str.replace(r"^\((.*)\)$", r"\1", regex=True).str.strip()
+    negative = bracketed | s.str.contains(_MINUS_RE, regex=True)
+    s = s.str.replace(_MINUS_RE, "", regex=True)
+
+    # Unbalanced brackets are OCR or regex debris, not signs
+    digits = s.str.replace(r"[\s()]", "", regex=True)
+    valid = digits.str.fullmatch(_GROUPED_RE)
+    numbers = pd.to_numeric(digits.str.replace(",", "", regex=False).where(valid), errors="coerce")
+
+    sign = np.where(negative ^ debit.to_numpy(), -1.0, 1.0)
+    return numbers.to_numpy(dtype=np.float64, na_value=np.nan) * sign * multiplier.to_numpy()
+
+def parse_amount(raw: str, scale: float = 1.0) -> Optional[float]:
+    """
+    Single-figure form of parse_amounts; None when unparseable
+    """
+    value = parse_amounts([raw], scale)[0]
+    return None if np.isnan(value) else float(value)
@@ -0,0 +1,214 @@
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+
+# A ruling line spans at least this fraction of the page in its direction
+_LINE_FRACTION = 0.15
+# Ruling lines closer than this (pixels) belong to the same line
+_LINE_MERGE = 4
+# Text lines further apart than this many line heights start a new block
+_BLOCK_GAP = 1.5
+# Whitespace gutters must be at least this many line heights wide
+_GUTTER_WIDTH = 1.5
+# Unruled tables need at least this many text lines
+_MIN_ROWS = 3
+
+def _runs(mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Start and end (exclusive) indices of each run of True in a 1-D mask
+    """
+    padded = np.concatenate(([False], mask, [False])).astype(np.int8)
+    edges = np.diff(padded)
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+def _long_runs(ink: np.ndarray, min_length: int) -> np.ndarray:
+    """
+    Mask of pixels lying on a horizontal run of ink at least min_length
+    long, computed with a sliding window sum over each row
+    """
+    height, width = ink.shape
+    runs = np.zeros_like(ink)
+    if min_length < 1 or min_length > width:
+        return runs
+
+    # Only rows with enough ink in total can hold such a run
+    candidates = np.flatnonzero(np.count_nonzero(ink, axis=1) >= min_length)
+    if candidates.size == 0:
+        return runs
+    rows = ink[candidates]
+
+    cum = np.zeros((rows.shape[0], width + 1), dtype=np.int32)
+    np.cumsum(rows, axis=1, out=cum[:, 1:])
+    full = (cum[:, min_length:] - cum[:, :-min_length]) == min_length
+
+    # Spread each full window back over the pixels it covers
+    starts = np.zeros((rows.shape[0], width + 1), dtype=np.int32)
+    starts[:, :-min_length] += full
+    starts[:, min_length:] -= full
+    runs[candidates] = np.cumsum(starts[:, :-1], axis=1) > 0
+    return runs
+
+def _line_positions(lines: np.ndarray, axis: int) -> np.ndarray:
+    """
+    Centres of the ruling lines in a long-run mask, projected along axis
+    (1 for horizontal lines, 0 for vertical ones)
+    """
+    starts, ends = _runs(lines.any(axis=axis))
+    if starts.size == 0:
+        return starts
+
+    # Merge runs separated by a few pixels, e.g. double or anti-aliased rules
+    keep = np.concatenate(([True], starts[1:] - ends[:-1] > _LINE_MERGE))
+    group_starts = starts[keep]
+    group_ends = np.append(ends[np.flatnonzero(keep)[1:] - 1], ends[-1])
+    return (group_starts + group_ends) // 2
+
+def _ruled_tables(ink: np.ndarray) -> Tuple[List[Dict[str, Any]], np.ndarray]:
+    """
+    Find grids of ruling lines. Returns the tables and a mask of the
+    horizontal rule pixels so they can be removed before looking for
+    unruled tables.
+    """
+    horizontal = _long_runs(ink, int(ink.shape[1] * _LINE_FRACTION))
+    ys = _line_positions(horizontal, axis=1)
+    tables = []
+    if ys.size < 2:
+        return tables, horizontal
+
+    # Consecutive horizontal rules bound a table row when vertical rules
+    # run through the whole band between them
+    margin = _LINE_MERGE + 2
+    band_rows = []
+    for top, bottom in zip(ys[:-1], ys[1:]):
+        if bottom - top <= 2 * margin:
+            band_rows.append((top, bottom, np.empty(0, dtype=np.int64)))
+            continue
+        crossing = ink[top + margin:bottom - margin].all(axis=0)
+        band_rows.append((top, bottom, _line_positions(crossing[None, :], axis=0)))
+
+    current = None
+    for top, bottom, xs in band_rows:
+        if xs.size < 2:
+            current = None
+            continue
+        if current is None:
+            current = {"rows": [], "columns": xs, "ruled": True}
+            tables.append(current)
+        current["rows"].append((int(top), int(bottom)))
+        # Keep the widest set of column rules seen in this table
+        if xs.size > current["columns"].size:
+            current["columns"] = xs
+
+    for table in tables:
+        xs = table["columns"]
+        table["columns"] = [(int(left), int(right)) for left, right in zip(xs[:-1], xs[1:])]
+        table["bbox"] = (
+            table["columns"][0][0], table["rows"][0][0],
+            table["columns"][-1][1], table["rows"][-1][1],
+        )
+
+    return tables, horizontal
+
+def _unruled_tables(ink: np.ndarray, exclude: List[Tuple[int, int]]) -> List[Dict[str, Any]]:
+    """
+    Find tables laid out with whitespace alone: blocks of text lines whose
+    column ink profile has gutters running through (nearly) every line
+    """
+    row_starts, row_ends = _runs(ink.any(axis=1))
+    if row_starts.size < _MIN_ROWS:
+        return []
+
+    # Skip text lines that fall inside ruled tables
+    centres = (row_starts + row_ends) // 2
+    outside = np.ones(centres.size, dtype=bool)
+    for top, bottom in exclude:
+        outside &= (centres < top) | (centres >= bottom)
+    row_starts, row_ends = row_starts[outside], row_ends[outside]
+    if row_starts.size < _MIN_ROWS:
+        return []
+
+    line_height = float(np.median(row_ends - row_starts))
+    gaps = row_starts[1:] - row_ends[:-1]
+    block_breaks = np.flatnonzero(gaps > _BLOCK_GAP * line_height) + 1
+
+    # Ink per text line per pixel column: reduce over [start, end) of each
+    # line, keeping every other segment to drop the gaps between lines
+    bounds = np.column_stack((row_starts, row_ends)).ravel()
+    if bounds[-1] >= ink.shape[0]:
+        bounds = bounds[:-1]
+    line_ink = np.logical_or.reduceat(ink, bounds, axis=0)[::2]
+
+    tables = []
+    for lines in np.split(np.arange(row_starts.size), block_breaks):
+        if lines.size < _MIN_ROWS:
+            continue
+        occupancy = line_ink[lines].sum(axis=0)
+        inked = np.flatnonzero(occupancy)
+        if inked.size == 0:
+            continue
+        left, right = inked[0], inked[-1] + 1
+
+        # A gutter may be crossed by a stray heading in larger blocks
+        allowance = lines.size // 10
+        gap_starts, gap_ends = _runs(occupancy[left:right] <= allowance)
+        wide = (gap_ends - gap_starts) >= _GUTTER_WIDTH * line_height
+        if not wide.any():
+            continue
+
+        cuts = ((gap_starts[wide] + gap_ends[wide]) // 2 + left).tolist()
+        edges = [int(left)] + cuts + [int(right)]
+        rows = [(int(row_starts[i]), int(row_ends[i])) for i in lines]
+        tables.append({
+            "rows": rows,
+            "columns": list(zip(edges[:-1], edges[1:])),
+            "ruled": False,
+            "bbox": (edges[0], rows[0][0], edges[-1], rows[-1][1]),
+        })
+
+    return tables
+
+def detect_tables(binary: np.ndarray) -> List[Dict[str, Any]]:
+    """
+    Find tables on a binarized page (0 = ink) using projection profiles.
+    Ruled tables come from long horizontal rules crossed by vertical ones;
+    unruled ones from whitespace gutters shared by consecutive text lines.
+    Each table has pixel "bbox", "rows" and "columns" (start, end) bands
+    and a "ruled" flag, in top-to-bottom order.
+    """
+    ink = binary == 0
+    if not ink.any():
+        return []
+
+    ruled, line_mask = _ruled_tables(ink)
+    exclude = [(table["bbox"][1], table["bbox"][3]) for table in ruled]
+    unruled = _unruled_tables(ink & ~line_mask, exclude)
+
+    return sorted(ruled + unruled, key=lambda table: table["bbox"][1])
+
+def _band_index(bands: List[Tuple[int, int]], position: float) -> Optional[int]:
+    """
+    Index of the band containing position, else the nearest band
+    """
+    starts = np.array([start for start, _ in bands], dtype=np.float64)
+    ends = np.array([end for _, end in bands], dtype=np.float64)
+    distance = np.maximum(starts - position, 0) + np.maximum(position - ends, 0)
+    return int(np.argmin(distance)) if distance.size else None
+
+def cells_from_words(table: Dict[str, Any], words: List[Dict[str, Any]]) -> List[List[str]]:
+    """
+    Fill a table's cells with the words whose centres fall in the table,
+    in reading order. Word boxes must be in the page's pixel coordinates.
+    """
+    x0, y0, x1, y1 = table["bbox"]
+    cells = [[[] for _ in table["columns"]] for _ in table["rows"]]
+
+    for word in sorted(words, key=lambda w: (w["top"], w["left"])):
+        text = str(word.get("text", "")).strip()
+        cx = word["left"] + word["width"] / 2
+        cy = word["top"] + word["height"] / 2
+        if not text or not (x0 <= cx <= x1 and y0 <= cy <= y1):
+            continue
+        row = _band_index(table["rows"], cy)
+        column = _band_index(table["columns"], cx)
+        cells[row][column].append(text)
+
+    return [[" ".join(cell) for cell in row] for row in cells]
@@ -0,0 +1,137 @@
+from typing import Any, Dict, List, Optional
+import numpy as np
+from app.utils.number_parsing import parse_amounts
+
+ROWS = "rows"
+COLUMNAR = "columnar"
+COLUMNAR_VERSION = 1
+
+# Candidate number formats, tried in order until one reproduces every cell
+_GROUPINGS = ("indian", "western", "none")
+_NEGATIVES = ("paren", "minus")
+
+def _group(digits: str, grouping: str) -> str:
+    if grouping == "none" or len(digits) <= 3:
+        return digits
+    head, tail = digits[:-3], digits[-3:]
+    size = 2 if grouping == "indian" else 3
+    groups = []
+    while head:
+        groups.insert(0, head[-size:])
+        head = head[:-size]
+    return ",".join(groups + [tail])
+
+def format_number(value: Optional[float], number_format: Dict[str, Any]) -> str:
+    """
+    Render a stored numeric cell back to its original text; None is an
+    empty cell
+    """
+    if value is None:
+        return ""
+    digits = f"{abs(value):.{number_format['decimals']}f}"
+    whole, _, fraction = digits.partition(".")
+    text = _group(whole, number_format["grouping"]) + ("." + fraction if fraction else "")
+    if value < 0:
+        return f"({text})" if number_format["negative"] == "paren" else f"-{text}"
+    return text
+
+def _number_column(cells: List[str]) -> Optional[Dict[str, Any]]:
+    """
+    Encode a column as numbers when some number format reproduces every
+    cell exactly; None if the column must stay as strings
+    """
+    filled = [cell for cell in cells if cell]
+    if not filled:
+        return None
+
+    parsed = parse_amounts(filled)
+    if np.isnan(parsed).any():
+        return None
+
+    decimals = len(filled[0].rstrip(")").partition(".")[2])
+    values = iter(parsed.tolist())
+    column = [next(values) if cell else None for cell in cells]
+
+    for grouping in _GROUPINGS:
+        for negative in _NEGATIVES:
+            number_format = {"grouping": grouping, "decimals": decimals, "negative": negative}
+            if all(format_number(value, number_format) == cell for value, cell in zip(column, cells)):
+                return {"type": "number", "format": number_format, "values": column}
+    return None
+
+def _encode_table(table: Dict[str, Any], strings: Dict[str, int]) -> Dict[str, Any]:
+    rows = table.get("rows") or []
+    width = len(table.get("headers") or [])
+    # Ragged tables cannot be split into columns; keep them as rows
+    if any(len(row) != width for row in rows):
+        return dict(table)
+
+    columns = []
+    for cells in zip(*rows) if rows else [[] for _ in range(width)]:
+        cells = [str(cell) for cell in cells]
+        column = _number_column(cells)
+        if column is None:
+            column = {"type": "string", "codes": [strings.setdefault(cell, len(strings)) for cell in cells]}
+        columns.append(column)
+
+    return {
+        "id": table["id"],
+        "title": table["title"],
+        "headers": table["headers"],
+        "n_rows": len(rows),
+        "columns": columns,
+    }
+
+def encode_tables(tables: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Encode TableData-shaped tables column by column: numeric columns as
+    typed values plus a display format, other columns as codes into one
+    string dictionary shared by all tables. Decoding is lossless.
+    """
+    strings: Dict[str, int] = {}
+    encoded = [_encode_table(table, strings) for table in tables]
+    return {
+        "format": COLUMNAR,
+        "version": COLUMNAR_VERSION,
+        "strings": list(strings),
+        "tables": encoded,
+    }
+
+def _decode_column(column: Dict[str, Any], strings: List[str]) -> List[str]:
+    if column["type"] == "number":
+        return [format_number(value, column["format"]) for value in column["values"]]
+    return [strings[code] for code in column["codes"]]
+
+def decode_tables(table_data: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    TableData-shaped tables from stored table_data in either format
+    """
+    if not table_data:
+        return []
+
+    tables = table_data.get("tables")
+    if not isinstance(tables, list):
+        return []
+    if table_data.get("format") != COLUMNAR:
+        return tables
+
+    strings = table_data["strings"]
+    decoded = []
+    for table in tables:
+        if "columns" not in table:
+            decoded.append(table)
+            continue
+        columns = [_decode_column(column, strings) for column in table["columns"]]
+        decoded.append({
+            "id": table["id"],
+            "title": table["title"],
+            "headers": table["headers"],
+            "rows": [list(row) for row in zip(*columns)] if columns else [[] for _ in range(table["n_rows"])],
+        })
+    return decoded
+
+def table_format(table_data: Optional[Dict[str, Any]]) -> str:
+    """
+    Storage format of a table_data payload
+    """
+    return COLUMNAR if table_data and table_data.get("format") == COLUMNAR else ROWS
@@ -0,0 +1,41 @@
+# benchmark_ocr.py
+# Compare per-call OCR latency of pytesseract (a tesseract process per call)
+# with a resident tesserocr instance. Usage: python benchmark_ocr.py [image] [runs]
+import sys
+import time
+from PIL import Image, ImageDraw
+from app.core.config import settings
+from app.services import ocr_service
+
+def sample_image() -> Image.Image:
+    img = Image.new("L", (600, 120), 255)
+    draw = ImageDraw.Draw(img)
+    draw.text((10, 20), "Revenue from operations 12,34,567.00", fill=0)
+    draw.text((10, 60), "Total expenses 9,87,654.00", fill=0)
+    return img
+
+def time_engine(engine: str, img: Image.Image, runs: int) -> float:
+    settings.OCR_ENGINE = engine
+    # Warm up so one-off start-up cost is reported separately
+    start = time.perf_counter()
+    ocr_service._image_to_data(img)
+    first = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(runs):
+        ocr_service._image_to_data(img)
+    per_call = (time.perf_counter() - start) / runs
+
+    print(f"{engine:12s} first call {first * 1000:8.1f} ms, then {per_call * 1000:8.1f} ms/call")
+    return per_call
+
+if __name__ == "__main__":
+    img = Image.open(sys.argv[1]) if len(sys.argv) > 1 else sample_image()
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    baseline = time_engine("pytesseract", img, runs)
+    if ocr_service.tesserocr is None:
+        print("tesserocr is not installed; skipping resident engine")
+    else:
+        resident = time_engine("tesserocr", img, runs)
+        print(f"speed-up: {baseline / resident:.1f}x")
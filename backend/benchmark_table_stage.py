@@ -0,0 +1,69 @@
+# benchmark_table_stage.py
+# Time the table work for one scanned document: re-rendering and re-preprocessing
+# every page in the table stage against reading tables while OCR has the page.
+# Per-page costs are measured once and scaled to the document. Usage: python benchmark_table_stage.py [pages]
+import sys
+import tempfile
+import time
+from PIL import Image, ImageDraw
+from app.core.config import settings
+from app.services import ocr_service
+from app.utils.image_preprocessing import preprocess_page
+
+def sample_page():
+    """An A4 page at OCR_TARGET_DPI with a ruled 10x3 table and its word boxes"""
+    scale = settings.OCR_TARGET_DPI / 300
+    img = Image.new("RGB", (int(2480 * scale), int(3508 * scale)), "white")
+    draw = ImageDraw.Draw(img)
+    rows = [300 + 100 * i for i in range(11)]
+    columns = [300, 1100, 1600, 2100]
+    for y in rows:
+        draw.line([(300 * scale, y * scale), (2100 * scale, y * scale)], fill="black", width=3)
+    for x in columns:
+        draw.line([(x * scale, 300 * scale), (x * scale, 1300 * scale)], fill="black", width=3)
+    words = [
+        {"text": f"r{row}c{column}", "left": (x + 20) * scale, "top": (y + 40) * scale,
+         "width": 120 * scale, "height": 20 * scale}
+        for row, y in enumerate(rows[:-1]) for column, x in enumerate(columns[:-1])
+    ]
+    return img, words
+
+def render_seconds(pages: int):
+    """Seconds to render a pages-long PDF with poppler, or None without poppler"""
+    try:
+        from reportlab.pdfgen import canvas
+        from pdf2image import convert_from_path
+        with tempfile.NamedTemporaryFile(suffix=".pdf") as f:
+            pdf = canvas.Canvas(f.name)
+            for _ in range(pages):
+                pdf.grid([72, 200, 300, 400], [700 - 20 * i for i in range(11)])
+                pdf.showPage()
+            pdf.save()
+            start = time.perf_counter()
+            convert_from_path(f.name, dpi=settings.OCR_TARGET_DPI)
+            return time.perf_counter() - start
+    except Exception as e:
+        print(f"render skipped ({e.__class__.__name__}: {e})")
+        return None
+
+if __name__ == "__main__":
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    img, words = sample_page()
+    binary = preprocess_page(img, settings.OCR_TARGET_DPI)
+
+    start = time.perf_counter()
+    assert ocr_service._page_tables(img, words, deskew=True)
+    stage_page = time.perf_counter() - start
+
+    start = time.perf_counter()
+    ocr_service._read_tables(binary, words)
+    in_ocr_page = time.perf_counter() - start
+
+    rendered = render_seconds(pages)
+    before = stage_page * pages + (rendered or 0)
+    print(f"{pages} pages")
+    print(f"table stage, re-rendering pages   {before:8.2f} s"
+          + ("" if rendered is not None else " (excluding render)"))
+    if rendered is not None:
+        print(f"  of which rendering              {rendered:8.2f} s")
+    print(f"tables read during OCR            {in_ocr_page * pages:8.2f} s")
@@ -0,0 +1,62 @@
+# benchmark_tables.py
+# Compare stored table payloads as row lists against the columnar encoding:
+# JSON size and the cost of serving them. Usage: python benchmark_tables.py [tables] [rows]
+import sys
+import json
+import random
+import time
+from app.schemas.analysis import TableData
+from app.utils import table_encoding
+
+def indian(value: int) -> str:
+    digits = str(abs(value))
+    head, tail = digits[:-3], digits[-3:]
+    groups = []
+    while head:
+        groups.insert(0, head[-2:])
+        head = head[:-2]
+    text = ",".join(groups + [tail]) + ".00"
+    return f"({text})" if value < 0 else text
+
+def sample_tables(count: int, rows: int):
+    rng = random.Random(0)
+    labels = ["Revenue from operations", "Other income", "Cost of materials consumed",
+              "Employee benefits expense", "Finance costs", "Depreciation", "Other expenses",
+              "Total expenses", "Profit before tax", "Current tax", "Deferred tax"]
+    return [
+        {
+            "id": i + 1,
+            "title": f"Page {i + 1} table 1",
+            "headers": ["Particulars", "Note", "2023", "2022"],
+            "rows": [
+                [rng.choice(labels), str(rng.randint(1, 40)),
+                 indian(rng.randint(-10**7, 10**9)), indian(rng.randint(-10**7, 10**9))]
+                for _ in range(rows)
+            ],
+        }
+        for i in range(count)
+    ]
+
+def timed(label: str, fn, runs: int = 20) -> None:
+    start = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    print(f"{label:40s} {(time.perf_counter() - start) / runs * 1000:8.2f} ms")
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    rows = int(sys.argv[2]) if len(sys.argv) > 2 else 60
+    tables = sample_tables(count, rows)
+
+    rows_json = json.dumps({"tables": tables})
+    columnar_json = json.dumps(table_encoding.encode_tables(tables))
+    print(f"rows payload      {len(rows_json):10d} bytes")
+    print(f"columnar payload  {len(columnar_json):10d} bytes ({len(columnar_json) / len(rows_json):.0%})")
+
+    # Previous path: parse the blob and validate every cell through TableData
+    timed("rows: parse + TableData validation",
+          lambda: [TableData(**table).dict() for table in json.loads(rows_json)["tables"]])
+    timed("columnar: parse + decode to rows",
+          lambda: table_encoding.decode_tables(json.loads(columnar_json)))
+    # Fast path: the stored text is the response body
+    timed("columnar: served as stored", lambda: columnar_json.encode())
@@ -5,6 +5,7 @@ from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 from app.db.session import Base
 from app.db.models import User, Client, Document, Analysis, ExtractedData, OCRResult, UserRole
+from app.core import redis_client
 from app.core.security import get_password_hash
 
 # Use in-memory SQLite for tests
@@ -104,4 +105,101 @@ def test_analysis(db, test_document):
     db.add(ocr_result)
     
     db.commit()
-    return analysis
\ No newline at end of file
+    return analysis
+
+class FakeRedis:
+    """In-memory stand-in for the shared Redis client, covering the commands the app uses"""
+    
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+        self.published = []
+        # Command names of each executed transactional pipeline
+        self.transactions = []
+    
+    def pipeline(self, transaction=True):
+        return FakePipeline(self, transaction)
+    
+    def get(self, key):
+        return self.data.get(key)
+    
+    def set(self, key, value, ex=None):
+        self.data[key] = str(value)
+    
+    def incr(self, key):
+        self.data[key] = str(int(self.data.get(key, 0)) + 1)
+        return int(self.data[key])
+    
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+    
+    def expire(self, key, seconds):
+        self.ttls[key] = seconds
+    
+    def hset(self, key, mapping):
+        self.data.setdefault(key, {}).update({name: str(value) for name, value in mapping.items()})
+    
+    def hgetall(self, key):
+        return dict(self.data.get(key, {}))
+    
+    def rpush(self, key, *values):
+        self.data.setdefault(key, []).extend(str(value) for value in values)
+        return len(self.data[key])
+    
+    def lpush(self, key, *values):
+        for value in values:
+            self.data.setdefault(key, []).insert(0, str(value))
+        return len(self.data[key])
+    
+    def lrange(self, key, start, end):
+        values = self.data.get(key, [])
+        return list(values[start:] if end == -1 else values[start:end + 1])
+    
+    def ltrim(self, key, start, end):
+        self.data[key] = self.lrange(key, start, end)
+    
+    def llen(self, key):
+        return len(self.data.get(key, []))
+    
+    def lmove(self, source, destination, src="LEFT", dest="RIGHT"):
+        values = self.data.get(source, [])
+        if not values:
+            return None
+        value = values.pop(0 if src == "LEFT" else -1)
+        target = self.data.setdefault(destination, [])
+        target.insert(0 if dest == "LEFT" else len(target), value)
+        return value
+    
+    def publish(self, channel, message):
+        self.published.append((channel, message))
+        return 0
+
+class FakePipeline:
+    """Queues commands and runs them against the FakeRedis on execute()"""
+    
+    def __init__(self, fake, transaction=True):
+        self.fake = fake
+        self.transaction = transaction
+        self.commands = []
+    
+    def __getattr__(self, name):
+        command = getattr(self.fake, name)
+        return lambda *args, **kwargs: self.commands.append((command, args, kwargs))
+    
+    def execute(self):
+        if self.transaction:
+            self.fake.transactions.append([command.__name__ for command, _, _ in self.commands])
+        return [command(*args, **kwargs) for command, args, kwargs in self.commands]
+
+@pytest.fixture
+def fake_redis():
+    # Served by get_redis() for the duration of the test
+    fake = FakeRedis()
+    previous = redis_client._redis
+    redis_client._redis = fake
+    
+    try:
+        yield fake
+    finally:
+        redis_client._redis = previous
@@ -147,6 +147,47 @@ class TestAnalysisAPI:
         assert "keyFindings" in response.json()
         assert "financialHighlights" in response.json()
     
+    def test_simulate_cibil_score(self, client: TestClient, user_token, test_document_with_analysis):
+        # Score a grid of scenarios without saving them
+        response = client.post(
+            f"/api/analysis/{test_document_with_analysis.id}/cibil/simulate",
+            headers={"Authorization": f"Bearer {user_token['token']}"},
+            json={
+                "liabilities": {"start": 0, "stop": 5000000, "steps": 10},
+                "expenses": [1000000, 2000000, 3000000],
+            },
+        )
+        
+        # Check response
+        assert response.status_code == 200
+        assert list(response.json()["axes"]) == ["expenses", "liabilities"]
+        assert len(response.json()["scores"]) == 3
+        assert len(response.json()["scores"][0]) == 10
+        assert "score" in response.json()["baseline"]
+    
+    def test_simulate_cibil_score_rejects_oversized_range(self, client: TestClient, user_token,
+                                                          test_document_with_analysis):
+        # Refused before the range is expanded
+        response = client.post(
+            f"/api/analysis/{test_document_with_analysis.id}/cibil/simulate",
+            headers={"Authorization": f"Bearer {user_token['token']}"},
+            json={"income": {"start": 0, "stop": 1, "steps": 10 ** 9}},
+        )
+        
+        assert response.status_code == 422
+    
+    def test_simulate_cibil_score_rejects_too_many_combinations(self, client: TestClient, user_token,
+                                                                test_document_with_analysis):
+        # Each list is allowed on its own; their product is not
+        values = list(range(1000))
+        response = client.post(
+            f"/api/analysis/{test_document_with_analysis.id}/cibil/simulate",
+            headers={"Authorization": f"Bearer {user_token['token']}"},
+            json={"income": values, "expenses": values},
+        )
+        
+        assert response.status_code == 422
+    
     def test_get_extracted_tables(self, client: TestClient, user_token, test_document_with_analysis):
         # Get extracted tables
         response = client.get(
@@ -162,6 +203,19 @@ class TestAnalysisAPI:
         assert "headers" in response.json()[0]
         assert "rows" in response.json()[0]
     
+    def test_get_extracted_tables_columnar(self, client: TestClient, user_token, test_document_with_analysis):
+        # Get extracted tables in their column-wise encoding
+        response = client.get(
+            f"/api/analysis/{test_document_with_analysis.id}/tables?encoding=columnar",
+            headers={"Authorization": f"Bearer {user_token['token']}"},
+        )
+        
+        # Check response
+        assert response.status_code == 200
+        assert response.json()["format"] == "columnar"
+        assert len(response.json()["tables"]) > 0
+        assert "columns" in response.json()["tables"][0]
+    
     def test_get_ocr_text(self, client: TestClient, user_token, test_document_with_analysis):
         # Get OCR text
         response = client.get(
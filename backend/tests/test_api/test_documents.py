@@ -131,6 +131,21 @@ class TestDocumentsAPI:
         # Check response
         assert response.status_code == 404
     
+    @patch('app.services.document_service.process_documents_task.delay')
+    def test_process_documents_batch(self, mock_delay, client: TestClient, user_token, test_document):
+        # Queue several documents at once
+        response = client.post(
+            "/api/documents/process-batch",
+            json={"document_ids": [test_document.id, 999]},
+            headers={"Authorization": f"Bearer {user_token['token']}"},
+        )
+        
+        # Check response
+        assert response.status_code == 202
+        assert response.json()["queued"] == [test_document.id]
+        assert response.json()["notFound"] == [999]
+        mock_delay.assert_called_once_with([test_document.id])
+    
     def test_get_document_status(self, client: TestClient, user_token, test_document):
         # Get document status
         response = client.get(
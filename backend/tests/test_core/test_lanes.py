@@ -0,0 +1,60 @@
+from unittest.mock import patch
+from app.core import lanes
+
+INTERACTIVE = lanes.queue_for(lanes.INTERACTIVE)
+STANDARD = lanes.queue_for(lanes.STANDARD)
+BULK = lanes.queue_for(lanes.BULK)
+
+class TestClassify:
+    def test_lanes_by_pages_and_size(self):
+        assert lanes.classify(1, 200_000) == lanes.INTERACTIVE
+        assert lanes.classify(12, 800_000) == lanes.STANDARD
+        assert lanes.classify(500, 900_000) == lanes.BULK
+        # A single page scan can still be too large to be quick
+        assert lanes.classify(1, 8 * 1024 * 1024) == lanes.BULK
+    
+    def test_unknown_page_count_is_never_interactive(self):
+        assert lanes.classify(None, 1000) == lanes.STANDARD
+    
+    def test_unknown_lane_uses_standard_queue(self):
+        assert lanes.queue_for("huge") == STANDARD
+
+def _drain(cycle, backlog, messages):
+    """
+    Simulate the Redis transport: pop from the first non-empty queue in
+    cycle order, then rotate
+    """
+    served = []
+    for _ in range(messages):
+        queue = next(q for q in cycle.consume(len(cycle.items)) if backlog[q])
+        backlog[queue] -= 1
+        served.append(queue)
+        cycle.rotate(queue)
+    return served
+
+class TestWeightedCycle:
+    def _cycle(self):
+        with patch.object(lanes.settings, "DOCUMENT_LANE_WEIGHTS", "interactive:3,standard:2,bulk:1"):
+            cycle = lanes.weighted_cycle()
+        cycle.update([BULK, STANDARD, INTERACTIVE])
+        return cycle
+    
+    def test_busy_lanes_share_by_weight(self):
+        served = _drain(self._cycle(), {INTERACTIVE: 100, STANDARD: 100, BULK: 100}, 60)
+        
+        assert served[:6] == [INTERACTIVE] * 3 + [STANDARD] * 2 + [BULK]
+        assert (served.count(INTERACTIVE), served.count(STANDARD), served.count(BULK)) == (30, 20, 10)
+    
+    def test_idle_lanes_do_not_hold_back_others(self):
+        served = _drain(self._cycle(), {INTERACTIVE: 0, STANDARD: 0, BULK: 5}, 5)
+        
+        assert served == [BULK] * 5
+    
+    def test_interactive_work_is_picked_up_behind_bulk_backlog(self):
+        cycle = self._cycle()
+        backlog = {INTERACTIVE: 0, STANDARD: 0, BULK: 100}
+        _drain(cycle, backlog, 10)
+        
+        backlog[INTERACTIVE] = 1
+        
+        assert _drain(cycle, backlog, 2)[0] == INTERACTIVE
@@ -1,7 +1,7 @@
 import pytest
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
-from app.db.models import User, Client, Document, Analysis, ExtractedData, OCRResult, UserRole, DocumentStatus
+from app.db.models import User, Client, Document, Analysis, ExtractedData, OCRResult, OCRPage, UserRole, DocumentStatus
 from app.core.security import get_password_hash
 
 class TestUserModel:
@@ -298,4 +298,22 @@ class TestAnalysisModel:
         assert db_analysis is not None
         assert db_analysis.document_id == document.id
         assert db_analysis.cibil_score == 750.0
-        assert db_analysis.summary == "Test summary"
\ No newline at end of file
+        assert db_analysis.summary == "Test summary"
+
+class TestOCRPageModel:
+    def test_document_pages_ordered(self, db: Session, test_document):
+        for number in (2, 1):
+            db.add(OCRPage(
+                document_id=test_document.id,
+                page_number=number,
+                text=f"Page {number}",
+                confidence=0.9,
+                method="ocr",
+                page_hash=f"hash{number}",
+                ocr_config="config",
+            ))
+        db.commit()
+        db.refresh(test_document)
+        
+        assert [page.page_number for page in test_document.ocr_pages] == [1, 2]
+        assert test_document.ocr_pages[0].text == "Page 1"
@@ -1,6 +1,9 @@
 import pytest
+import numpy as np
 from unittest.mock import patch
-from app.services import analysis_service
+from app.db.models import Analysis, Document, ExtractedData
+from app.core.config import settings
+from app.services import analysis_service, scoring_models
 from unittest.mock import MagicMock
 class TestAnalysisService:
     async def test_generate_summary(self):
@@ -127,4 +130,119 @@ class TestAnalysisService:
         # Check report
         assert report is not None
         assert isinstance(report, bytes)
-        assert report.startswith(b'PK')
\ No newline at end of file
+        assert report.startswith(b'PK')
+
+class TestBatchScoring:
+    def test_matches_scalar_score(self):
+        rng = np.random.default_rng(0)
+        records = [
+            {field: float(value) for field, value in zip(analysis_service.CIBIL_FIELDS, row)}
+            for row in rng.uniform(-1e6, 1e7, size=(500, 4))
+        ]
+        records += [
+            {},
+            None,
+            {"income": 100, "assets": 100},
+            {"income": 100, "expenses": 500, "assets": 100, "liabilities": 0},
+            {"income": "100", "expenses": 1, "assets": 1, "liabilities": 1},
+            {"income": 100, "expenses": None, "assets": 100, "liabilities": 1},
+        ]
+        
+        scores = analysis_service.score_financial_data(records)
+        
+        expected = [analysis_service.calculate_cibil_score(record or {}) for record in records]
+        assert scores == pytest.approx(expected)
+    
+    def test_array_inputs_are_clamped(self):
+        scores = analysis_service.calculate_cibil_scores(
+            np.array([1e6, 1e6, 0.0]), np.array([0.0, 2e6, 1.0]),
+            np.array([1e6, 1e6, 1e6]), np.array([0.0, 5e6, 1.0]),
+        )
+        
+        assert scores.tolist() == [900.0, 750.0, 600.0]
+    
+    def test_rescore_analyses_in_chunks(self, db, test_analysis, test_user, test_client):
+        analysis_ids = [test_analysis.id]
+        for income in (1000, 2000):
+            document = Document(title="Statement", file_path="/tmp/s.pdf", file_type="application/pdf",
+                                client_id=test_client.id, user_id=test_user.id)
+            db.add(document)
+            db.flush()
+            db.add(ExtractedData(document_id=document.id, json_data={
+                "income": income, "expenses": 500, "assets": 1000, "liabilities": 250,
+            }))
+            analysis = Analysis(document_id=document.id, cibil_score=0, cibil_model="ratio:0")
+            db.add(analysis)
+            db.flush()
+            analysis_ids.append(analysis.id)
+        db.commit()
+        
+        rescored = analysis_service.rescore_analyses(db, chunk_size=1)
+        
+        scores = {a.id: a.cibil_score for a in db.query(Analysis).filter(Analysis.id.in_(analysis_ids))}
+        # The fixture analysis is already scored by the active model
+        assert rescored == 2
+        assert scores[analysis_ids[0]] == 750
+        assert scores[analysis_ids[1]] == pytest.approx(750 + 50 + 75)
+        assert scores[analysis_ids[2]] == pytest.approx(750 + 75 + 75)
+        assert analysis_service.rescore_analyses(db) == 0
+
+class TestCibilSimulation:
+    def test_grid_matches_scalar_scores(self):
+        base = {"income": 1000, "expenses": 500, "assets": 2000, "liabilities": 1000}
+        axes = {"expenses": [0, 800, 1500], "liabilities": [0, 1000, 2500, 4000]}
+        
+        baseline, scores = analysis_service.simulate_cibil_scores(base, axes)
+        
+        assert baseline == analysis_service.calculate_cibil_score(base)
+        assert scores.shape == (3, 4)
+        for i, expenses in enumerate(axes["expenses"]):
+            for j, liabilities in enumerate(axes["liabilities"]):
+                scenario = dict(base, expenses=expenses, liabilities=liabilities)
+                assert scores[i, j] == pytest.approx(analysis_service.calculate_cibil_score(scenario))
+    
+    def test_large_grid_single_pass(self):
+        axes = {"income": np.linspace(0, 1e7, 100).tolist(), "liabilities": np.linspace(0, 1e7, 100).tolist()}
+        
+        _, scores = analysis_service.simulate_cibil_scores({"assets": 5e6, "expenses": 1e6}, axes)
+        
+        assert scores.shape == (100, 100)
+        assert scores[0].tolist() == [600.0] * 100
+        assert ((scores >= 300) & (scores <= 900)).all()
+
+class TestScoringModels:
+    @pytest.fixture(autouse=True)
+    def flat_model(self):
+        with patch.dict(scoring_models._models):
+            yield scoring_models.register_model(
+                scoring_models.ScoringModel("flat", 2, lambda income, *rest: np.full(len(income), 700.0))
+            )
+    
+    def test_registry_lookup(self, flat_model):
+        scoring_models.register_model(scoring_models.ScoringModel("flat", 1, None))
+        
+        assert scoring_models.get_model("flat") is flat_model
+        assert scoring_models.get_model("flat:1").version == 1
+        assert scoring_models.get_model("ratio") is analysis_service.RATIO_MODEL
+        with pytest.raises(ValueError):
+            scoring_models.get_model("missing")
+        with pytest.raises(ValueError):
+            scoring_models.register_model(scoring_models.ScoringModel("flat", 2, None))
+    
+    def test_stale_scores_refresh_on_read_only(self, db, test_analysis):
+        assert test_analysis.cibil_model == "ratio:1"
+        
+        # Current scores are left alone
+        analysis_service.refresh_scores(db, [test_analysis])
+        assert test_analysis.cibil_score == 750
+        
+        with patch.object(settings, 'CIBIL_SCORING_MODEL', 'flat'):
+            analysis_service.refresh_scores(db, [test_analysis])
+        
+        db.refresh(test_analysis)
+        assert test_analysis.cibil_score == 700
+        assert test_analysis.cibil_model == "flat:2"
+    
+    def test_score_with_active_model(self):
+        with patch.object(settings, 'CIBIL_SCORING_MODEL', 'flat:2'):
+            assert analysis_service.score_with_active_model({"income": 1}) == (700.0, "flat:2")
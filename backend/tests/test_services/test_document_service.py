@@ -1,5 +1,6 @@
 import pytest
 import os
+import time
 from unittest.mock import patch, MagicMock
 from sqlalchemy.orm import Session
 from app.db.models import User, Document, DocumentStatus, Analysis, ExtractedData, OCRResult
@@ -153,4 +154,78 @@ class TestDocumentService:
         results = document_service.get_analysis_results(db, document.id)
         
         # Results should be empty
-        assert results == {}
\ No newline at end of file
+        assert results == {}
+
+class TestQueueDocuments:
+    @pytest.fixture
+    def documents(self, db: Session, test_user, test_client):
+        statuses = [DocumentStatus.UPLOADED, DocumentStatus.FAILED, DocumentStatus.PROCESSING, DocumentStatus.COMPLETED]
+        documents = [
+            Document(
+                title=f"Statement {i}",
+                file_path=f"/path/to/{i}.pdf",
+                file_type="application/pdf",
+                status=status,
+                client_id=test_client.id,
+                user_id=test_user.id,
+            )
+            for i, status in enumerate(statuses)
+        ]
+        db.add_all(documents)
+        db.commit()
+        return [document.id for document in documents]
+    
+    @patch.object(document_service.process_documents_task, 'delay')
+    def test_queues_owned_idle_documents_in_one_message(self, mock_delay, db: Session, test_user, documents):
+        other = User(username="other", email="other@example.com", password_hash="x", role="ca", is_active=True)
+        db.add(other)
+        db.commit()
+        foreign = Document(title="Other", file_path="/path/to/other.pdf", file_type="application/pdf",
+                           status=DocumentStatus.UPLOADED, user_id=other.id)
+        db.add(foreign)
+        db.commit()
+        
+        result = document_service.queue_documents(db, test_user.id, documents + [foreign.id, 9999])
+        
+        uploaded, failed, processing, completed = documents
+        assert result == {
+            "queued": [uploaded, failed],
+            "alreadyProcessing": [processing],
+            "alreadyCompleted": [completed],
+            "notFound": sorted([foreign.id, 9999]),
+        }
+        mock_delay.assert_called_once_with([uploaded, failed])
+        db.expire_all()
+        assert db.get(Document, failed).status == DocumentStatus.PROCESSING
+        assert db.get(Document, foreign.id).status == DocumentStatus.UPLOADED
+    
+    @patch.object(document_service.process_documents_task, 'delay')
+    def test_queues_by_client(self, mock_delay, db: Session, test_user, test_client, documents):
+        result = document_service.queue_documents(db, test_user.id, client_id=test_client.id)
+        
+        assert result["queued"] == documents[:2]
+        # Nothing left to queue on a second request
+        assert document_service.queue_documents(db, test_user.id, client_id=test_client.id)["queued"] == []
+        assert mock_delay.call_count == 1
+    
+    @patch.object(document_service.process_documents_task, 'delay')
+    def test_large_backlog_queues_quickly(self, mock_delay, db: Session, test_user):
+        db.bulk_insert_mappings(Document, [
+            {
+                "title": f"Invoice {i}",
+                "file_path": f"/path/to/{i}.png",
+                "file_type": "image/png",
+                "status": DocumentStatus.UPLOADED,
+                "user_id": test_user.id,
+            }
+            for i in range(1000)
+        ])
+        db.commit()
+        ids = [document_id for (document_id,) in db.query(Document.id)]
+        
+        start = time.perf_counter()
+        result = document_service.queue_documents(db, test_user.id, ids)
+        
+        assert time.perf_counter() - start < 1
+        assert len(result["queued"]) == 1000
+        assert len(mock_delay.call_args.args[0]) == 1000
@@ -0,0 +1,152 @@
+import time
+import pytest
+from app.services import extraction_service
+
+STATEMENT = """
+Statement of Profit and Loss
+Revenue from operations 4,500,000
+Other income 120,000
+Total expenses 3,100,000
+
+Balance Sheet
+Total assets 9,800,000
+Total liabilities 2,400,000
+"""
+
+class TestExtractionService:
+    def test_extracts_all_headline_fields(self):
+        data = extraction_service.extract_financial_data(STATEMENT)
+        
+        assert data == {
+            "income": 4500000,
+            "expenses": 3100000,
+            "assets": 9800000,
+            "liabilities": 2400000,
+        }
+    
+    def test_specific_synonym_beats_earlier_generic_one(self):
+        text = "Income tax note 7\nTotal income 880,000"
+        
+        data = extraction_service.extract_financial_data(text)
+        
+        assert data["income"] == 880000
+    
+    def test_years_and_note_references_are_not_figures(self):
+        data = extraction_service.extract_financial_data(
+            "Total income for the year 2023 12,00,000\nTotal expenses (Note 21) 5,00,000"
+        )
+        
+        assert data["income"] == 1200000
+        assert data["expenses"] == 500000
+    
+    def test_missing_fields_fall_back_to_defaults(self):
+        data = extraction_service.extract_financial_data("Sales 1,000")
+        
+        assert data["income"] == 1000
+        assert data["assets"] == extraction_service.DEFAULT_FINANCIAL_DATA["assets"]
+        assert data["liabilities"] == extraction_service.DEFAULT_FINANCIAL_DATA["liabilities"]
+    
+    def test_scan_terms_matches_across_whitespace(self):
+        matches = extraction_service.scan_terms("total\n  assets 10")
+        
+        assert [(field, rank) for field, rank, _, _ in matches] == [("assets", 0)]
+    
+    def test_debit_marks_and_rupee_close_reach_the_parser(self):
+        data = extraction_service.extract_financial_data("Total income ₹ 1,00,000/-\nTotal liabilities 1,234 Dr")
+        
+        assert data["income"] == 100000
+        assert data["liabilities"] == -1234
+    
+    def test_scan_terms_matches_whole_words(self):
+        matches = extraction_service.scan_terms("costly repairs 10\nsales 20")
+        
+        assert [field for field, _, _, _ in matches] == ["income"]
+    
+    def test_figures_are_scaled_by_unit_header(self):
+        text = "Balance Sheet (₹ in lakhs)\nTotal assets 98.50\nTotal liabilities (12.00)"
+        
+        data = extraction_service.extract_financial_data(text)
+        
+        assert data["assets"] == 9850000
+        assert data["liabilities"] == -1200000
+    
+    def test_large_document_single_pass(self):
+        text = ("Particulars amount 1,000 note 4 " * 50 + "\n") * 2000 + STATEMENT
+        
+        start = time.perf_counter()
+        data = extraction_service.extract_financial_data(text)
+        
+        assert data["assets"] == 9800000
+        assert time.perf_counter() - start < 5
+
+def _word(text, left, top, width=None):
+    return {"text": text, "left": left, "top": top, "width": width or 8 * len(text), "height": 12}
+
+def _row(top, label, cells):
+    """Label words from x=10, then (text, right_edge) cells right-aligned"""
+    words = []
+    x = 10
+    for part in label.split():
+        words.append(_word(part, x, top))
+        x += 8 * len(part) + 6
+    for text, right in cells:
+        words.append(_word(text, right - 8 * len(text), top + 1))
+    return words
+
+class TestLayoutExtraction:
+    def test_takes_current_year_column_not_note_or_prior_year(self):
+        words = (
+            _row(10, "Particulars Note", [("2023", 400), ("2022", 520)])
+            + _row(40, "Revenue from operations", [("21", 300), ("45,00,000", 400), ("38,00,000", 520)])
+            + _row(70, "Total expenses", [("22", 300), ("31,00,000", 400), ("29,50,000", 520)])
+        )
+        
+        data = extraction_service.extract_from_words(words)
+        
+        assert data == {"income": 4500000, "expenses": 3100000}
+    
+    def test_latest_year_column_wins_when_reversed(self):
+        words = (
+            _row(10, "Particulars", [("2022", 400), ("2023", 520)])
+            + _row(40, "Total assets", [("8,00,000", 400), ("9,80,000", 520)])
+        )
+        
+        assert extraction_service.extract_from_words(words) == {"assets": 980000}
+    
+    def test_layout_overrides_text_scan(self):
+        words = (
+            _row(10, "Particulars Note", [("2023", 400), ("2022", 520)])
+            + _row(40, "Total liabilities", [("14", 300), ("24,00,000", 400), ("26,00,000", 520)])
+        )
+        text = "Total liabilities 14 24,00,000 26,00,000"
+        
+        data = extraction_service.extract_financial_data(text, [{"page": 1, "words": words}])
+        
+        # The text scan alone picks the note number
+        assert extraction_service.extract_financial_data(text)["liabilities"] == 14
+        assert data["liabilities"] == 2400000
+    
+    def test_dense_page_is_fast(self):
+        words = _row(0, "Particulars Note", [("2023", 400), ("2022", 520)])
+        for i in range(1, 3000):
+            words += _row(i * 20, f"Item {i}", [("7", 300), ("1,000", 400), ("900", 520)])
+        words += _row(60000, "Total income", [("9", 300), ("12,345", 400), ("11,000", 520)])
+        
+        start = time.perf_counter()
+        data = extraction_service.extract_from_words(words)
+        
+        assert data == {"income": 12345}
+        assert time.perf_counter() - start < 2
+
+class TestFiscalYear:
+    def test_year_ended_phrase(self):
+        text = "Balance Sheet as at 2021\nStatement of profit and loss for the year ended 31st March, 2023"
+        assert extraction_service.detect_fiscal_year(text) == 2023
+    
+    def test_fy_range_uses_end_year(self):
+        assert extraction_service.detect_fiscal_year("Annual report FY 2022-23") == 2023
+        assert extraction_service.detect_fiscal_year("F.Y. 1999-00") == 2000
+    
+    def test_falls_back_to_latest_header_year(self):
+        assert extraction_service.detect_fiscal_year("Particulars 2022 2021\nTotal income 100 90") == 2022
+        assert extraction_service.detect_fiscal_year("Total income 100") is None
@@ -0,0 +1,78 @@
+import os
+import time
+import pytest
+from unittest.mock import patch
+from PIL import Image
+from app.services import ocr_service
+from app.services.ocr_cache import OCRCache, hash_file, hash_image
+
+class TestOCRCache:
+    def test_get_and_set(self, tmp_path):
+        cache = OCRCache(str(tmp_path), 1024 * 1024)
+        key = cache.make_key("abc", "config")
+        
+        assert cache.get(key) is None
+        cache.set(key, {"text": "Revenue", "confidence": 0.9})
+        assert cache.get(key) == {"text": "Revenue", "confidence": 0.9}
+        # Different OCR settings never share an entry
+        assert cache.get(cache.make_key("abc", "other")) is None
+    
+    def test_evicts_least_recently_used(self, tmp_path):
+        cache = OCRCache(str(tmp_path), 250)
+        value = {"text": "x" * 80}
+        
+        cache.set("aa1", value)
+        cache.set("aa2", value)
+        # Backdate the first two entries, then touch the first
+        for i, key in enumerate(("aa1", "aa2")):
+            os.utime(cache._path(key), (time.time() - 100 + i, time.time() - 100 + i))
+        assert cache.get("aa1") is not None
+        
+        cache.set("aa3", value)
+        
+        assert cache.get("aa2") is None
+        assert cache.get("aa1") is not None
+        assert cache.get("aa3") is not None
+    
+    def test_writes_do_not_walk_the_cache(self, tmp_path):
+        cache = OCRCache(str(tmp_path), 1024 * 1024)
+        
+        with patch('app.services.ocr_cache.os.walk', wraps=os.walk) as walk:
+            for i in range(10):
+                cache.set(f"aa{i}", {"text": "x" * 80})
+        
+        # Sized once, then tracked as entries are written
+        assert walk.call_count == 1
+        assert cache._size == sum(os.path.getsize(cache._path(f"aa{i}")) for i in range(10))
+    
+    def test_disabled_cache(self, tmp_path):
+        cache = OCRCache(str(tmp_path), 0)
+        cache.set("aa1", {"text": "x"})
+        
+        assert cache.get("aa1") is None
+        assert not os.listdir(tmp_path)
+    
+    def test_hashes(self, tmp_path):
+        path = tmp_path / "a.pdf"
+        path.write_bytes(b"statement")
+        
+        assert hash_file(str(path)) == hash_file(str(path))
+        assert hash_image(Image.new("L", (4, 4), 0)) != hash_image(Image.new("L", (4, 4), 255))
+    
+    def test_duplicate_file_served_from_cache(self, tmp_path):
+        path = tmp_path / "statement.pdf"
+        path.write_bytes(b"%PDF-1.4 statement")
+        duplicate = tmp_path / "copy.pdf"
+        duplicate.write_bytes(b"%PDF-1.4 statement")
+        result = ocr_service.merge_document_pages([
+            {"page": 1, "text": "Revenue", "confidence": 0.9, "words": [], "method": "ocr", "disk_write_bytes": 4096},
+        ])
+        
+        with patch('app.services.ocr_service.ocr_cache', OCRCache(str(tmp_path / "cache"), 1024 * 1024)):
+            assert ocr_service.cached_result(str(path)) is None
+            ocr_service.cache_result(str(path), result)
+            cached = ocr_service.cached_result(str(duplicate))
+        
+        assert cached["text"] == result["text"]
+        # Served from the cache, the duplicate cost no page writes
+        assert cached["metrics"]["disk_write_bytes"] == 0
@@ -1,48 +1,39 @@
 import pytest
 import os
-from unittest.mock import patch, mock_open
+import multiprocessing
+import threading
+from unittest.mock import patch, MagicMock
 from app.services import ocr_service
+from app.services.ocr_cache import OCRCache
+from app.core.config import settings
+from PIL import Image, ImageDraw
+
+def _page_thread_in_daemon(queue):
+    # Runs in a daemonic child, like a Celery prefork worker
+    with patch.object(settings, 'OCR_WORKERS', 2):
+        ocr_service._page_executor = None
+        executor = ocr_service._get_page_executor()
+        queue.put(executor and executor.submit(lambda: threading.current_thread().name).result())
 
 class TestOCRService:
-    @patch('os.path.splitext')
-    @patch('builtins.open', new_callable=mock_open, read_data=b'test data')
-    async def test_extract_text_pdf(self, mock_file, mock_splitext):
-        # Mock return values
-        mock_splitext.return_value = ('test', '.pdf')
+    @patch('app.services.ocr_service._get_page_executor', return_value=None)
+    @patch('app.services.ocr_service._ocr_page')
+    def test_image_document_is_one_ocr_page(self, mock_ocr_page, mock_executor, tmp_path):
+        mock_ocr_page.return_value = {"text": "Financial Statement", "confidence": 80, "words": []}
+        file_path = str(tmp_path / "scan.jpg")
+        Image.new("RGB", (8, 8), "white").save(file_path)
         
-        # Extract text
-        result = await ocr_service.extract_text('/path/to/test.pdf')
+        page_count, native = ocr_service.plan_document_pages(file_path)
+        page = ocr_service.ocr_document_page(file_path, 1)
         
-        # Check result
-        assert "text" in result
-        assert "confidence" in result
-        assert result["confidence"] > 0
-        assert "Financial Statement" in result["text"]
+        assert (page_count, native) == (1, {})
+        assert (page["page"], page["method"], page["text"]) == (1, "ocr", "Financial Statement")
     
-    @patch('os.path.splitext')
-    @patch('builtins.open', new_callable=mock_open, read_data=b'test data')
-    async def test_extract_text_image(self, mock_file, mock_splitext):
-        # Mock return values
-        mock_splitext.return_value = ('test', '.jpg')
-        
-        # Extract text
-        result = await ocr_service.extract_text('/path/to/test.jpg')
-        
-        # Check result
-        assert "text" in result
-        assert "confidence" in result
-        assert result["confidence"] > 0
-        assert "Financial Statement" in result["text"]
-    
-    @patch('os.path.splitext')
-    @patch('builtins.open', new_callable=mock_open, read_data=b'test data')
-    async def test_extract_text_unsupported_format(self, mock_file, mock_splitext):
-        # Mock return values
-        mock_splitext.return_value = ('test', '.txt')
-        
-        # Extract text should raise ValueError
+    def test_unsupported_format(self):
         with pytest.raises(ValueError):
-            await ocr_service.extract_text('/path/to/test.txt')
+            ocr_service.plan_document_pages('/path/to/test.txt')
+        with pytest.raises(ValueError):
+            ocr_service.ocr_document_page('/path/to/test.txt', 1)
     
     async def test_extract_structured_data(self):
         # Extract structured data
@@ -56,15 +47,354 @@ class TestOCRService:
         assert "revenue" in result
         assert "profit" in result
         assert "ratios" in result
+
+def _tsv(rows):
+    """Build a minimal image_to_data dict from (block, par, line, text, conf) rows"""
+    data = {key: [] for key in ("text", "conf", "left", "top", "width", "height", "block_num", "par_num", "line_num")}
+    for i, (block, par, line, text, conf) in enumerate(rows):
+        data["text"].append(text)
+        data["conf"].append(conf)
+        data["left"].append(i * 10)
+        data["top"].append(line * 10)
+        data["width"].append(8)
+        data["height"].append(8)
+        data["block_num"].append(block)
+        data["par_num"].append(par)
+        data["line_num"].append(line)
+    return data
+
+class TestPageOCR:
+    @pytest.fixture(autouse=True)
+    def no_cache(self):
+        with patch('app.services.ocr_service.ocr_cache', OCRCache("", 0)), \
+                patch.object(settings, 'OCR_PREPROCESS', False), \
+                patch.object(settings, 'OCR_ENGINE', 'pytesseract'):
+            yield
     
-    async def test_extract_tables(self):
-        # Extract tables
-        result = await ocr_service.extract_tables('/path/to/test.pdf')
+    def test_page_pool_runs_in_daemonic_worker(self):
+        context = multiprocessing.get_context("fork")
+        queue = context.Queue()
+        child = context.Process(target=_page_thread_in_daemon, args=(queue,), daemon=True)
+        child.start()
+        child.join(10)
         
-        # Check result
-        assert len(result) > 0
-        assert "id" in result[0]
-        assert "title" in result[0]
-        assert "headers" in result[0]
-        assert "rows" in result[0]
-        assert len(result[0]["rows"]) > 0
\ No newline at end of file
+        assert queue.get(timeout=1).startswith("ocr-page")
+    
+    @patch('app.services.ocr_service.pytesseract')
+    def test_ocr_pages_preserves_page_order(self, mock_tesseract):
+        from concurrent.futures import ThreadPoolExecutor
+        
+        mock_tesseract.image_to_data.side_effect = lambda img, **kwargs: _tsv(
+            [(1, 1, 1, f"text{img.width}", 80), (1, 1, 1, "page", 90)]
+        )
+        images = [Image.new("L", (i, 1)) for i in range(1, 6)]
+        
+        with patch('app.services.ocr_service._get_page_executor', return_value=ThreadPoolExecutor(4)):
+            pages = ocr_service.ocr_pages(images)
+        
+        assert [page["text"] for page in pages] == [f"text{i} page" for i in range(1, 6)]
+        assert all(page["confidence"] == 85 for page in pages)
+        # Recognition runs once per page
+        assert mock_tesseract.image_to_data.call_count == 5
+        assert not mock_tesseract.image_to_string.called
+    
+    def test_words_rebuild_text_and_skip_layout_rows(self):
+        data = _tsv([
+            (1, 1, 1, "Revenue", 96),
+            (1, 1, 1, "5,000", 91),
+            (1, 1, 2, "Expenses", 88),
+            (1, 2, 1, "Notes", 70),
+        ])
+        data["text"].insert(0, "")
+        for key in ("conf", "left", "top", "width", "height", "block_num", "par_num", "line_num"):
+            data[key].insert(0, -1 if key == "conf" else 0)
+        
+        words = ocr_service.words_from_data(data)
+        
+        assert len(words) == 4
+        assert words[0]["text"] == "Revenue"
+        assert ocr_service.text_from_words(words) == "Revenue 5,000\nExpenses\n\nNotes"
+    
+    def test_merge_pages(self):
+        pages = [
+            {"text": "first", "confidence": 90, "words": []},
+            {"text": "second", "confidence": 0, "words": []},
+        ]
+        
+        result = ocr_service._merge_pages(pages)
+        
+        assert result["text"] == "\n--- Page 1 ---\nfirst\n--- Page 2 ---\nsecond"
+        assert result["confidence"] == pytest.approx(0.45)
+    
+    @patch('app.services.ocr_service._get_page_executor', return_value=None)
+    @patch('app.services.ocr_service._ocr_page')
+    @patch('app.services.ocr_service.convert_from_path')
+    @patch('app.services.ocr_service._native_pages')
+    def test_pdf_text_layer_skips_ocr(self, mock_native, mock_convert, mock_ocr_page, mock_executor):
+        layer = "Statement of Profit and Loss for the year"
+        mock_native.return_value = [(layer, []), ("", []), (" ", []), (layer, [])]
+        mock_convert.side_effect = lambda path, first_page, last_page, **kwargs: [
+            Image.new("L", (n, 1)) for n in range(first_page, last_page + 1)
+        ]
+        mock_ocr_page.side_effect = lambda img: {"text": f"img{img.width}", "confidence": 80, "words": []}
+        
+        page_count, native = ocr_service.plan_document_pages('/path/to/test.pdf')
+        result = ocr_service.merge_document_pages([
+            native.get(number) or ocr_service.ocr_document_page('/path/to/test.pdf', number)
+            for number in range(1, page_count + 1)
+        ])
+        
+        # Only the two scanned pages are rasterized
+        assert [call.kwargs["first_page"] for call in mock_convert.call_args_list] == [2, 3]
+        assert [page["method"] for page in result["pages"]] == ["native", "ocr", "ocr", "native"]
+        assert result["methods"] == {"native": 2, "ocr": 2}
+        assert "--- Page 2 ---\nimg2" in result["text"]
+        assert result["confidence"] == pytest.approx(0.9)
+    
+    def test_page_runs(self):
+        assert ocr_service._page_runs([1, 2, 3, 5, 7, 8]) == [(1, 3), (5, 5), (7, 8)]
+    
+    @patch('app.services.ocr_service.settings')
+    @patch('app.services.ocr_service.convert_from_path')
+    def test_page_windows_bound_rasterization(self, mock_convert, mock_settings):
+        mock_settings.OCR_PAGE_WINDOW = 2
+        rendered = []
+        
+        def convert(path, first_page, last_page, **kwargs):
+            images = [MagicMock() for _ in range(first_page, last_page + 1)]
+            rendered.extend(images)
+            return images
+        
+        mock_convert.side_effect = convert
+        
+        windows = ocr_service._iter_page_windows('/path/to/test.pdf', [1, 2, 3, 4, 5, 9])
+        first = next(windows)
+        assert [number for number, _ in first] == [1, 2]
+        # Nothing beyond the current window is rendered yet
+        assert len(rendered) == 2
+        
+        rest = [[number for number, _ in window] for window in windows]
+        assert rest == [[3, 4], [5], [9]]
+        assert all(img.close.called for img in rendered)
+        # Pages are decoded in memory, never via a temp directory
+        assert all("output_folder" not in call.kwargs for call in mock_convert.call_args_list)
+    
+    @patch('app.services.ocr_service.disk_write_bytes')
+    @patch('app.services.ocr_service._get_page_executor', return_value=None)
+    @patch('app.services.ocr_service._image_to_data')
+    @patch('app.services.ocr_service.convert_from_path')
+    @patch('app.services.ocr_service._native_pages')
+    def test_disk_writes_reported_per_page(self, mock_native, mock_convert, mock_data,
+                                           mock_executor, mock_written):
+        mock_native.return_value = [("", []), ("", [])]
+        mock_convert.side_effect = lambda path, first_page, last_page, **kwargs: [
+            Image.new("L", (n, 1)) for n in range(first_page, last_page + 1)
+        ]
+        mock_data.return_value = _tsv([(1, 1, 1, "Total", 90)])
+        # Rendering writes nothing; each OCR call writes 4096 bytes
+        mock_written.side_effect = [0, 0, 0, 4096, 4096, 4096, 4096, 8192]
+        
+        pages = [ocr_service.ocr_document_page('/path/to/test.pdf', number) for number in (1, 2)]
+        result = ocr_service.merge_document_pages(pages)
+        
+        assert [page["disk_write_bytes"] for page in pages] == [4096, 4096]
+        assert result["metrics"] == {"disk_write_bytes": 8192, "disk_write_bytes_per_page": 4096}
+    
+    @patch('app.services.ocr_service._ocr_page')
+    def test_cached_pages_are_not_ocred_again(self, mock_ocr_page, tmp_path):
+        mock_ocr_page.side_effect = lambda img: {"text": "fresh", "confidence": 80, "words": []}
+        unchanged = Image.new("L", (4, 4), 0)
+        changed = Image.new("L", (4, 4), 255)
+        cache = OCRCache(str(tmp_path), 1024 * 1024)
+        cache.set(
+            cache.make_key(ocr_service.hash_image(unchanged), ocr_service.ocr_config_fingerprint()),
+            {"text": "stored", "confidence": 90, "words": []},
+        )
+        
+        with patch('app.services.ocr_service.ocr_cache', cache):
+            pages = ocr_service.ocr_pages([unchanged, changed])
+        
+        assert mock_ocr_page.call_count == 1
+        assert [page["text"] for page in pages] == ["stored", "fresh"]
+        assert pages[0]["page_hash"] == ocr_service.hash_image(unchanged)
+    
+    @patch('app.services.ocr_service._get_page_executor', return_value=None)
+    @patch('app.services.ocr_service._ocr_page')
+    @patch('app.services.ocr_service.convert_from_path')
+    @patch('app.services.ocr_service._native_pages')
+    def test_pages_planned_ocred_and_merged_one_by_one(self, mock_native, mock_convert, mock_ocr_page,
+                                                       mock_executor):
+        layer = "Statement of Profit and Loss for the year"
+        mock_native.return_value = [(layer, []), ("", [])]
+        mock_convert.side_effect = lambda path, first_page, last_page, **kwargs: [
+            Image.new("L", (n, 1)) for n in range(first_page, last_page + 1)
+        ]
+        mock_ocr_page.side_effect = lambda img: {"text": f"img{img.width}", "confidence": 80, "words": []}
+        
+        page_count, native = ocr_service.plan_document_pages('/path/to/test.pdf')
+        scanned = ocr_service.ocr_document_page('/path/to/test.pdf', 2)
+        result = ocr_service.merge_document_pages([native[1], scanned])
+        
+        assert page_count == 2
+        assert list(native) == [1]
+        assert mock_convert.call_args.kwargs["first_page"] == mock_convert.call_args.kwargs["last_page"] == 2
+        assert scanned["page"] == 2
+        assert result["text"] == f"\n--- Page 1 ---\n{layer}\n--- Page 2 ---\nimg2"
+        assert [page["method"] for page in result["pages"]] == ["native", "ocr"]
+        assert result["confidence"] == pytest.approx(0.9)
+    
+    @patch('app.services.ocr_service._ocr_page')
+    def test_extract_image_batch(self, mock_ocr_page, tmp_path):
+        mock_ocr_page.side_effect = lambda img: {"text": f"w{img.width}", "confidence": 50, "words": []}
+        paths = []
+        for width in (3, 5):
+            path = tmp_path / f"{width}.png"
+            Image.new("L", (width, 2), 255).save(path)
+            paths.append(str(path))
+        paths.insert(1, str(tmp_path / "missing.png"))
+        
+        results = ocr_service.extract_image_batch(paths)
+        
+        assert [result and result["text"] for result in results] == ["w3", None, "w5"]
+        assert results[0]["confidence"] == pytest.approx(0.5)
+        assert results[0]["pages"][0]["method"] == "ocr"
+    
+    def test_data_from_tsv(self):
+        tsv = "\n".join([
+            "level\tpage_num\tblock_num\tpar_num\tline_num\tword_num\tleft\ttop\twidth\theight\tconf\ttext",
+            "4\t1\t1\t1\t1\t0\t0\t0\t100\t10\t-1\t",
+            "5\t1\t1\t1\t1\t1\t5\t2\t40\t10\t91.5\tRevenue",
+        ])
+        
+        words = ocr_service.words_from_data(ocr_service.data_from_tsv(tsv))
+        
+        assert len(words) == 1
+        assert words[0]["text"] == "Revenue"
+        assert words[0]["conf"] == 91.5
+        assert words[0]["left"] == 5
+    
+    @patch('app.services.ocr_service.tesserocr')
+    def test_resident_engine_is_created_once_per_thread(self, mock_tesserocr):
+        from concurrent.futures import ThreadPoolExecutor
+        
+        api = mock_tesserocr.PyTessBaseAPI.return_value
+        api.GetTSVText.return_value = "5\t1\t1\t1\t1\t1\t0\t0\t10\t10\t80\tProfit"
+        
+        with patch.object(ocr_service, '_thread_state', threading.local()), \
+                patch.object(settings, 'OCR_ENGINE', 'tesserocr'):
+            pages = [ocr_service._ocr_page(Image.new("L", (4, 4))) for _ in range(3)]
+            mock_tesserocr.PyTessBaseAPI.assert_called_once_with(lang=settings.OCR_LANG)
+            
+            with ThreadPoolExecutor(1) as executor:
+                executor.submit(ocr_service._ocr_page, Image.new("L", (4, 4))).result()
+        
+        # A page thread does not share the calling thread's instance
+        assert mock_tesserocr.PyTessBaseAPI.call_count == 2
+        assert api.Recognize.call_count == 4
+        assert pages[0]["text"] == "Profit"
+
+def _ruled_table_image():
+    """A 3x2 ruled grid at 300 DPI over an A4-sized page"""
+    img = Image.new("RGB", (2480, 3508), "white")
+    draw = ImageDraw.Draw(img)
+    for y in (300, 400, 500, 600):
+        draw.line([(300, y), (1500, y)], fill="black", width=3)
+    for x in (300, 900, 1500):
+        draw.line([(x, 300), (x, 600)], fill="black", width=3)
+    return img
+
+class TestTableExtraction:
+    @pytest.fixture(autouse=True)
+    def settings_for_tables(self):
+        with patch.object(settings, 'OCR_PREPROCESS', False), \
+                patch.object(settings, 'OCR_ENGINE', 'pytesseract'), \
+                patch.object(settings, 'OCR_TARGET_DPI', 300):
+            yield
+    
+    @patch('app.services.ocr_service._iter_page_windows')
+    @patch('app.services.ocr_service.pdfinfo_from_path', return_value={"Pages": 1})
+    @patch('app.services.ocr_service.pytesseract')
+    def test_pdf_tables_use_text_layer_words(self, mock_tesseract, mock_info, mock_windows):
+        mock_windows.return_value = iter([[(1, _ruled_table_image())]])
+        scale = 72 / 300
+        def word(text, x, y):
+            return {"text": text, "left": x * scale, "top": y * scale, "width": 40 * scale, "height": 20 * scale}
+        pages = [{"page": 1, "method": "native", "words": [
+            word("Item", 320, 340), word("2023", 920, 340),
+            word("Revenue", 320, 440), word("5,000", 920, 440),
+            word("Expenses", 320, 540), word("3,000", 920, 540),
+        ]}]
+        
+        tables = ocr_service.extract_tables("statement.pdf", pages)
+        
+        assert tables == [{
+            "id": 1,
+            "title": "Page 1 table 1",
+            "headers": ["Item", "2023"],
+            "rows": [["Revenue", "5,000"], ["Expenses", "3,000"]],
+        }]
+        assert not mock_tesseract.image_to_data.called
+    
+    @patch('app.services.ocr_service.pytesseract')
+    def test_image_tables_ocr_each_table_once(self, mock_tesseract, tmp_path):
+        path = tmp_path / "scan.png"
+        _ruled_table_image().save(path)
+        # Word boxes relative to the cropped table region
+        data = {key: [] for key in ("text", "conf", "left", "top", "width", "height", "block_num", "par_num", "line_num")}
+        for text, left, top in [("Item", 20, 40), ("Amount", 620, 40), ("Sales", 20, 140), ("900", 620, 140)]:
+            for key, value in zip(data, (text, 90, left, top, 40, 20, 1, 1, top)):
+                data[key].append(value)
+        mock_tesseract.image_to_data.return_value = data
+        
+        tables = ocr_service.extract_tables(str(path))
+        
+        assert mock_tesseract.image_to_data.call_count == 1
+        assert tables[0]["headers"] == ["Item", "Amount"]
+        assert tables[0]["rows"] == [["Sales", "900"]]
+    
+    @patch('app.services.ocr_service.pytesseract')
+    def test_tables_reuse_stored_ocr_words(self, mock_tesseract, tmp_path):
+        path = tmp_path / "scan.png"
+        _ruled_table_image().save(path)
+        def word(text, x, y):
+            return {"text": text, "left": x, "top": y, "width": 40, "height": 20}
+        pages = [{"page": 1, "method": "ocr", "words": [
+            word("Item", 320, 340), word("Amount", 920, 340), word("Sales", 320, 440), word("900", 920, 440),
+        ]}]
+        
+        tables = ocr_service.extract_tables(str(path), pages)
+        
+        # The page was OCRed once already; its table is not OCRed again
+        assert not mock_tesseract.image_to_data.called
+        assert tables[0]["headers"] == ["Item", "Amount"]
+        assert tables[0]["rows"] == [["Sales", "900"]]
+    
+    @patch('app.services.ocr_service._image_to_data')
+    def test_tables_read_while_ocring_the_page(self, mock_data):
+        data = {key: [] for key in ("text", "conf", "left", "top", "width", "height", "block_num", "par_num", "line_num")}
+        for text, left, top in [("Item", 320, 340), ("Amount", 920, 340), ("Sales", 320, 440), ("900", 920, 440)]:
+            for key, value in zip(data, (text, 90, left, top, 40, 20, 1, 1, top)):
+                data[key].append(value)
+        mock_data.return_value = data
+        
+        page = ocr_service._ocr_page(_ruled_table_image())
+        
+        assert page["tables"] == [[["Item", "Amount"], ["Sales", "900"]]]
+    
+    @patch('app.services.ocr_service._iter_page_windows')
+    @patch('app.services.ocr_service.pdfinfo_from_path', return_value={"Pages": 2})
+    def test_pages_with_tables_are_not_rendered_again(self, mock_info, mock_windows):
+        mock_windows.return_value = iter([])
+        pages = [
+            {"page": 1, "method": "native", "words": []},
+            {"page": 2, "method": "ocr", "words": [], "tables": [[["Item", "Amount"], ["Sales", "900"]]]},
+        ]
+        
+        tables = ocr_service.extract_tables("statement.pdf", pages)
+        
+        # Only the text-layer page, never rasterized by OCR, is rendered
+        assert mock_windows.call_args.args[1] == [1]
+        assert tables == [{"id": 1, "title": "Page 2 table 1", "headers": ["Item", "Amount"], "rows": [["Sales", "900"]]}]
+    
+    def test_unreadable_file_has_no_tables(self, tmp_path):
+        assert ocr_service.extract_tables(str(tmp_path / "missing.pdf")) == []
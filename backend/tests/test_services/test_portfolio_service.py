@@ -0,0 +1,85 @@
+from datetime import datetime
+from unittest.mock import patch
+import redis
+from sqlalchemy.orm import Session
+from app.db.models import Analysis, Client, Document, ExtractedData
+from app.services import portfolio_service
+
+def _add_statement(db: Session, client: Client, year: int, score: float, assets: float, liabilities: float,
+                   model: str = "ratio:1") -> None:
+    document = Document(
+        title=f"{client.name} {year}",
+        file_path=f"/path/to/{client.id}-{year}.pdf",
+        file_type="application/pdf",
+        status="completed",
+        client_id=client.id,
+        user_id=client.ca_id,
+    )
+    db.add(document)
+    db.flush()
+    db.add(Analysis(document_id=document.id, cibil_score=score, cibil_model=model,
+                    created_at=datetime(year, 6, 1)))
+    db.add(ExtractedData(document_id=document.id, json_data={
+        "income": 1000, "expenses": 500, "assets": assets, "liabilities": liabilities,
+    }))
+    db.commit()
+
+def _client(db: Session, test_user, name: str) -> Client:
+    client = Client(name=name, email=f"{name.lower()}@example.com", ca_id=test_user.id)
+    db.add(client)
+    db.commit()
+    return client
+
+class TestPortfolioSummary:
+    def test_bands_leverage_and_deteriorated_clients(self, db: Session, test_user):
+        steady = _client(db, test_user, "Steady")
+        falling = _client(db, test_user, "Falling")
+        _add_statement(db, steady, 2022, 760, 1000, 200)
+        _add_statement(db, falling, 2021, 720, 1000, 400)
+        # Uploaded later, but the older year must not count as the latest
+        _add_statement(db, falling, 2023, 640, 1000, 800)
+        _add_statement(db, falling, 2020, 610, 1000, 900)
+        
+        result = portfolio_service.summarize(portfolio_service.load_frame(db, test_user.id))
+        
+        assert result["clients"] == 2
+        bands = {band["band"]: band["clients"] for band in result["scoreBands"]}
+        assert bands == {"Very Poor": 0, "Poor": 1, "Fair": 0, "Good": 0, "Excellent": 1}
+        assert result["leveragePercentiles"]["p50"] == 0.5
+        assert [c["clientName"] for c in result["deteriorated"]] == ["Falling"]
+        assert result["deteriorated"][0]["change"] == -80
+    
+    def test_scores_from_retired_model_are_recomputed(self, db: Session, test_user):
+        client = _client(db, test_user, "Legacy")
+        _add_statement(db, client, 2022, 300, 1000, 200, model="ratio:0")
+        
+        result = portfolio_service.summarize(portfolio_service.load_frame(db, test_user.id))
+        
+        assert result["averageScore"] != 300
+    
+    def test_empty_portfolio(self, db: Session, test_user):
+        result = portfolio_service.summarize(portfolio_service.load_frame(db, test_user.id))
+        
+        assert result["clients"] == 0
+        assert result["deteriorated"] == []
+        assert result["leveragePercentiles"]["p90"] is None
+
+class TestPortfolioCache:
+    def test_cached_until_invalidated(self, db: Session, test_user, fake_redis):
+        client = _client(db, test_user, "Cached")
+        _add_statement(db, client, 2022, 760, 1000, 200)
+        
+        with patch.object(portfolio_service, "load_frame", wraps=portfolio_service.load_frame) as load:
+            first = portfolio_service.get_portfolio(db, test_user.id)
+            assert portfolio_service.get_portfolio(db, test_user.id) == first
+            assert load.call_count == 1
+            
+            _add_statement(db, client, 2023, 600, 1000, 900)
+            portfolio_service.invalidate(test_user.id)
+            
+            assert portfolio_service.get_portfolio(db, test_user.id)["deteriorated"][0]["clientId"] == client.id
+            assert load.call_count == 2
+    
+    def test_computes_without_redis(self, db: Session, test_user, fake_redis):
+        with patch.object(fake_redis, "get", side_effect=redis.ConnectionError("down")):
+            assert portfolio_service.get_portfolio(db, test_user.id)["clients"] == 0
@@ -0,0 +1,60 @@
+from unittest.mock import patch
+import pytest
+from app.services import progress_service
+
+@pytest.fixture
+def clock():
+    with patch.object(progress_service.time, 'time', return_value=1000.0) as mock_time:
+        yield mock_time
+
+class TestProgress:
+    def test_reports_pages_and_stage(self, fake_redis, clock):
+        progress_service.start([(7, 3, 4, "ocr")])
+        progress_service.update(7, pagesDone=2)
+
+        progress = progress_service.get(7)
+
+        assert progress["userId"] == 3
+        assert (progress["status"], progress["currentStage"], progress["stage"]) == ("processing", "ocr", None)
+        assert (progress["pagesDone"], progress["pagesTotal"]) == (2, 4)
+        # No completed documents yet, so no pace to estimate from
+        assert progress["etaSeconds"] is None
+
+    def test_eta_from_recent_throughput(self, fake_redis, clock):
+        for document_id, pages, seconds in ((1, 10, 20), (2, 5, 20)):
+            clock.return_value = 1000.0
+            progress_service.start([(document_id, 3, pages, "ocr")])
+            clock.return_value = 1000.0 + seconds
+            progress_service.finish(document_id, "completed")
+
+        # 2 and 4 seconds per page
+        assert float(fake_redis.get(progress_service.RATE_KEY)) == 3.0
+
+        progress_service.start([(9, 3, 10, "ocr")])
+        clock.return_value += 12
+        assert progress_service.get(9)["etaSeconds"] == 18.0
+        assert progress_service.get(1)["etaSeconds"] == 0.0
+
+    def test_resumed_and_failed_runs_are_not_sampled(self, fake_redis, clock):
+        progress_service.start([(1, 3, 10, "summary"), (2, 3, 10, "ocr")])
+        clock.return_value = 1100.0
+        progress_service.finish(1, "completed")
+        progress_service.finish(2, "failed")
+
+        assert progress_service.RATE_KEY not in fake_redis.data
+        failed = progress_service.get(2)
+        assert (failed["status"], failed["currentStage"], failed["etaSeconds"]) == ("failed", None, None)
+
+    def test_unknown_document(self, fake_redis):
+        assert progress_service.get(404) is None
+
+    def test_finish_writes_status_and_expiry_together(self, fake_redis, clock):
+        progress_service.start([(7, 3, 4, "ocr")])
+        fake_redis.transactions.clear()
+
+        progress_service.finish(7, "failed")
+
+        key = progress_service.PROGRESS_KEY.format(document_id=7)
+        assert fake_redis.transactions[0] == ["hgetall", "hset", "expire"]
+        assert fake_redis.data[key]["status"] == "failed"
+        assert fake_redis.ttls[key] == progress_service.settings.PROGRESS_TTL
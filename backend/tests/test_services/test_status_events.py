@@ -0,0 +1,59 @@
+import asyncio
+import json
+from unittest.mock import patch
+import redis
+from app.db.models import Document, DocumentStatus
+from app.services import status_events
+
+class TestPublish:
+    def test_events_go_to_users_channel(self, fake_redis):
+        document = Document(id=7, status=DocumentStatus.PROCESSING, processing_stage="ocr", processing_lane="bulk")
+
+        status_events.publish(3, status_events.document_event(document), status_events.event(8, "failed"))
+
+        assert [channel for channel, _ in fake_redis.published] == ["document-status:3", "document-status:3"]
+        first, second = (json.loads(message) for _, message in fake_redis.published)
+        assert (first["documentId"], first["status"], first["stage"], first["lane"]) == (7, "processing", "ocr", "bulk")
+        assert (second["documentId"], second["status"]) == (8, "failed")
+
+    def test_redis_errors_are_not_raised(self):
+        with patch.object(status_events, 'get_redis', side_effect=redis.ConnectionError("down")):
+            status_events.publish(3, status_events.event(7, "completed"))
+
+    def test_sse_message(self):
+        assert status_events.sse_message('{"a": 1}', "status") == 'event: status\ndata: {"a": 1}\n\n'
+
+class TestBroadcaster:
+    def test_fans_out_to_users_streams(self):
+        async def scenario():
+            broadcaster = status_events.StatusBroadcaster()
+            with patch.object(broadcaster, '_read', new=lambda: asyncio.sleep(3600)):
+                first = broadcaster.subscribe(1)
+                second = broadcaster.subscribe(1)
+                other = broadcaster.subscribe(2)
+
+                broadcaster.dispatch("document-status:1", "event")
+                assert (first.get_nowait(), second.get_nowait()) == ("event", "event")
+                assert other.empty()
+
+                for user_id, queue in ((1, first), (1, second), (2, other)):
+                    broadcaster.unsubscribe(user_id, queue)
+                # The shared subscription closes with the last stream
+                assert broadcaster.subscribers == {}
+                assert broadcaster._reader is None
+
+        asyncio.run(scenario())
+
+    def test_slow_stream_drops_events(self):
+        async def scenario():
+            broadcaster = status_events.StatusBroadcaster()
+            with patch.object(broadcaster, '_read', new=lambda: asyncio.sleep(3600)), \
+                    patch.object(status_events.settings, 'STATUS_STREAM_QUEUE_SIZE', 2):
+                queue = broadcaster.subscribe(1)
+                for number in range(3):
+                    broadcaster.dispatch("document-status:1", str(number))
+
+                assert [queue.get_nowait() for _ in range(queue.qsize())] == ["0", "1"]
+                broadcaster.unsubscribe(1, queue)
+
+        asyncio.run(scenario())
@@ -0,0 +1,87 @@
+from sqlalchemy.orm import Session
+from app.db.models import Analysis, ClientFinancialPeriod, Document
+from app.services import scoring_models, timeseries_service
+
+FINANCIALS = {"income": 1000.0, "expenses": 600.0, "assets": 5000.0, "liabilities": 2000.0}
+
+def _document(db: Session, test_document, title: str) -> Document:
+    document = Document(
+        title=title,
+        file_path=f"/path/to/{title}.pdf",
+        file_type="application/pdf",
+        status="completed",
+        client_id=test_document.client_id,
+        user_id=test_document.user_id,
+    )
+    db.add(document)
+    db.commit()
+    return document
+
+class TestRecordPeriod:
+    def test_upserts_one_row_per_year(self, db: Session, test_document):
+        timeseries_service.record_period(db, test_document, "year ended 31 March 2023", FINANCIALS, 700)
+        db.commit()
+        
+        revised = _document(db, test_document, "revised")
+        timeseries_service.record_period(db, revised, "FY 2022-23", dict(FINANCIALS, income=1200.0), 720)
+        db.commit()
+        
+        periods = db.query(ClientFinancialPeriod).all()
+        assert len(periods) == 1
+        assert periods[0].fiscal_year == 2023
+        assert periods[0].document_id == revised.id
+        assert periods[0].income == 1200.0
+        assert periods[0].cibil_score == 720
+    
+    def test_reprocessed_document_moves_period(self, db: Session, test_document):
+        timeseries_service.record_period(db, test_document, "FY 2021-22", FINANCIALS, 700)
+        db.commit()
+        timeseries_service.record_period(db, test_document, "FY 2022-23", FINANCIALS, 700)
+        db.commit()
+        
+        assert [p.fiscal_year for p in db.query(ClientFinancialPeriod).all()] == [2023]
+    
+    def test_skips_documents_without_year_or_client(self, db: Session, test_document):
+        assert timeseries_service.record_period(db, test_document, "Total income 100", FINANCIALS, 700) is None
+        
+        test_document.client_id = None
+        assert timeseries_service.record_period(db, test_document, "FY 2022-23", FINANCIALS, 700) is None
+        assert db.query(ClientFinancialPeriod).count() == 0
+
+class TestClientSeries:
+    def test_yoy_deltas_skip_gaps_and_zero_bases(self, db: Session, test_document):
+        for year, income, expenses in ((2020, 0.0, 100.0), (2021, 500.0, 200.0), (2023, 800.0, 300.0)):
+            document = _document(db, test_document, f"fy{year}")
+            timeseries_service.record_period(
+                db, document, f"year ended 31 March {year}", dict(FINANCIALS, income=income, expenses=expenses), 700
+            )
+        db.commit()
+        
+        series = timeseries_service.client_series(db, test_document.client_id)
+        
+        assert series["periods"] == [2020, 2021, 2023]
+        assert series["series"]["profit"] == [-100.0, 300.0, 500.0]
+        income = series["yoy"]["income"]
+        # 2021 over a zero base has a change but no percentage; 2023 follows a gap
+        assert income["change"] == [None, 500.0, None]
+        assert income["percent"] == [None, None, None]
+        assert series["yoy"]["expenses"]["percent"] == [None, 100.0, None]
+    
+    def test_scores_follow_rescoring(self, db: Session, test_document):
+        rescored, unscored = _document(db, test_document, "fy2022"), _document(db, test_document, "fy2023")
+        for document, year in ((rescored, 2022), (unscored, 2023)):
+            timeseries_service.record_period(db, document, f"FY {year - 1}-{str(year)[2:]}", FINANCIALS, 700)
+        # Rescored after the period was recorded
+        db.add(Analysis(document_id=rescored.id, cibil_score=650, cibil_model=scoring_models.active_model().key))
+        db.commit()
+        
+        series = timeseries_service.client_series(db, test_document.client_id)
+        
+        assert series["series"]["cibil_score"] == [650.0, None]
+    
+    def test_empty_client(self, db: Session, test_client):
+        series = timeseries_service.client_series(db, test_client.id)
+        
+        assert series["periods"] == []
+        assert series["series"]["income"] == []
+        assert series["yoy"]["income"] == {"change": [], "percent": []}
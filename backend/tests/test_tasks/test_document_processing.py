@@ -0,0 +1,275 @@
+import pytest
+from unittest.mock import AsyncMock, patch
+from sqlalchemy.orm import Session
+from app.core.celery_app import celery_app
+from app.db.models import Analysis, Document, DocumentStatus, ExtractedData, OCRPage, OCRResult
+from app.services import ocr_service
+from app.tasks import document_processing
+
+def _page(number, text, method="ocr"):
+    return {
+        "page": number, "method": method, "text": text, "confidence": 0.9,
+        "page_hash": f"hash{number}", "words": [],
+    }
+
+class TestProcessingPipeline:
+    @pytest.fixture(autouse=True)
+    def pipeline(self, db: Session, test_document, tmp_path):
+        path = tmp_path / "statement.pdf"
+        path.write_bytes(b"%PDF-1.4")
+        test_document.file_path = str(path)
+        db.commit()
+        
+        # Run queued stages and chords inline
+        celery_app.conf.task_always_eager = True
+        with patch.object(document_processing, 'SessionLocal', return_value=db), \
+                patch.object(ocr_service, 'cached_result', return_value=None), \
+                patch.object(ocr_service, 'cache_result'), \
+                patch.object(ocr_service, 'plan_document_pages', return_value=(2, {1: _page(1, "Revenue", "native")})), \
+                patch.object(ocr_service, 'ocr_document_page',
+                             side_effect=lambda path, number: dict(_page(number, "100"), disk_write_bytes=4096)), \
+                patch.object(ocr_service, 'extract_structured_data', return_value={"income": 1}), \
+                patch.object(ocr_service, 'extract_tables', return_value=[]), \
+                patch('app.services.analysis_service.generate_summary', new=AsyncMock(return_value="summary")), \
+                patch('app.services.analysis_service.score_with_active_model', return_value=(700, "ratio:1")), \
+                patch.object(document_processing.portfolio_service, 'invalidate'), \
+                patch.object(document_processing.status_events, 'publish'), \
+                patch.object(document_processing, 'progress_service'):
+            yield
+        celery_app.conf.task_always_eager = False
+    
+    def test_runs_every_stage(self, db: Session, test_document):
+        # The tasks close their session, detaching fixture objects
+        document_id = test_document.id
+        
+        document_processing.process_document(document_id)
+        
+        document = db.get(Document, document_id)
+        assert document.status == DocumentStatus.COMPLETED
+        assert document.processing_stage == "score"
+        assert db.query(Analysis).filter(Analysis.document_id == document_id).one().summary == "summary"
+        pages = db.query(OCRPage).filter(OCRPage.document_id == document_id).order_by(OCRPage.page_number).all()
+        assert [(page.page_number, page.method) for page in pages] == [(1, "native"), (2, "ocr")]
+        # Only the page without a text layer went through OCR
+        assert ocr_service.ocr_document_page.call_count == 1
+        assert "Revenue" in db.query(OCRResult).filter(OCRResult.document_id == document_id).one().text
+        extracted = db.query(ExtractedData).filter(ExtractedData.document_id == document_id).one()
+        assert extracted.table_format == "columnar"
+        assert db.query(Analysis).filter(Analysis.document_id == document_id).one().cibil_score == 700
+    
+    def test_merged_result_reports_page_disk_writes(self, db: Session, test_document):
+        document_id = test_document.id
+        document_processing.process_document(document_id)
+        
+        with patch.object(document_processing, '_advance'):
+            result = document_processing.merge_ocr_pages.apply(args=(document_id, 2)).get()
+        
+        # Written by the OCRed page; the text-layer page wrote nothing
+        assert result["metrics"] == {"disk_write_bytes": 4096, "disk_write_bytes_per_page": 2048}
+    
+    def test_failed_stage_resumes_after_last_checkpoint(self, db: Session, test_document):
+        document_id = test_document.id
+        
+        with patch('app.services.analysis_service.generate_summary', side_effect=RuntimeError("AI unavailable")) as summary:
+            document_processing.process_document(document_id)
+        
+        # Retried before giving up, without repeating earlier stages
+        assert summary.call_count == document_processing.settings.PIPELINE_MAX_RETRIES + 1
+        document = db.get(Document, document_id)
+        assert document.status == DocumentStatus.FAILED
+        assert document.processing_stage == "tables"
+        
+        result = document_processing.process_document(document_id)
+        
+        assert result["stage"] == "summary"
+        assert ocr_service.ocr_document_page.call_count == 1
+        assert ocr_service.extract_tables.call_count == 1
+        assert db.get(Document, document_id).status == DocumentStatus.COMPLETED
+    
+    def test_stored_pages_are_not_ocred_again(self, db: Session, test_document):
+        document_id = test_document.id
+        document_processing.process_document(document_id)
+        
+        # A completed document restarts from OCR, but its pages are checkpointed
+        assert document_processing.process_document(document_id)["stage"] == "ocr"
+        assert ocr_service.ocr_document_page.call_count == 1
+        assert db.query(OCRResult).filter(OCRResult.document_id == document_id).count() == 1
+        
+        with patch.object(ocr_service, 'ocr_config_hash', return_value="other"):
+            document_processing.process_document(document_id)
+        
+        assert ocr_service.ocr_document_page.call_count == 2
+        assert {page.ocr_config for page in db.query(OCRPage).filter(OCRPage.document_id == document_id)} == {"other"}
+
+    def test_publishes_status_events(self, db: Session, test_document):
+        document_id = test_document.id
+        user_id = test_document.user_id
+        page_count = test_document.page_count
+        
+        document_processing.process_document(document_id)
+        
+        events = [call.args[1] for call in document_processing.status_events.publish.call_args_list]
+        assert all(call.args[0] == user_id for call in document_processing.status_events.publish.call_args_list)
+        assert [(event["status"], event["stage"]) for event in events if "progress" not in event] == [
+            ("processing", None), ("processing", "ocr"), ("processing", "extract"),
+            ("processing", "tables"), ("processing", "summary"), ("completed", "score"),
+        ]
+        progress = [event["progress"] for event in events if "progress" in event]
+        assert progress == [{"stage": "ocr", "done": 2, "total": page_count}]
+    
+    def test_records_progress(self, db: Session, test_document):
+        document_id = test_document.id
+        user_id = test_document.user_id
+        page_count = test_document.page_count
+        progress = document_processing.progress_service
+        
+        document_processing.process_document(document_id)
+        
+        progress.start.assert_called_once_with([(document_id, user_id, page_count, "ocr")])
+        updates = [call.kwargs for call in progress.update.call_args_list]
+        assert updates[:3] == [
+            {"pagesDone": 1, "pagesTotal": 2}, {"pagesDone": 2},
+            {"stage": "ocr", "currentStage": "extract", "pagesDone": 2, "pagesTotal": 2},
+        ]
+        assert updates[-1] == {"stage": "score", "currentStage": None}
+        progress.finish.assert_called_once_with(document_id, "completed")
+    
+    def test_stages_are_queued_in_document_lane(self, db: Session, test_document):
+        document_id = test_document.id
+        test_document.processing_lane = "bulk"
+        db.commit()
+        
+        with patch.object(document_processing.ocr_document, 'apply_async') as mock_apply:
+            document_processing.process_document(document_id)
+        
+        assert mock_apply.call_args.kwargs["queue"] == "document_processing.bulk"
+
+class TestOCRBatching:
+    @pytest.fixture
+    def image_document(self, db: Session, test_document, tmp_path):
+        path = tmp_path / "invoice.png"
+        path.write_bytes(b"png")
+        test_document.file_path = str(path)
+        test_document.file_type = "image/png"
+        db.commit()
+        return test_document.id
+    
+    @patch.object(document_processing.flush_ocr_batch, 'apply_async')
+    @patch.object(document_processing.flush_ocr_batch, 'delay')
+    @patch.object(document_processing.ocr_batcher, 'enqueue')
+    @patch.object(ocr_service, 'ocr_document_page')
+    def test_single_image_is_queued_for_batch(self, mock_extract, mock_enqueue, mock_delay,
+                                              mock_apply_async, db: Session, image_document):
+        mock_enqueue.return_value = 1
+        
+        with patch.object(document_processing, 'SessionLocal', return_value=db):
+            result = document_processing.process_document(image_document)
+        
+        assert result["status"] == "queued"
+        assert not mock_extract.called
+        mock_enqueue.assert_called_once_with(image_document)
+        # First document in an empty queue starts the max-wait timer
+        assert mock_apply_async.call_args.kwargs["countdown"] == document_processing.settings.OCR_BATCH_MAX_WAIT
+        assert not mock_delay.called
+        assert db.get(Document, image_document).status == DocumentStatus.PROCESSING
+    
+    @patch.object(document_processing.flush_ocr_batch, 'delay')
+    @patch.object(document_processing.ocr_batcher, 'enqueue')
+    def test_full_batch_flushes_immediately(self, mock_enqueue, mock_delay, db: Session, image_document):
+        mock_enqueue.return_value = document_processing.settings.OCR_BATCH_SIZE
+        
+        with patch.object(document_processing, 'SessionLocal', return_value=db):
+            document_processing.process_document(image_document)
+        
+        mock_delay.assert_called_once_with()
+    
+    @patch.object(document_processing.complete_document, 'delay')
+    @patch.object(ocr_service, 'extract_image_batch')
+    def test_flush_hands_results_back(self, mock_batch, mock_complete, db: Session, image_document, fake_redis):
+        document_processing.ocr_batcher.enqueue(image_document)
+        mock_batch.return_value = [{"text": "Invoice", "confidence": 0.9, "pages": []}]
+        
+        with patch.object(document_processing, 'SessionLocal', return_value=db):
+            result = document_processing.flush_ocr_batch.apply().get()
+        
+        assert result == {"documents": 1, "failed": 0}
+        mock_complete.assert_called_once_with(image_document, mock_batch.return_value[0])
+        # The claim is dropped once its documents are handed on
+        assert fake_redis.data == {document_processing.ocr_batcher.PENDING_KEY: []}
+    
+    @patch.object(document_processing.complete_document, 'delay')
+    @patch.object(ocr_service, 'extract_image_batch', return_value=[None])
+    def test_unreadable_image_fails(self, mock_batch, mock_complete, db: Session, image_document, fake_redis):
+        document_processing.ocr_batcher.enqueue(image_document)
+        
+        with patch.object(document_processing, 'SessionLocal', return_value=db):
+            result = document_processing.flush_ocr_batch.apply().get()
+        
+        assert result == {"documents": 1, "failed": 1}
+        assert not mock_complete.called
+        assert db.get(Document, image_document).status == DocumentStatus.FAILED
+    
+    @patch.object(document_processing.complete_document, 'delay')
+    @patch.object(ocr_service, 'extract_image_batch', side_effect=RuntimeError("OCR crashed"))
+    def test_failed_batch_is_retried_then_fails_documents(self, mock_batch, mock_complete, db: Session,
+                                                          image_document, fake_redis):
+        document_processing.ocr_batcher.enqueue(image_document)
+        celery_app.conf.task_always_eager = True
+        
+        try:
+            with patch.object(document_processing, 'SessionLocal', return_value=db):
+                document_processing.flush_ocr_batch.apply()
+        finally:
+            celery_app.conf.task_always_eager = False
+        
+        # Every retry got the same claimed batch back
+        assert mock_batch.call_count == document_processing.settings.PIPELINE_MAX_RETRIES + 1
+        assert all(call.args[0] == [mock_batch.call_args.args[0][0]] for call in mock_batch.call_args_list)
+        assert db.get(Document, image_document).status == DocumentStatus.FAILED
+        assert not [key for key in fake_redis.data if key.startswith("ocr:batch:claimed")]
+
+class TestBulkStart:
+    @patch.object(document_processing.flush_ocr_batch, 'apply_async')
+    @patch.object(document_processing.ocr_batcher, 'enqueue', return_value=1)
+    @patch.object(document_processing.ocr_document, 'apply_async')
+    def test_starts_each_document_in_its_lane(self, mock_ocr, mock_enqueue, mock_flush,
+                                              db: Session, test_user, tmp_path):
+        report = tmp_path / "report.pdf"
+        report.write_bytes(b"%PDF-1.4")
+        scan = tmp_path / "scan.png"
+        scan.write_bytes(b"png")
+        documents = [
+            Document(title="Report", file_path=str(report), file_type="application/pdf",
+                     status=DocumentStatus.PROCESSING, user_id=test_user.id, processing_lane="bulk"),
+            Document(title="Scan", file_path=str(scan), file_type="image/png",
+                     status=DocumentStatus.PROCESSING, user_id=test_user.id, processing_lane="interactive"),
+            Document(title="Gone", file_path=str(tmp_path / "gone.pdf"), file_type="application/pdf",
+                     status=DocumentStatus.PROCESSING, user_id=test_user.id),
+        ]
+        db.add_all(documents)
+        db.commit()
+        report_id, scan_id, gone_id = [document.id for document in documents]
+        
+        with patch.object(document_processing, 'SessionLocal', return_value=db):
+            result = document_processing.process_documents([report_id, scan_id, gone_id])
+        
+        assert result == {"started": 1, "batched": 1, "failed": 1}
+        assert mock_ocr.call_args.args[0] == (report_id,)
+        assert mock_ocr.call_args.kwargs["queue"] == "document_processing.bulk"
+        mock_enqueue.assert_called_once_with(scan_id)
+        assert db.get(Document, gone_id).status == DocumentStatus.FAILED
+    
+    @patch.object(document_processing, '_start_stage', side_effect=RuntimeError("database went away"))
+    def test_failed_start_fails_the_documents(self, mock_start, db: Session, test_user, tmp_path):
+        report = tmp_path / "report.pdf"
+        report.write_bytes(b"%PDF-1.4")
+        document = Document(title="Report", file_path=str(report), file_type="application/pdf",
+                            status=DocumentStatus.PROCESSING, user_id=test_user.id)
+        db.add(document)
+        db.commit()
+        
+        with patch.object(document_processing, 'SessionLocal', return_value=db):
+            result = document_processing.process_documents.apply(args=([document.id],))
+        
+        assert result.failed()
+        assert db.get(Document, document.id).status == DocumentStatus.FAILED
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw
+from app.utils import image_preprocessing
+
+def _ruled_page():
+    # Horizontal bars standing in for lines of text
+    img = Image.new("L", (800, 600), 255)
+    draw = ImageDraw.Draw(img)
+    for y in range(50, 550, 30):
+        draw.rectangle([50, y, 750, y + 6], fill=0)
+    return img
+
+class TestImagePreprocessing:
+    def test_grayscale_matches_pil(self):
+        img = Image.new("RGB", (4, 4), (200, 30, 30))
+        
+        gray = image_preprocessing.to_grayscale(np.asarray(img))
+        
+        assert gray.dtype == np.uint8
+        assert gray[0, 0] == np.asarray(img.convert("L"))[0, 0]
+    
+    def test_otsu_separates_bimodal_histogram(self):
+        gray = np.concatenate([np.full(500, 40), np.full(500, 210)]).astype(np.uint8)
+        
+        threshold = image_preprocessing.otsu_threshold(gray)
+        binary = image_preprocessing.binarize(gray)
+        
+        assert 40 <= threshold < 210
+        assert set(np.unique(binary)) == {0, 255}
+    
+    @pytest.mark.parametrize("angle", [3.0, -2.0, 0.0])
+    def test_estimate_skew(self, angle):
+        rotated = _ruled_page().rotate(angle, expand=True, fillcolor=255, resample=Image.BICUBIC)
+        binary = image_preprocessing.binarize(np.asarray(rotated))
+        
+        assert image_preprocessing.estimate_skew(binary) == pytest.approx(angle)
+    
+    def test_preprocess_page_deskews(self):
+        rotated = _ruled_page().rotate(3, expand=True, fillcolor=255, resample=Image.BICUBIC).convert("RGB")
+        
+        page = image_preprocessing.preprocess_page(rotated)
+        
+        assert page.mode == "L"
+        assert image_preprocessing.estimate_skew(np.asarray(page)) == 0
+    
+    def test_normalize_dpi(self):
+        img = Image.new("L", (150, 100), 255)
+        img.info["dpi"] = (150, 150)
+        
+        assert image_preprocessing.normalize_dpi(img, 300).size == (300, 200)
+        # Images without resolution metadata are left alone
+        assert image_preprocessing.normalize_dpi(Image.new("L", (150, 100)), 300).size == (150, 100)
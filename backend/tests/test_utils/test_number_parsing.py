@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+from app.utils import number_parsing
+
+class TestNumberParsing:
+    def test_indian_and_western_grouping(self):
+        values = number_parsing.parse_amounts(["12,34,567.00", "1,234,567", "4500"])
+        
+        assert values.tolist() == [1234567.0, 1234567.0, 4500.0]
+    
+    def test_rupee_close_and_mixed_grouping(self):
+        values = number_parsing.parse_amounts(["₹ 1,00,000/-", "Rs. 2,500/-", "12,345,67", "1,23,456,789"])
+        
+        assert values[:2].tolist() == [100000.0, 2500.0]
+        assert np.isnan(values[2:]).all()
+    
+    def test_currency_prefixes_and_negatives(self):
+        values = number_parsing.parse_amounts(["₹ 5,000", "Rs. 1,234", "(2,500)", "-450", "INR -75"])
+        
+        assert values.tolist() == [5000.0, 1234.0, -2500.0, -450.0, -75.0]
+    
+    def test_currency_before_bracketed_negative(self):
+        values = number_parsing.parse_amounts(["₹(1,200)", "Rs.(300)", "(₹ 50)", "1,200-"])
+        
+        assert values.tolist() == [-1200.0, -300.0, -50.0, -1200.0]
+    
+    def test_interior_hyphens_are_not_amounts(self):
+        values = number_parsing.parse_amounts(["2023-24", "10-20", "1-2-3"])
+        
+        assert np.isnan(values).all()
+    
+    def test_unit_suffix_overrides_table_scale(self):
+        values = number_parsing.parse_amounts(["12.5 crore", "3 lakhs", "10"], scale=number_parsing.LAKH)
+        
+        assert values.tolist() == [125000000.0, 300000.0, 1000000.0]
+    
+    def test_cr_and_dr_are_ledger_marks(self):
+        values = number_parsing.parse_amounts(["1,234.00 Cr", "1,234 Dr", "Rs. 500 dr.", "2 crore Cr"])
+        
+        assert values.tolist() == [1234.0, -1234.0, -500.0, 20000000.0]
+    
+    def test_unparseable_values_are_nan(self):
+        values = number_parsing.parse_amounts(["abc", "", None, "1,2,3"])
+        
+        assert np.isnan(values).all()
+        assert number_parsing.parse_amount("n/a") is None
+    
+    @pytest.mark.parametrize("header, scale", [
+        ("Balance Sheet (₹ in lakhs)", 1e5),
+        ("Rs. in Crores", 1e7),
+        ("(All amounts in INR thousands)", 1e3),
+        ("All figures in crores", 1e7),
+        ("(Figures are in ₹ lakhs)", 1e5),
+        ("Statement of Profit and Loss", 1.0),
+    ])
+    def test_detect_scale(self, header, scale):
+        assert number_parsing.detect_scale(header) == scale
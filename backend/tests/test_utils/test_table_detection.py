@@ -0,0 +1,71 @@
+import time
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw
+from app.utils import table_detection
+
+def _binary(img):
+    return np.where(np.asarray(img) > 127, 255, 0).astype(np.uint8)
+
+def _ruled_page():
+    img = Image.new("L", (2480, 3508), 255)
+    draw = ImageDraw.Draw(img)
+    for y in range(300, 1100, 100):
+        draw.line([(200, y), (2200, y)], fill=0, width=3)
+    for x in (200, 1000, 1600, 2200):
+        draw.line([(x, 300), (x, 1000)], fill=0, width=3)
+    return img
+
+def _unruled_page():
+    img = Image.new("L", (1200, 800), 255)
+    draw = ImageDraw.Draw(img)
+    for i in range(6):
+        y = 100 + i * 16
+        draw.text((50, y), f"Line item {i}", fill=0)
+        draw.text((600, y), f"{i},000", fill=0)
+        draw.text((900, y), f"{i},500", fill=0)
+    # A paragraph below is not a table
+    for i in range(3):
+        draw.text((50, 400 + i * 16), "ordinary prose with varied word spacing " * 2, fill=0)
+    return img
+
+class TestTableDetection:
+    def test_ruled_grid(self):
+        tables = table_detection.detect_tables(_binary(_ruled_page()))
+        
+        assert len(tables) == 1
+        table = tables[0]
+        assert table["ruled"]
+        assert len(table["rows"]) == 7
+        assert [left for left, _ in table["columns"]] == [200, 1000, 1600]
+    
+    def test_whitespace_gutters(self):
+        tables = table_detection.detect_tables(_binary(_unruled_page()))
+        
+        assert len(tables) == 1
+        assert not tables[0]["ruled"]
+        assert len(tables[0]["rows"]) == 6
+        assert len(tables[0]["columns"]) == 3
+    
+    def test_blank_page(self):
+        assert table_detection.detect_tables(np.full((100, 100), 255, dtype=np.uint8)) == []
+    
+    def test_cells_from_words(self):
+        table = {"bbox": (0, 0, 300, 40), "rows": [(0, 20), (20, 40)], "columns": [(0, 150), (150, 300)]}
+        words = [
+            {"text": "Revenue", "left": 5, "top": 22, "width": 50, "height": 10},
+            {"text": "Item", "left": 5, "top": 2, "width": 30, "height": 10},
+            {"text": "5,000", "left": 200, "top": 22, "width": 40, "height": 10},
+            {"text": "outside", "left": 5, "top": 100, "width": 40, "height": 10},
+        ]
+        
+        assert table_detection.cells_from_words(table, words) == [["Item", ""], ["Revenue", "5,000"]]
+    
+    def test_full_page_is_fast(self):
+        binary = _binary(_ruled_page())
+        
+        start = time.perf_counter()
+        for _ in range(5):
+            table_detection.detect_tables(binary)
+        
+        assert (time.perf_counter() - start) / 5 < 0.5
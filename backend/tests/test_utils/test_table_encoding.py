@@ -0,0 +1,63 @@
+import json
+import pytest
+from app.utils import table_encoding
+
+TABLES = [
+    {
+        "id": 1,
+        "title": "Page 1 table 1",
+        "headers": ["Particulars", "Note", "2023", "2022"],
+        "rows": [
+            ["Revenue from operations", "21", "12,34,567.00", "9,87,654.00"],
+            ["Other income", "22", "", "45,000.50"],
+            ["Loss on sale", "", "(1,200.00)", "-"],
+        ],
+    },
+    {
+        "id": 2,
+        "title": "Page 2 table 1",
+        "headers": ["Item", "Amount"],
+        "rows": [["Revenue", "1,234,567"], ["Other income", "₹ 500"]],
+    },
+]
+
+class TestTableEncoding:
+    def test_round_trip_is_lossless(self):
+        encoded = table_encoding.encode_tables(TABLES)
+        
+        assert table_encoding.decode_tables(json.loads(json.dumps(encoded))) == TABLES
+    
+    def test_column_types(self):
+        encoded = table_encoding.encode_tables(TABLES)
+        
+        first = encoded["tables"][0]["columns"]
+        assert [column["type"] for column in first] == ["string", "number", "number", "string"]
+        assert first[2]["format"] == {"grouping": "indian", "decimals": 2, "negative": "paren"}
+        assert first[2]["values"] == [1234567.0, None, -1200.0]
+        # Labels shared across tables are stored once
+        assert encoded["strings"].count("Other income") == 1
+        # A currency prefix cannot be reproduced, so that column stays as strings
+        assert encoded["tables"][1]["columns"][1]["type"] == "string"
+    
+    def test_ragged_table_kept_as_rows(self):
+        ragged = [{"id": 1, "title": "T", "headers": ["A", "B"], "rows": [["x"], ["y", "1"]]}]
+        
+        encoded = table_encoding.encode_tables(ragged)
+        
+        assert "columns" not in encoded["tables"][0]
+        assert table_encoding.decode_tables(encoded) == ragged
+    
+    def test_legacy_rows_payload(self):
+        payload = {"tables": TABLES}
+        
+        assert table_encoding.table_format(payload) == table_encoding.ROWS
+        assert table_encoding.decode_tables(payload) == TABLES
+        assert table_encoding.decode_tables(None) == []
+    
+    def test_smaller_than_rows(self):
+        tables = [dict(TABLES[0], rows=TABLES[0]["rows"] * 200)]
+        
+        rows_size = len(json.dumps({"tables": tables}))
+        columnar_size = len(json.dumps(table_encoding.encode_tables(tables)))
+        
+        assert columnar_size < rows_size * 0.6